@@ -23,12 +23,34 @@
 
 # Data Set Sources: https://archive.ics.uci.edu/ml/datasets/Air+quality
 ###########################################################################################################################
+import logging
+
 import numpy as np
-from numpy import transpose as T
-from scipy.stats import f
-from numpy.linalg import inv
-from numpy import dot
-import matplotlib.pyplot as plt
+from scipy.linalg import qr
+from stepwise_selection import (getCrossProducts, getSubsetCoefficients, getSubsetResidualSS,
+                                getSubsetRegressionSS, getSubsetTotalMeanSS, getSubsetRatioRegressionSS,
+                                getSubsetAdjustedRatioRegressionSS, getSubsetAIC, getSubsetCp)
+from stepwise_selection.model_cache import getCriticalValue, getModelCacheInfo, getSubsetFit, setSolver
+from stepwise_selection.solvers import getNumericalRank
+from stepwise_selection.precision import (readRowChunks, getMixedPrecisionCrossProducts, getMixedPrecisionStepwise,
+                                          getPrecisionDeviation, printPrecisionDeviation)
+from stepwise_selection.cholesky_updates import (getCholeskyFactor,
+                                                 getDeletedResidualSS, deleteCholeskyColumn)
+from stepwise_selection.sweep import getSweepStepwisePredictors
+from stepwise_selection.scoring import getCandidateScores
+from stepwise_selection.best_subsets import getBestSubsets, getBestSubsetModel, printBestSubsets
+from stepwise_selection.driver import getStepwiseSelection, printStepwiseTrace
+from stepwise_selection.active_set import (getActiveSet, getInactiveSet, addToActiveSet,
+                                           dropFromActiveSet, getActiveSetNames)
+from stepwise_selection.ingest import getStreamingCrossProducts
+from stepwise_selection.missing_data import getMissingDataCrossProducts
+from stepwise_selection.features import getFeatureSpecs, getFeatureNames, getFeatureStepwise
+from stepwise_selection.multi_response import getMultiResponseCrossProducts, getMultiResponseStepwise
+from stepwise_selection.cross_validation import (getFoldIndex, getFoldCrossProducts, getPathCrossValidation,
+                                                 printPathCrossValidation)
+from stepwise_selection.column_cache import loadColumnCache, getCacheMatrix, readCacheChunks
+from stepwise_selection.plotting import plotBestSubsetCriterion, plotPathCrossValidation
+from stepwise_selection.tracing import logger, resetTrace, writeTrace, printTrace
 
 begin = 1
 end_row = 9358
@@ -41,29 +63,59 @@ end_col = 15
 # end_col = 14
 
 csv_url = 'AirQualityUCI/AirQualityUCI.csv'
-data = np.genfromtxt(csv_url, delimiter=';', usecols = range(2,end_col), skip_header = 1, dtype=float, max_rows = end_row)
-data = np.array(data, dtype=float)
-
-# Get the Benzene concentration as a Response vector Y from the data
-Y = data[begin:end_row,3]
-
-# Get the number of observations
-n = Y.shape[0]
-# print('n:', n)
-
-# Get a Data Matrix Z from the data
-Z = np.delete(data,3,axis=1)[begin:end_row,] # axis=1 -- select a column, axis=0 -- select a row.
-
-# Insert one vector into the data matrix Z
-Z = np.insert(Z, 0, np.ones(n), axis=1)
-Z = Z.astype(float)
-# Get the number of variables in the data matrix Z
-r = Z.shape[1]-1
-# print('Z:')
-# print(Z)
-# print('r: ', r)
-# print('Original Data:')
-# print(data.astype(int))
+
+# Least squares solver of every fit: 'cholesky' (fastest), 'qr' (stable) or
+# 'pivoted_qr' (rank-revealing), see stepwise_selection.solvers
+solver = 'cholesky'
+
+# Precision of the rows: 'float64', or 'mixed' for float32 rows with float64
+# cross-products and refinement, see stepwise_selection.precision
+precision = 'float64'
+
+###################################################################################
+# Load the AirQuality data: the response Y (Benzene, column 3 of the data) and
+# the data matrix Z with the intercept column
+###################################################################################
+def getAirQualityData(csv_url, begin, end_row, end_col):
+
+    # data = np.genfromtxt(csv_url, delimiter=';', usecols = range(2,end_col), skip_header = 1, dtype=float, max_rows = end_row)
+
+    # Parse the CSV once into a binary columnar cache (AirQualityUCI.csv.cache) and
+    # memory-map it; the row of column numbers on the second line of the CSV is
+    # skipped by the reader, so the cache is shared with stepwise-select
+    cache = loadColumnCache(csv_url)
+
+    # Get the column names from the header of the CSV file
+    names = cache['names'][:end_col-2]
+    data = getCacheMatrix(cache, names, 0, end_row-begin)
+
+    # Get the Benzene concentration as a Response vector Y from the data
+    Y = data[:,3]
+
+    # Get the number of observations
+    n = Y.shape[0]
+
+    # Get a Data Matrix Z from the data
+    Z = np.delete(data,3,axis=1) # axis=1 -- select a column, axis=0 -- select a row.
+
+    # Insert one vector into the data matrix Z
+    Z = np.insert(Z, 0, np.ones(n), axis=1)
+    Z = Z.astype(float)
+    Z_names = ['Intercept'] + names[:3] + names[4:]
+
+    return cache, names, data, Y, Z, Z_names
+
+###################################################################################
+# Cross-products of the data matrix and the response, fitted with the solver
+# of the run (the QR solvers also need the triangular factor of the rows)
+###################################################################################
+def getModelCrossProducts(data, response):
+
+    stats = getCrossProducts(data, response, row_factor=(solver != 'cholesky'))
+    setSolver(stats, solver)
+
+    return stats
+
 ###################################################################################
 # Function for computing Beta_hat
 ###################################################################################
@@ -75,21 +127,18 @@ def getBetaHat(data, response):
     # Set variables
     z = data; y = response
 
-    # Compute the beta_hat
-    beta_hat = inv(z.T.dot(z)).dot(z.T).dot(y)
+    # Compute the beta_hat by solving the least squares problem (no inverse of z'z)
+    stats = getModelCrossProducts(z, y)
+    beta_hat = getSubsetCoefficients(stats, range(z.shape[1]))
 
     return beta_hat
 
-# print('Beta_hat:')
-# print(getBetaHat(Z, Y))
-
 def isInvertible(data):
     z=0; result=0
     z = data
-    result = z.shape[0] == z.shape[1] and np.linalg.matrix_rank(z) == z.shape[0]
+    result = z.shape[0] == z.shape[1] and getNumericalRank(z) == z.shape[0]
     return result
 
-
 ###################################################################################
 # Function for computing Projection Matrix, i.e., Pz
 ###################################################################################
@@ -98,20 +147,16 @@ def getProjectionMatrix(data, where):
     # Initialize variables
     z=[]; Pz=[]
     # Set variables
-    z = data.astype(int)
+    z = np.asarray(data, dtype=float)
 
     # w = where
-    # print('where: ', w)
-    # print('z')
-    # print(z)
 
-    # Compute the Projection Matrix Pz
-    Pz = z.dot(inv(z.T.dot(z))).dot(z.T)
+    # Compute the Projection Matrix Pz = QQ' from the (economic) QR of z
+    Q = qr(z, mode='economic')[0]
+    Pz = Q.dot(Q.T)
 
     return Pz
 
-# print(getProjectionMatrix(Z))
-
 ###################################################################################
 # Function for computing Mean Projection Matrix, i.e., P1_n
 ###################################################################################
@@ -128,9 +173,6 @@ def getMeanProjectionMatrix(observations):
 
     return P1
 
-# print('P1: ')
-# print(getMeanProjectionMatrix(n))
-
 ###################################################################################
 # Function for computing Predcted Response, i.e., Y_hat
 ###################################################################################
@@ -142,45 +184,36 @@ def getPredictedResponse(data, response):
     # Set variables
     z = data; y = response
 
-    # Get the Projection Matrix Pz
-    Pz = getProjectionMatrix(z, 'getPredictedResponse')
+    # Get the cross-products of the design
+    stats = getModelCrossProducts(z, y)
 
     # Get the Beta_hat
-    beta_hat = getBetaHat(z, y)
+    beta_hat = getSubsetCoefficients(stats, range(z.shape[1]))
 
-    # Compute the Predicted Response y_hat
-    y_hat =  Pz.dot(y)
-    # y_hat1 = z.dot(beta_hat)
+    # Compute the Predicted Response y_hat = Pz y without forming Pz
+    y_hat = z.dot(beta_hat)
 
     return y_hat
 
-# print('Y_hat:')
-# print(getPredictedResponse(Z, Y))
-
 ###################################################################################
 # Function for computing Residual Sum of Squares
 ###################################################################################
 def getResidualSS(data, response, observations):
 
     # Initialize variables
-    z=[]; y=[]; Pz=[]; n=0;eye=0;resSS=0;
+    z=[]; y=[]; n=0; resSS=0;
 
     # Set variables
     z = data; y = response; n = observations
 
-    # Compute the n x n identity matrix
-    I = np.eye(n)
-
-    # Get the Projection Matrix Pz
-    Pz = getProjectionMatrix(z, 'getResidualSS')
+    # Get the cross-products Z'Z, Z'y and y'y
+    stats = getModelCrossProducts(z, y)
 
-    # Compute the Residual Sum of Squares
-    resSS = y.T.dot(I-Pz).dot(y)
+    # Compute the Residual Sum of Squares y'(I-Pz)y
+    resSS = getSubsetResidualSS(stats, range(z.shape[1]))
 
     return resSS
 
-# print('ResidualSS: ', getResidualSS(Z,Y,n))
-
 ###################################################################################
 # Function for computing Unbiased Residual Sum of Squares
 ###################################################################################
@@ -200,8 +233,6 @@ def getUnbiasedResidualSS(data, response, observations, variables):
 
     return s2
 
-# print('UnbiasedResidualSS: ', getUnbiasedResidualSS(Z, Y, n, r))
-
 ###################################################################################
 # Function for computing Regression Sum of Squares
 ###################################################################################
@@ -211,18 +242,13 @@ def getRegressionSS(data, response, observations):
     z=[]; y=[]; n=0; regSS=0
     z = data; y = response; n = observations
 
-    # Get the Projection Matrix Pz
-    Pz = getProjectionMatrix(z, 'getRegressionSS')
-
-    # Get the Mean Projection Matrix P1_n
-    P1 = getMeanProjectionMatrix(n)
+    # Get the cross-products Z'Z, Z'y and y'y
+    stats = getModelCrossProducts(z, y)
 
-    # Compute the Regression Sum of Squares
-    regSS = y.T.dot(Pz-P1).dot(y)
+    # Compute the Regression Sum of Squares y'(Pz-P1)y
+    regSS = getSubsetRegressionSS(stats, range(z.shape[1]))
     return regSS
 
-# print('RegressionSS: ', getRegressionSS(Z, Y, n))
-
 ###################################################################################
 # Function for computing Total Sum of Squares about Mean
 ###################################################################################
@@ -234,27 +260,15 @@ def getTotalMeanSS(data, response, observations):
     # Set variables
     z = data; y = response; n = observations
 
-    # Compute the n x n Identity Matrix
-    I = np.eye(n)
-
-    # Get the Mean Projection Matrix
-    P1 = getMeanProjectionMatrix(n)
-
-    # Get the Residual Sum of Squares
-    resSS = getResidualSS(z,y,n)
-
-    # Get the Regression Sum of Squares
-    regSS = getRegressionSS(z,y,n)
+    # Get the cross-products; the Total SS only needs y'y, sum(y) and n
+    stats = getModelCrossProducts(z, y)
 
     # Compute the Total Sum of Squares about Mean
-    # totSS = y.T.dot(I-P1).dot(y)
-    totSS = resSS + regSS
+    # totSS = y.T.dot(I-P1).dot(y) = resSS + regSS
+    totSS = getSubsetTotalMeanSS(stats)
 
     return totSS
 
-# print('totSS: ', getTotalMeanSS(Z,Y,n))
-
-
 ###################################################################################
 # Function for computing R2 (Ratio of Regression Sum of Squares)
 ###################################################################################
@@ -266,19 +280,14 @@ def getRatioRegressionSS(data, response, observations):
     # Set variables
     z = data; y = response; n = observations
 
-    # Get RegressionSS
-    regSS = getRegressionSS(z, y, n)
-
-    # Get Total SS about Mean
-    totSS = getTotalMeanSS(z,y,n)
+    # Get the cross-products once; RegSS and the Total SS share one fit of z
+    stats = getModelCrossProducts(z, y)
 
     # Compute the Ration of Regression SS
-    R2 = regSS/totSS
+    R2 = getSubsetRatioRegressionSS(stats, range(z.shape[1]))
 
     return R2
 
-# print('R2: ', getRatioRegressionSS(Z, Y, n))
-
 ###################################################################################
 # Function for computing Adjusted R2 (Adjusted Ratio of Regression Sum of Squares)
 ###################################################################################
@@ -300,12 +309,10 @@ def getAdjustedRatioRegressionSS(data, response):
 
     return Adjusted_R2
 
-# print('Adjusted_R2: ', getAdjustedRatioRegressionSS(Z, Y, n, r))
-
 def isPredictorSignificant(data, data1, response, alpha_value):
 
     # Initialize variables
-    z=[]; z1=[]; Pz=[]; Pz1=[]; I=[]
+    z=[]; z1=[]; stats=[]
     r=0; n=0; y=0; alpha=0; df1=0; df2=0; p_value=0; c_value=0
 
     # Set variables
@@ -315,63 +322,40 @@ def isPredictorSignificant(data, data1, response, alpha_value):
     n = z.shape[0]
     q = r-1
 
-    I = np.eye(n)
     df1 = r-q
     df2 = n-r-1
-    print('')
-    print('r: ', r)
-    print('q: ', q)
-    print('n: ', n)
-    print('df1: ', df1)
-    print('df2: ', df2)
+    logger.debug('r: %d, q: %d, n: %d, df1: %d, df2: %d', r, q, n, df1, df2)
+
+    # Get the cross-products of both models at once: columns of z, then of z1
+    z1 = np.reshape(z1, (n, -1))
+    stats = getModelCrossProducts(np.column_stack((z, z1)), y)
+
+    index = range(z.shape[1])
+    index1 = range(z.shape[1], z.shape[1]+z1.shape[1])
 
-    # Get projection matrices: Pz and Pz1
-    Pz = getProjectionMatrix(z, 'isPredictorSignificant')
-    # print(Pz)
+    # Residual SS of both models: y'(I-Pz)y and y'(I-Pz1)y
+    resSS = getSubsetResidualSS(stats, index)
 
     if r==1:
 
-        Pz1 = getMeanProjectionMatrix(n)
-        # print(Pz1)
+        resSS1 = getSubsetTotalMeanSS(stats)
     else:
 
-        Pz1 = getProjectionMatrix(z1, 'isPredictorSignificant')
+        resSS1 = getSubsetResidualSS(stats, index1)
 
     # Compute F-ratio and p-value of F-ratio on the F distribution
-    numerator = y.T.dot(Pz -Pz1).dot(y)/(df1)
-    denomenator = y.T.dot(I -Pz).dot(y)/(df2)
+    numerator = (resSS1 -resSS)/(df1)
+    denomenator = resSS/(df2)
 
     F = numerator/denomenator
-    c_value = f.ppf(1-alpha, df1, df2)
+    c_value = getCriticalValue(alpha, df1, df2)
 
-    # p_value = f.cdf(F, df1, df2)
-    # print('P-value: ', p_value)
-
-    print('F-ratio: ', F)
-    print('C-value: ', c_value)
-    print('level of alpha: ', 1-alpha)
-    print('')
+    logger.debug('F-ratio: %g, C-value: %g, level of alpha: %g', F, c_value, 1-alpha)
 
     Fs_vec = []
     Fs_vec.append(F)
     Fs_vec.append(c_value)
 
-    '''
-    plt.title('F test with the level of 0.05')
-    # plt.suptitle('The Sum of Squares (Covariances)', x=0.514, y=0.96, fontsize=10)
-    # plt.legend(loc='upper left')
-    # x = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
-    x = [1, 2]
-    # label = ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11']
-    label = ['F', 'F_{1,n-3}(0.05)']
-    plt.xticks(x, label)
-    # plt.xlabel('index of predictors', fontsize=12)
-    # plt.ylabel('R2 value', fontsize=12)
-    # plt.plot(x, R2_vec)
-    plt.bar(x, Fs_vec)
-    plt.show()
-    # '''
-
     # Hypothesis test: Reject Ho or not
     if F > c_value:
         # Reject the null hypothesis H0. So the predictor is significant
@@ -379,6 +363,24 @@ def isPredictorSignificant(data, data1, response, alpha_value):
 
     return False
 
+###################################################################################
+# F test for an F-ratio that is already known, e.g., from a Cholesky update
+###################################################################################
+def isFRatioSignificant(F_ratio, df1, df2, alpha_value):
+
+    F=0; alpha=0; c_value=0
+
+    F = F_ratio; alpha = alpha_value
+
+    c_value = getCriticalValue(alpha, df1, df2)
+
+    logger.debug('F-ratio: %g, C-value: %g, level of alpha: %g', F, c_value, 1-alpha)
+
+    # Hypothesis test: Reject Ho or not
+    if F > c_value:
+        return True
+
+    return False
 
 ###################################################################################
 # Compute Akaike's Information Criterion (AIC)
@@ -393,13 +395,15 @@ def getAIC(data, response):
 
     p = r+1
 
-    resSS = getResidualSS(z, y, n)
-    AIC = n*np.log(resSS/n)+(2*p)
+    stats = getModelCrossProducts(z, y)
+    AIC = getSubsetAIC(stats, range(p))
 
     return AIC
 
 ###################################################################################
 # Compute C_p value: Select models with minimum C_p
+# (the original ratio RSS_sub/RSS_full - (n-2p); the criteria of the
+# selected model and of the best subsets use Mallows' C_p, see getSubsetCp)
 ###################################################################################
 def getCp(data, data_subset, response):
 
@@ -411,8 +415,11 @@ def getCp(data, data_subset, response):
     r = z.shape[1]-1; n = z.shape[0]
     p = r+1
 
-    numerator = getResidualSS(zi, y, n)
-    denomenator = getResidualSS(z, y, n)
+    # Get the cross-products of both models at once: columns of z, then of zi
+    stats = getModelCrossProducts(np.column_stack((z, zi)), y)
+
+    numerator = getSubsetResidualSS(stats, range(p, p+zi.shape[1]))
+    denomenator = getSubsetResidualSS(stats, range(p))
 
     Cp = numerator/denomenator - (n-2*p)
 
@@ -437,537 +444,346 @@ def getSubsetDataMatrix(data, col_index):
 
 ###################################################################################
 # Compute a predictor having the most contribution to the Regression SS:
+# col_index are the candidate columns of Z; the intercept is column 0.
 ###################################################################################
-def getMostPredictorToRegSS(data, response):
+def getMostPredictorToRegSS(stats, col_index):
 
-    p=0; n=0; predictor_index=0
-    R2=0; Adj_R2=0; AIC=0; Cp=0
+    R2_vec=[]; candidates=[]; factor=[]
 
-    R2_vec=[]; Adj_R2_vec=[]; AIC_vec=[]
-    Cp_vec=[]; index_vec=[]; z=[]; y=[]
+    candidates = np.asarray(col_index, dtype=int)
 
-    z = data; y = response
+    # Score every one-predictor model [1, z_i] at once against the
+    # intercept-only model
+    factor = getCholeskyFactor(stats, [0])
 
-    p = z.shape[1]
-    n = z.shape[0]
+    R2_vec = getCandidateScores(stats, factor, candidates)['R2']
 
-    for i in range(1,p):
+    R2_max_index = candidates[np.argmax(R2_vec)]
 
-        zi = getSubsetDataMatrix(z, i)
+    logger.debug('R2 Max index: %d', R2_max_index)
 
-        R2 = getRatioRegressionSS(zi, y, n)
-        # R2_vec = np.append(R2_vec, R2)
-        R2_vec.append(R2)
+    return R2_max_index
 
-    R2_max_index = np.argmax(R2_vec)+1
+###################################################################################
+# Compute an Initial Active Set with a predictor showing the most contribution
+# to the Regression Sum of Squares. Models are sorted arrays of column indices
+# of Z (see stepwise_selection.active_set).
+###################################################################################
+def getInitActiveSet(stats, alpha_value, excluded=()):
 
-    print('R2 Max index:')
-    print(R2_max_index)
+    index=0; alpha=0; test=False; candidates=[]
 
-    '''
-    plt.title('R2 Value of a regression model with one predictor')
-    # plt.suptitle('The Sum of Squares (Covariances)', x=0.514, y=0.96, fontsize=10)
-    # plt.legend(loc='upper left')
-    # x = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
-    x = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
-    # label = ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11']
-    label = ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12']
-    plt.xticks(x, label)
-    plt.xlabel('index of predictors', fontsize=12)
-    plt.ylabel('R2 value', fontsize=12)
-    # plt.plot(x, R2_vec)
-    plt.bar(x, R2_vec)
-    plt.show()
-    # plt.savefig('figure_01.png')
+    alpha = alpha_value
+    p = stats['ZtZ'].shape[0]; n = stats['n']
 
-    '''
+    candidates = getInactiveSet([0], p, excluded)
+    factor = getCholeskyFactor(stats, [0])
 
-    return R2_max_index
+    while candidates.size > 0:
 
-###################################################################################
-# Compute an Initial Data matrix with a predictor showing the most contribution
-# to the Regression Sum of Squares.
-###################################################################################
-def getInitDataMatrix(data, response, alpha_value):
+        index = getMostPredictorToRegSS(stats, candidates)
 
-    z=[]; zi=[]; y=[]
-    index=0; alpha=0; test=False
+        # F test of [1, z_index] against the intercept-only model
+        F = getCandidateScores(stats, factor, [index])['F'][0]
 
-    z = data; y = response; alpha = alpha_value
-    index = getMostPredictorToRegSS(z, y)
+        test = isFRatioSignificant(F, 1, n-2, alpha)
 
-    zi = getSubsetDataMatrix(z, index)
+        if test == True:
 
-    test = isPredictorSignificant(zi, zi[:,0], y, alpha)
+            return getActiveSet([0, index])
 
-    if test == True:
+        logger.debug('Predictor %d is not significant, please try it again', index)
+        candidates = dropFromActiveSet(candidates, index)
 
-        return zi
+    logger.info('No predictor is significant.')
 
-    else:
+    return getActiveSet([0])
 
-        print('sorry, please try it again')
-        z = np.delete(z,index,axis=1)
+def getUpdatedActiveSet(stats, init_active, alpha_value, excluded=()):
 
-        return getInitDataMatrix(z, y, alpha)
+    active=[]; candidates=[]; RegSS_vec=[]; scores=[]
+    max_index=0; alpha=0; test=False
 
-'''
-alpha = 0.05
-init_Data = getInitDataMatrix(Z, Y, alpha)
-print(init_Data.astype(int))
-print(Z.astype(int))
-'''
+    active = init_active; alpha = alpha_value
 
-def getUpdatedDataMatrix(data, init_data, response, alpha_value):
-    z_int=[]; z_temp=[]; z_updated=[]; z_new=[]; z=[]; y=[]; regSS_vec=[]
-    index_vec=[]; RegSS_vec = []
+    p = stats['ZtZ'].shape[0]
 
-    temp=0; max_index=0; alpha=0; check1=False; check2=False; isEqual=False
+    # The predictors not in the model, without those already rejected
+    candidates = getInactiveSet(active, p, excluded)
 
-    z_int = init_data; z = data; y = response; alpha = alpha_value
+    logger.debug('Candidates: %d', candidates.size)
 
-    n = z_int.shape[0]
-    p1 = z_int.shape[1]
-    p2 = z.shape[1]
+    # Get the Cholesky factor of the current model
+    factor = getCholeskyFactor(stats, active)
 
-    for i in range(p1):
+    while candidates.size > 0:
 
-        for j in range(p2):
+        # Score every candidate against the current model at once
+        scores = getCandidateScores(stats, factor, candidates)
+        RegSS_vec = scores['regSS']
 
-            isEqual = np.array_equal(z_int[:,i], z[:,j])
+        max_index = int(np.argmax(RegSS_vec))
 
-            if isEqual == True:
+        logger.debug('Predictor having Max RegSS: %d', candidates[max_index])
 
-                index_vec.append(j)
+        # F-ratio of the appended predictor: (RSS(active) - RSS(active+j))/(RSS(active+j)/(n-r-1))
+        F = scores['F'][max_index]
+        df1, df2 = scores['df']
 
-    z_updated = np.delete(z,index_vec,axis=1)
+        test = isFRatioSignificant(F, df1, df2, alpha)
 
-    # print('z_update+++++++:')
-    # print(z_updated.astype(int))
-    p2_new = z_updated.shape[1]
+        if test == True:
 
-    print('hehe++++++++: ', p2_new)
-    print(z_updated.astype(int))
+            return addToActiveSet(active, candidates[max_index])
 
-    if p2_new == 0:
+        logger.debug('Find a another predictor.')
+        candidates = dropFromActiveSet(candidates, candidates[max_index])
 
-        z_new = z_int
+    return active
 
-        return z_new
+def getPredictorValidation(stats, active_set, alpha_value): #current_model
 
-    else:
+    active=[]; factor=[]; F_vec=[]; validation=[]
+    n=0; r=0; add=0;leaves=0; weakest=0; test=False
+    active = active_set; alpha = alpha_value
 
+    n = stats['n']
 
-        for i in range(p2_new):
+    logger.debug('Validation and Current Model: %s', active)
 
-            # print(z_updated[:,i])
-            z_temp = np.insert(z_int, p1, z_updated[:,i], axis=1)
-            regSS = getRegressionSS(z_temp, y, n)
+    # Get the Cholesky factor of the current model once; every partial F test
+    # below deletes one column from it with a Givens downdate.
+    factor = getCholeskyFactor(stats, active)
 
-            # print('z_temp: ')
-            # print(z_temp.astype(int))
-            # print('regSS: ',regSS, i)
-            RegSS_vec.append(regSS)
+    while active.size > 1:
 
-            if  regSS > temp:
+        r = active.size-1
+        df2 = n-r-1
 
-                temp = regSS
-                max_index = i
+        # Partial F-ratio for dropping each predictor (the intercept, column 0
+        # of Z, is the first entry of the sorted active set)
+        F_vec = []
+        for i in range(1, r+1):
 
-            z_temp=[]
+            resSS1 = getDeletedResidualSS(factor, i)
+            F_vec.append((resSS1-factor['resSS'])/(factor['resSS']/df2))
 
-        print('max_index: ', max_index+1)
-        print('Predictor having Max RegSS:')
-        print(z_updated[:,max_index].astype(int))
-        print('Regression SS: ')
-        print(RegSS_vec)
+        weakest = int(np.argmin(F_vec))+1
+        logger.debug('Weakest predictor: %d', active[weakest])
 
-        z1 = np.column_stack((z_int, z_updated[:,max_index]))
+        test = isFRatioSignificant(F_vec[weakest-1], 1, df2, alpha)
 
-        test = isPredictorSignificant(z1, z_int, y, alpha)
+        if test == True:
 
-        print(z1.astype(int))
+            logger.debug('Kept: %d predictors', r)
+            add = r
+            break
 
-        '''
-        plt.title('Regression Sum of Squares (Reg SS)')
-        # plt.suptitle('The Sum of Squares (Covariances)', x=0.514, y=0.96, fontsize=10)
-        # plt.legend(loc='upper left')
-        x = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
-        # x = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
-        label = ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11']
-        # label = ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12']
-        plt.xticks(x, label)
-        plt.xlabel('index of predictors', fontsize=12)
-        plt.ylabel('Reg SS value', fontsize=12)
-        # plt.plot(x, RegSS_vec)
-        plt.bar(x, RegSS_vec)
-        plt.show()
-        # plt.savefig('figure_01.png')
-        '''
+        logger.debug('Dropped: %d', active[weakest])
+        factor = deleteCholeskyColumn(factor, weakest)
+        active = dropFromActiveSet(active, active[weakest])
 
-        if test == True:
+        leaves += 1
 
-            z_new = np.insert(z_int, p1, z_updated[:,max_index], axis=1)
+    logger.debug('added: %d, leaves: %d', add, leaves)
 
-            return z_new
+    validation.append(active)
+    validation.append(add)
+    validation.append(leaves)
+    validation = np.array(validation, dtype=object)
 
-        else:
+    return validation
 
-            print('Find a another predictor.')
+def getStepwisePredictors(stats, init_active, alpha_value, max_steps=None): #significant
 
-            z_updated = np.delete(z_updated, max_index, axis=1)
+    alpha=0; active=[]; trace=[]
 
-                # print('Yo, yo,')
-            print(z_updated.astype(int))
-                # print(z_updated.shape[1])
-                #
-                # print(z_int.astype(int))
+    active = init_active; alpha = alpha_value
 
-            if z_updated.shape[1] == 0:
+    logger.debug('n: %d, r: %d', stats['n'], stats['ZtZ'].shape[0]-1)
 
-                print('I need to fix this point on May 15th, 2018')
-                print(z_int.astype(int))
+    # Alternate forward and backward steps in a loop on the active set, up to
+    # max_steps additions and deletions and until an active set comes back
+    active, trace = getStepwiseSelection(stats, alpha, active, forced=[0], max_steps=max_steps)
 
-                return z_int
+    if logger.isEnabledFor(logging.DEBUG):
+        printStepwiseTrace(trace)
 
-            z = np.column_stack((np.ones(n), z_updated))
+    logger.info('Which Predictors are the best? %s', active)
 
-                # print('wow:')
-                # print(z.astype(int))
+    return active, trace
 
-            return getUpdatedDataMatrix(z, z_int, y, alpha)
+###################################################################################
+# Stepwise selection on the sweep operator: the F-to-enter and F-to-remove of
+# every predictor are read off the swept [Z y]'[Z y], so the whole selection
+# needs one pass over the data.
+###################################################################################
+def getSweepStepwiseModel(stats, alpha_value):
 
-'''
-alpha = 0.05
-init_data = getInitDataMatrix(Z, Y, alpha)
-print('init_data:')
-print(init_data.astype(int))
-updated_data = getUpdatedDataMatrix(Z, init_data, Y, alpha)
-print('Updated_data: ')
-print(updated_data.astype(int))
-'''
+    model=[]; alpha=0
 
-def getPredictorValidation(data, response, alpha_value): #current_data
+    alpha = alpha_value
 
-    z=[]; y=[]; z_update=[]; current=[]; validation=[]
-    n=0; p=0; r=0; add=0;leaves=0; test=False
-    z = data; y = response; alpha = alpha_value
+    # The intercept (column 0) is kept in every model
+    model = getSweepStepwisePredictors(stats, alpha, forced=[0])
 
+    logger.info('Which Predictors are the best? %s', model['index'])
 
-    # current = current_data
+    return getActiveSet(model['index'])
 
-    n = z.shape[0]
-    p = z.shape[1]
-    r = p-1
+###################################################################################
+# Run the analysis: stepwise selection, best subsets, cross-validation and the
+# selection for several responses. plot draws the criteria of the best subsets,
+# and the phase timings and counters are written to trace_file as JSON.
+###################################################################################
+def main(plot=False, trace_file=None):
 
-    # z_update = z
+    resetTrace()
 
-    print('')
-    print('Validation and Current Model: ')
-    print(z.astype(int))
+    cache, names, data, Y, Z, Z_names = getAirQualityData(csv_url, begin, end_row, end_col)
+    r = Z.shape[1]-1
 
-    for i in range(1, p):
+    print('Z:')
+    print(Z_names)
 
-        print('counting:', i)
-        # print(i)
-        zi = z[:,i]
+    alpha = 0.05
 
-        zi = np.column_stack((np.ones(n), zi))
-        # print('zi: ')
-        # print(zi.astype(int))
+    # Missing values (-200): None keeps them as measurements, as the functions above do;
+    # 'complete', 'threshold' or 'pairwise' builds the cross-products from the mask of
+    # the cache (stepwise_selection.missing_data), without the predictors it drops
+    missing_mode = 'threshold'
+    row_factor = solver != 'cholesky'
 
-        test = isPredictorSignificant(z, zi, y, alpha)
+    if missing_mode is None:
 
-        if test == False:
-            print('bye:leave: ', i)
-            z_update = np.delete(z, i, axis=1)
+        # Get the cross-products once in one streaming pass over the cached columns; every
+        # model below is an index set into the columns of Z
+        stats = getStreamingCrossProducts(readCacheChunks(cache, names, max_rows=end_row-begin), 3,
+                                          row_factor=row_factor)
 
-            leaves += 1
+    else:
 
-            if z_update.shape[1] == 1:
+        stats = getMissingDataCrossProducts(data, 3, missing_mode, threshold=0.5, mask=cache['missing'][:end_row-begin],
+                                            row_factor=row_factor)
+        Z_names = ['Intercept'] + [names[j] for j in stats['columns']]
+        r = len(Z_names)-1
+        print('Z (%s, n = %d):' % (missing_mode, stats['n']))
+        print(Z_names)
 
-                validation.append(z)
-                validation.append(add)
-                validation.append(leaves)
-                validation = np.array(validation)
+    # The rows of Z behind stats (the complete rows of its columns)
+    rows = np.ones(end_row-begin, dtype=bool) if missing_mode is None else \
+        ~np.asarray(cache['missing'][:end_row-begin])[:, [3]+stats['columns']].any(axis=1)
+    columns = [j for j in range(len(names)) if j != 3] if missing_mode is None else stats['columns']
+    z_rows = np.column_stack((np.ones(np.count_nonzero(rows)), data[rows][:, columns]))
 
-                return validation
+    setSolver(stats, solver)
 
-        else:
+    # Stepwise engine: 'sweep' or 'cholesky' (getInitActiveSet/getStepwisePredictors)
+    engine = 'sweep'
 
-            print('hi:add', i)
-            add += 1
+    if engine == 'sweep':
 
-    print('added: ', add)
-    print('leaves: ', leaves)
-    # print('test: ', test)
-    print('')
+        updated_active = getSweepStepwiseModel(stats, alpha)
 
-    validation.append(z)
-    validation.append(add)
-    validation.append(leaves)
-    validation = np.array(validation)
+    else:
 
-    return validation
+        init_active = getInitActiveSet(stats, alpha)
 
-# print('Validation: ')
-# updated_data = Z[:,[0, 12, 4]]
-# print(updated_data.astype(int))
-# validated_data = getPredictorValidation(updated_data, Y, 0.05)
-# print(validated_data[0].astype(int))
-'''
-Fs_vec = [2992084.06887, 3.8424531458]
-plt.title('F test with the level of 0.05')
-x = [1, 2]
-label = ['F', 'F_{1,n-3}(0.05)']
-plt.xticks(x, label)
-# plt.xlabel('index of predictors', fontsize=12)
-# plt.ylabel('R2 value', fontsize=12)
-# plt.plot(x, R2_vec)
-plt.bar(x, Fs_vec)
-plt.show()
-'''
-# isEqual = np.array_equal(z_int[:,i], z[:,j])
-
-def getStepwisePredictors(data, init_data, response, alpha_value): #significant
-
-    alpha=0; add=0; leaves=0; n=0; p=0; r=0
-    new_data=[]; validation=[]; updated_data=[]; checked_data=[]; z=[]; y=[]
-
-    z = data; new_data = init_data; y = response; alpha = alpha_value
+        updated_active, trace = getStepwisePredictors(stats, init_active, alpha)
 
-    n = z.shape[0]
-    p = z.shape[1]
-    r = p-1
+    print('Stepwise Predictors: ')
+    print(getActiveSetNames(Z_names, updated_active))
 
-    print('n: ', n)
-    print('r: ', r)
+    # Criteria of the selected model; every criterion reuses the fits kept in the
+    # cache of stats (stepwise_selection.model_cache)
+    print('R2: ', getSubsetRatioRegressionSS(stats, updated_active))
+    print('Adjusted R2: ', getSubsetAdjustedRatioRegressionSS(stats, updated_active))
+    print('AIC: ', getSubsetAIC(stats, updated_active))
+    print('Cp: ', getSubsetCp(stats, updated_active, getActiveSet(range(r+1))))
+    fit = getSubsetFit(stats, updated_active)
+    print('Solver: %s (rank %d, condition estimate %.4g)' % (fit['solver'], fit['rank'], fit['cond']))
+    print('Fits: ', getModelCacheInfo(stats))
 
-    print('new_data+++++')
-    print(new_data.astype(int))
-    print(z.astype(int))
+    # The same selection from float32 rows, refined in float64, and its deviation
+    # from the float64 selection (stepwise_selection.precision)
+    if precision == 'mixed':
 
-    new_r = new_data.shape[1]
-    print('new_r:', new_r)
+        data32 = getCacheMatrix(cache, names, 0, end_row-begin, np.float32)
+        mixed_stats = getMixedPrecisionCrossProducts(readRowChunks(data32, rows, columns+[3]), len(columns))
+        mixed_model = getMixedPrecisionStepwise(mixed_stats, alpha)
 
+        print('')
+        print('Stepwise Predictors (mixed precision, %d refined steps): ' % mixed_model['refined_steps'])
+        print(getActiveSetNames(Z_names, mixed_model['index']))
+        printPrecisionDeviation(getPrecisionDeviation(mixed_model, getSweepStepwisePredictors(stats, alpha)))
 
-    # p = z.shape[1]
-    p1 = new_data.shape[1]
-    index_vec = []
-    # Z = Z.astype(int)
+    # Best subsets of every size (leaps and bounds over all 2^r subsets), with
+    # their AIC, C_p and Adjusted R2
+    best_models, counter = getBestSubsets(stats, top_k=3)
+    print('')
+    print('Best Subsets (%d of %d subsets evaluated): ' % (counter, 2**r))
+    printBestSubsets(best_models, Z_names)
 
-    for i in range(p1):
-        for j in range(p):
-            isEqual = np.array_equal(new_data[:,i], z[:,j])
-            if isEqual == True:
-                # print('delete:')
-                # print(z[:,j])
-                index_vec.append(j)
+    for criterion in ['AIC', 'Cp', 'adjR2']:
 
+        best_model = getBestSubsetModel(best_models, criterion)
+        print('Best Subset by %s: ' % criterion)
+        print(getActiveSetNames(Z_names, best_model['index']))
 
-    print('Which Predictors are the best?')
-    print(index_vec)
+    # Cross-validated error along the stepwise path, on 5 time-blocked folds; the
+    # training statistics of a fold are the total minus the held-out fold
+    # (stepwise_selection.cross_validation)
+    path_active, trace = getStepwiseSelection(stats, alpha)
+    cv_stats = getFoldCrossProducts(z_rows, Y[rows], getFoldIndex(z_rows.shape[0], 5, 'blocked'))
+    cv = getPathCrossValidation(cv_stats, trace)
+    print('')
+    print('Cross-validated error along the stepwise path: ')
+    printPathCrossValidation(cv, Z_names)
+    print('Best Model by CV: ')
+    print(getActiveSetNames(Z_names, cv['index'][int(np.argmin(cv['mse']))]))
 
+    # The same selection for several responses against the PT08 sensor channels,
+    # sharing Z'Z and with Z'Y as a matrix (stepwise_selection.multi_response)
+    responses = ['CO(GT)', 'NOx(GT)', 'NO2(GT)', 'C6H6(GT)']
+    sensors = [j for j in range(len(names)) if names[j].startswith('PT08')]
 
-    updated_data = getUpdatedDataMatrix(z, new_data, y, alpha)
+    multi_stats = getMultiResponseCrossProducts(data, [names.index(name) for name in responses], sensors,
+                                                cache['missing'][:end_row-begin])
+    multi_names = ['Intercept'] + [names[j] for j in sensors]
 
-    validation = getPredictorValidation(updated_data, y, alpha)
+    print('')
+    print('Stepwise Predictors by response (n = %d): ' % multi_stats['n'])
+    for response, model in zip(responses, getMultiResponseStepwise(multi_stats, alpha)):
+        print(response, getActiveSetNames(multi_names, model['index']))
 
-    checked_data = validation[0]
+    # Lags (1-24 h), rolling means and pairwise products of the PT08 sensors,
+    # generated in blocks only when their cross-products are needed
+    # (stepwise_selection.features)
+    specs = getFeatureSpecs(sensors)
+    feature_model = getFeatureStepwise(data, 3, specs, alpha, cache['missing'][:end_row-begin])
 
-    up_r = updated_data.shape[1]
+    print('')
+    print('Stepwise Predictors of %d sensor features (n = %d): ' % (len(specs), np.count_nonzero(feature_model['rows'])))
+    print(getFeatureNames(feature_model['specs'], names))
 
-    add = validation[1]
-    leaves = validation[2]
+    if plot:
 
-    if new_r == up_r and leaves == 0:
+        for criterion in ['AIC', 'Cp', 'adjR2']:
+            plotBestSubsetCriterion(best_models, criterion)
 
-        print('Which Predictors are the best?')
-        print(index_vec)
+        plotPathCrossValidation(cv)
 
-        return checked_data
+    print('')
+    printTrace()
 
-    else:
+    if trace_file is not None:
+        writeTrace(trace_file)
+
+# Not run by main: every subset on a process pool (parallel_subsets), bootstrap
+# stability selection (stability), the online model (online_model), 30-day
+# rolling windows (rolling_window), correlation screening (screening) and
+# stores larger than memory (out_of_core); see the README and stepwise-select.
 
-        return getStepwisePredictors(z, checked_data, y, alpha)
-
-
-
-# '''
-print('Z:')
-print(Z.astype(int))
-
-alpha = 0.05
-init_data = getInitDataMatrix(Z, Y, alpha)
-# print('init_data:')
-# print(init_data.astype(int))
-
-updated_model = getStepwisePredictors(Z, init_data, Y, alpha)
-print('Stepwise Predictors: ')
-print(updated_model.astype(int))
-
-'''
-beta_hat = getBetaHat(Z, Y)
-# print(beta_hat.astype(float))
-'''
-
-'''
-f_vec = [353011.317149, 4837774.80285, 8689232.45902, 657637.479477, 3209017.13757, 11766373.7082,
-1696902.75433, 11781374.9159, 11782783.5642, 4706110.61658, 6932575.86162]
-plt.title('F-values')
-# plt.suptitle('The Sum of Squares (Covariances)', x=0.514, y=0.96, fontsize=10)
-# plt.legend(loc='upper left')
-x = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
-# x = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
-label = ['12', '4', '6', '10', '2', '3', '11', '7', '5', '8', '9']
-# label = ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12']
-plt.xticks(x, label)
-plt.xlabel('index of predictors', fontsize=12)
-plt.ylabel('F-value', fontsize=12)
-# plt.plot(x, RegSS_vec)
-plt.bar(x, f_vec)
-plt.show()
-# plt.savefig('figure_01.png'
-'''
-
-
-'''
-z1 = Z[:,[0, 6, 3, 7, 5]]
-z2 = Z[:,[0, 4, 2, 11, 8]]
-z3 = Z[:,[0, 12, 3, 8, 9]]
-z4 = Z[:,[0, 4, 2, 7, 5]]
-z5 = Z[:,[0, 12, 10, 2, 11]]
-z6 = Z[:,[0, 12, 4, 3, 5]]
-z7 = Z[:,[0, 10, 2, 11, 8]]
-z8 = Z[:,[0, 2, 3, 7, 8]]
-z9 = Z[:,[0, 12, 4, 6, 10]]
-z10 = Z[:,[0, 12, 4, 6, 2]]
-z11 = Z[:,[0, 12, 4, 10, 2]]
-z12 = Z[:,[0, 12, 4, 2, 3]]
-# AIC_1 = getAIC(z1, Y)
-# AIC_2 = getAIC(z2, Y)
-# AIC_3 = getAIC(z3, Y)
-# AIC_4 = getAIC(z4, Y)
-# AIC_5 = getAIC(z5, Y)
-# AIC_6 = getAIC(z6, Y)
-# AIC_7 = getAIC(z7, Y)
-# AIC_8 = getAIC(z8, Y)
-# AIC_9 = getAIC(z9, Y)
-# AIC_10 = getAIC(z10, Y)
-# AIC_11 = getAIC(z11, Y)
-# AIC_12 = getAIC(z12, Y)
-# print(AIC_1)
-# print(AIC_2)
-# print(AIC_3)
-# print(AIC_4)
-# print(AIC_5)
-# print(AIC_6)
-# print(AIC_7)
-# print(AIC_8)
-# print(AIC_9)
-# print(AIC_10)
-# print(AIC_11)
-# print(AIC_12)
-AIC_vec = [65774.2950079, 44223.5133876, 20348.0528955, 54668.5972225, 21382.7584556, 7027.51549561, 28658.8018197, 56240.6990775, 3632.89935377, 4887.76100594, 6136.96139745, 7184.34811241]
-# plt.title('AIC Values')
-# # plt.suptitle('The Sum of Squares (Covariances)', x=0.514, y=0.96, fontsize=10)
-# # plt.legend(loc='upper left')
-# # x = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
-# x = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
-# label = ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12']
-# plt.xticks(x, label)
-# plt.xlabel('Index of Subset', fontsize=12)
-# plt.ylabel('AIC value', fontsize=12)
-# # plt.plot(x, RegSS_vec)
-# plt.bar(x, AIC_vec)
-# plt.show()
-# plt.savefig('figure_01.png'
-# r2_1 = getAdjustedRatioRegressionSS(z1, Y)
-# r2_2 = getAdjustedRatioRegressionSS(z2, Y)
-# r2_3 = getAdjustedRatioRegressionSS(z3, Y)
-# r2_4 = getAdjustedRatioRegressionSS(z4, Y)
-# r2_5 = getAdjustedRatioRegressionSS(z5, Y)
-# r2_6 = getAdjustedRatioRegressionSS(z6, Y)
-# r2_7 = getAdjustedRatioRegressionSS(z7, Y)
-# r2_8 = getAdjustedRatioRegressionSS(z8, Y)
-# r2_9 = getAdjustedRatioRegressionSS(z9, Y)
-# r2_9 = getAdjustedRatioRegressionSS(z9, Y)
-# r2_10 = getAdjustedRatioRegressionSS(z10, Y)
-# r2_11 = getAdjustedRatioRegressionSS(z11, Y)
-# r2_12 = getAdjustedRatioRegressionSS(z12, Y)
-# print(r2_1)
-# print(r2_2)
-# print(r2_3)
-# print(r2_4)
-# print(r2_5)
-# print(r2_6)
-# print(r2_7)
-# print(r2_8)
-# print(r2_9)
-# print(r2_9)
-# print(r2_10)
-# print(r2_11)
-# print(r2_12)
-r2_vec = [0.34079337407, 0.934118023918, 0.994864126101, 0.798829975406, 0.994263605242, 0.998763036734, 0.987516157422, 0.76202541212, 0.999139403518, 0.999015892507, 0.998875336113, 0.998742129275]
-# plt.title('Adjusted_R2 Values')
-# # plt.suptitle('The Sum of Squares (Covariances)', x=0.514, y=0.96, fontsize=10)
-# # plt.legend(loc='upper left')
-# # x = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
-# x = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
-# label = ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12']
-# plt.xticks(x, label)
-# plt.xlabel('Index of Subset', fontsize=12)
-# plt.ylabel('Adjusted_R2 value', fontsize=12)
-# # plt.plot(x, RegSS_vec)
-# plt.bar(x, r2_vec)
-# plt.show()
-
-# Cp_1 = getCp(Z, z1, Y)
-# Cp_2 = getCp(Z, z2, Y)
-# Cp_3 = getCp(Z, z3, Y)
-# Cp_4 = getCp(Z, z4, Y)
-# Cp_5 = getCp(Z, z5, Y)
-# Cp_6 = getCp(Z, z6, Y)
-# Cp_7 = getCp(Z, z7, Y)
-# Cp_8 = getCp(Z, z8, Y)
-# Cp_9 = getCp(Z, z9, Y)
-# Cp_9 = getCp(Z, z9, Y)
-# Cp_10 = getCp(Z, z10, Y)
-# Cp_11 = getCp(Z, z11, Y)
-# Cp_12 = getCp(Z, z12, Y)
-
-# print(Cp_1)
-# print(Cp_2)
-# print(Cp_3)
-# print(Cp_4)
-# print(Cp_5)
-# print(Cp_6)
-# print(Cp_7)
-# print(Cp_8)
-# print(Cp_9)
-# print(Cp_9)
-# print(Cp_10)
-# print(Cp_11)
-# print(Cp_12)
-Cp_vec = [-8499.32300592, -9247.88110878, -9324.52041075, -9077.19720923, -9323.76277367, -9329.43940602, -9315.24996919, -9030.76334865, -9329.91424287, -9329.75841727, -9329.58108665, -9329.41302848]
-plt.title('Cp Values')
-# plt.suptitle('The Sum of Squares (Covariances)', x=0.514, y=0.96, fontsize=10)
-# plt.legend(loc='upper left')
-# x = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
-x = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
-label = ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12']
-plt.xticks(x, label)
-plt.xlabel('Index of Subset', fontsize=12)
-plt.ylabel('Cp value', fontsize=12)
-# plt.plot(x, RegSS_vec)
-plt.bar(x, Cp_vec)
-plt.show()
-'''
-
-
-
-
-
-
-
-# print('Hello')
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    main()
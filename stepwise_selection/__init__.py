@@ -0,0 +1,137 @@
+###################################################################################
+# Stepwise Predictors Selection Method: computational core.
+#
+# The routines in this package work on the p x p cross-products of the data
+# rather than on the n x n projection matrices used in main.py, so that every
+# criterion is computed in O(p^2) memory once the cross-products are known.
+###################################################################################
+from .sufficient_stats import (
+    getCrossProducts,
+    getSubsetCoefficients,
+    getSubsetResidualSS,
+    getSubsetRegressionSS,
+    getSubsetTotalMeanSS,
+    getSubsetRatioRegressionSS,
+    getSubsetAdjustedRatioRegressionSS,
+    getSubsetAIC,
+    getSubsetCp,
+    getSubsetFRatio,
+)
+from .cholesky_updates import (
+    getCholeskyFactor,
+    getAppendedResidualSS,
+    appendCholeskyColumn,
+    getDeletedResidualSS,
+    deleteCholeskyColumn,
+)
+from .sweep import (
+    getAugmentedCrossProducts,
+    sweepOperator,
+    getSweepFRatios,
+    updateSweptMatrix,
+    sweepStepwiseSteps,
+    getSweptModel,
+    getSweepStepwisePredictors,
+)
+from .scoring import getCandidateScores
+from .active_set import (
+    getActiveSet,
+    getInactiveSet,
+    addToActiveSet,
+    dropFromActiveSet,
+    getActiveSetMask,
+    getActiveSetMatrix,
+    getActiveSetNames,
+)
+from .driver import getForwardStep, getBackwardStep, getStepwiseSelection, printStepwiseTrace
+from .best_subsets import getBestSubsets, getBestSubsetModel, printBestSubsets
+from .parallel_subsets import getAllSubsetsParallel
+from .ingest import getCsvColumnNames, readCsvChunks, getStreamingCrossProducts, getCsvCrossProducts
+from .column_cache import (
+    getSourceSignature,
+    writeColumnCache,
+    isColumnCacheValid,
+    loadColumnCache,
+    getCacheMatrix,
+    readCacheChunks,
+)
+from .missing_data import (
+    getMissingMask,
+    getMissingFractions,
+    getCompleteCaseCrossProducts,
+    getThresholdCrossProducts,
+    getPairwiseCrossProducts,
+    getMissingDataCrossProducts,
+)
+from .online_model import getOnlineModel, isOnlineModelStable, updateOnlineModel, getOnlineModelSelection
+from .rolling_window import getRollingStepwiseSelection, printRollingSelection
+from .multi_response import (
+    getMultiResponseCrossProducts,
+    getResponseStats,
+    getMultiAugmentedCrossProducts,
+    getGroupFRatios,
+    getMultiResponseStepwise,
+)
+from .cross_validation import (
+    getFoldIndex,
+    getFoldCrossProducts,
+    getTrainingStats,
+    getHeldOutSS,
+    getSubsetsCrossValidation,
+    getStepwisePathModels,
+    getPathCrossValidation,
+    printPathCrossValidation,
+)
+from .stability import (
+    getReplicateWeights,
+    getWeightedCrossProducts,
+    getStabilitySelection,
+    printStabilitySelection,
+)
+from .model_cache import (
+    getModelCache,
+    clearModelCache,
+    getModelCacheInfo,
+    getStatsSolver,
+    setSolver,
+    getSubsetFit,
+    getCriticalValue,
+)
+from .solvers import updateRowFactor, solveCholesky, solveQR, solvePivotedQR, getSolver, getNumericalRank
+from .plotting import plotBestSubsetCriterion, plotPathCrossValidation
+from .tracing import resetTrace, timePhase, countEvent, recordEvent, getTrace, writeTrace, printTrace
+from .synthetic import getSyntheticCoefficients, getSyntheticRows, readSyntheticChunks
+from .precision import (
+    addCompensated,
+    readRowChunks,
+    getMixedPrecisionCrossProducts,
+    getMixedPrecisionStepwise,
+    getPrecisionDeviation,
+    printPrecisionDeviation,
+)
+from .screening import (
+    getMarginalStats,
+    getMarginalCorrelations,
+    getScreenedColumns,
+    getColumnPool,
+    getPoolStepwise,
+    getScreenedStepwise,
+)
+from .features import (
+    getFeatureSpecs,
+    getFeatureNames,
+    getFeatureRows,
+    getFeatureBlock,
+    readFeatureBlocks,
+    getFeatureMarginalStats,
+    getFeaturePool,
+    getFeatureStepwise,
+)
+from .out_of_core import (
+    writeChunkedFile,
+    loadChunkedFile,
+    isChunkedFile,
+    getOutOfCoreCrossProducts,
+    getOutOfCoreDiagnostics,
+    printOutOfCoreDiagnostics,
+)
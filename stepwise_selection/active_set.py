@@ -0,0 +1,52 @@
+###################################################################################
+# Active-set representation of a model
+#
+# A model is the sorted array of the column indices of Z that it contains, e.g.,
+# [0, 4, 12] for the intercept and the 4th and 12th predictors. Membership tests,
+# additions and deletions work on the index array only; the n x k model matrix
+# is gathered from Z only when it is actually needed.
+###################################################################################
+import numpy as np
+
+###################################################################################
+# Sorted, duplicate-free index array of a model
+###################################################################################
+def getActiveSet(col_index):
+
+    return np.unique(np.asarray(col_index, dtype=int))
+
+###################################################################################
+# Columns of a p-column Z that are neither in the model nor excluded
+###################################################################################
+def getInactiveSet(active, variables, excluded=()):
+
+    return np.setdiff1d(np.arange(variables), np.union1d(active, np.asarray(excluded, dtype=int)))
+
+def addToActiveSet(active, col):
+
+    return np.union1d(active, [col])
+
+def dropFromActiveSet(active, col):
+
+    return np.setdiff1d(active, [col])
+
+###################################################################################
+# Boolean mask of length p with True for the columns in the model
+###################################################################################
+def getActiveSetMask(active, variables):
+
+    mask = np.zeros(variables, dtype=bool)
+    mask[active] = True
+
+    return mask
+
+###################################################################################
+# Model matrix Z[:, active] and the names of its columns
+###################################################################################
+def getActiveSetMatrix(data, active):
+
+    return np.take(data, active, axis=1)
+
+def getActiveSetNames(names, active):
+
+    return [names[j] for j in active]
@@ -0,0 +1,315 @@
+###################################################################################
+# Benchmark suite
+#
+# Every case is a data source (synthetic rows from synthetic, or the
+# AirQualityUCI file) and every case times the same operations:
+#   'ingest'         cross-products of the rows, in one streaming pass
+#   'fit'            Cholesky fit of the full model (fit cache cleared)
+#   'forward_step'   one forward step of the driver from the intercept
+#   'stepwise'       full stepwise selection, Cholesky driver
+#   'sweep'          full stepwise selection, sweep engine
+#   'best_subsets'   leaps and bounds (only for p <= best_subsets_max_p)
+# An operation is timed as the best of repeat timings (see _measure), then run
+# once more under tracemalloc for its peak of traced allocations; the peak RSS of the process
+# is taken after each case. The results are saved as JSON and compared with a
+# baseline file of the same form: an operation is a regression when it is
+# slower (or its peak larger) than the baseline by more than tolerance.
+#
+#   python -m stepwise_selection.benchmark --suite quick --output results.json \
+#       --baseline benchmarks/baseline.json
+###################################################################################
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from .synthetic import readSyntheticChunks
+from .ingest import getStreamingCrossProducts
+from .column_cache import loadColumnCache
+from .missing_data import getCompleteCaseCrossProducts
+from .model_cache import clearModelCache, getSubsetFit
+from .cholesky_updates import getCholeskyFactor
+from .active_set import getActiveSet
+from .driver import getForwardStep, getStepwiseSelection
+from .sweep import getSweepStepwisePredictors
+from .best_subsets import getBestSubsets
+
+best_subsets_max_p = 20
+
+air_quality_url = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               'AirQualityUCI', 'AirQualityUCI.csv')
+
+###################################################################################
+# The cases of a suite: (n, p) of the synthetic data, scaling n at p = 10 and p
+# at n = 10000, and 'airquality' for the AirQualityUCI file
+###################################################################################
+suites = {
+    'quick': {
+        'synthetic': [(1000, 10), (10000, 10), (100000, 10), (10000, 50), (10000, 200)],
+        'airquality': True,
+    },
+    'full': {
+        'synthetic': [(1000, 10), (10000, 10), (100000, 10), (1000000, 10), (10000000, 10),
+                      (10000, 50), (10000, 200), (10000, 1000), (10000, 2000), (1000000, 200)],
+        'airquality': True,
+    },
+}
+
+###################################################################################
+# Seconds per run of run(): the best of repeat timings, each the mean of enough
+# runs to take min_seconds (as timeit does), and the peak traced memory of one
+# more run. before() is called before every run.
+###################################################################################
+def _measure(run, repeat, before=None, min_seconds=0.02):
+
+    def timeRuns(number):
+
+        start = time.perf_counter()
+        for i in range(number):
+            if before is not None:
+                before()
+            run()
+
+        return (time.perf_counter()-start)/number
+
+    seconds = timeRuns(1)
+    number = max(1, int(min_seconds/seconds)) if seconds > 0 else 1
+
+    for i in range(repeat-1):
+        seconds = min(seconds, timeRuns(number))
+
+    if before is not None:
+        before()
+
+    tracemalloc.start()
+
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {'seconds': seconds, 'peak_bytes': int(peak)}
+
+def _getMaxRss():
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return int(rss if sys.platform == 'darwin' else rss*1024)
+
+###################################################################################
+# Time the operations on the stats of a case; ingest() returns the stats
+###################################################################################
+def _runCase(name, ingest, repeat, alpha_value):
+
+    results = {}
+    stats = {}
+
+    def runIngest():
+        stats.clear(); stats.update(ingest())
+
+    results['ingest'] = _measure(runIngest, repeat)
+
+    p = stats['ZtZ'].shape[0]
+    full = list(range(p))
+    clear = lambda: clearModelCache(stats)
+
+    results['fit'] = _measure(lambda: getSubsetFit(stats, full), repeat, clear)
+
+    active = getActiveSet([0])
+    factor = getCholeskyFactor(stats, active)
+    results['forward_step'] = _measure(lambda: getForwardStep(stats, active, factor, alpha_value, 1), repeat)
+
+    results['stepwise'] = _measure(lambda: getStepwiseSelection(stats, alpha_value), repeat)
+    results['sweep'] = _measure(lambda: getSweepStepwisePredictors(stats, alpha_value), repeat)
+
+    if p-1 <= best_subsets_max_p:
+        results['best_subsets'] = _measure(lambda: getBestSubsets(stats), repeat)
+
+    case = {
+        'name': name,
+        'n': stats['n'],
+        'p': p-1,
+        'results': results,
+        'max_rss_bytes': _getMaxRss(),
+    }
+
+    return case
+
+def _getSyntheticCase(n, p, repeat, alpha_value, chunk_rows):
+
+    ingest = lambda: getStreamingCrossProducts(readSyntheticChunks(n, p, chunk_rows=chunk_rows), p)
+
+    # Large cases are run once
+    repeat = repeat if n*p*p <= 1e9 else 1
+
+    return _runCase('synthetic n=%d p=%d' % (n, p), ingest, repeat, alpha_value)
+
+def _getAirQualityCase(repeat, alpha_value, source_url=air_quality_url):
+
+    cache_dir = tempfile.mkdtemp()
+
+    # The cache is rebuilt from the CSV every time, so that ingest includes parsing
+    def ingest():
+        cache = loadColumnCache(source_url, cache_dir, rebuild=True)
+        data = np.column_stack([cache['columns'][name] for name in cache['names']])
+        return getCompleteCaseCrossProducts(data, cache['names'].index('C6H6(GT)'), cache['missing'])
+
+    try:
+        return _runCase('airquality', ingest, repeat, alpha_value)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+###################################################################################
+# Run a suite ('quick' or 'full'). Returns the results with the versions and
+# the machine they were measured on.
+###################################################################################
+def runBenchmarks(suite='quick', repeat=3, alpha_value=0.05, chunk_rows=65536, verbose=True):
+
+    cases = []
+
+    for n, p in suites[suite]['synthetic']:
+
+        cases.append(_getSyntheticCase(n, p, repeat, alpha_value, chunk_rows))
+
+        if verbose:
+            printBenchmarkCase(cases[-1])
+
+    if suites[suite]['airquality'] and os.path.exists(air_quality_url):
+
+        cases.append(_getAirQualityCase(repeat, alpha_value))
+
+        if verbose:
+            printBenchmarkCase(cases[-1])
+
+    benchmarks = {
+        'suite': suite,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'cases': cases,
+    }
+
+    return benchmarks
+
+def saveBenchmarks(benchmarks, file_name):
+
+    with open(file_name, 'w') as benchmark_file:
+        json.dump(benchmarks, benchmark_file, indent=1, sort_keys=True)
+
+def loadBenchmarks(file_name):
+
+    with open(file_name) as benchmark_file:
+        return json.load(benchmark_file)
+
+###################################################################################
+# Compare the results with a baseline. An operation is a regression when its
+# seconds (or peak bytes) exceed the baseline by a fraction tolerance, and by
+# more than min_seconds (or min_bytes) so that noise on tiny timings is not
+# flagged. Returns a list of dicts with 'case', 'operation', 'metric', 'baseline',
+# 'value', 'ratio' and 'regression'.
+###################################################################################
+def compareBenchmarks(benchmarks, baseline, tolerance=0.25, min_seconds=0.002, min_bytes=1 << 20):
+
+    base_cases = {case['name']: case for case in baseline['cases']}
+    comparison = []
+
+    for case in benchmarks['cases']:
+
+        base_case = base_cases.get(case['name'])
+
+        if base_case is None:
+            continue
+
+        for operation, result in case['results'].items():
+
+            base_result = base_case['results'].get(operation)
+
+            if base_result is None:
+                continue
+
+            for metric, floor in [('seconds', min_seconds), ('peak_bytes', min_bytes)]:
+
+                value = result[metric]; base = base_result[metric]
+                ratio = value/base if base > 0 else np.inf
+
+                comparison.append({
+                    'case': case['name'],
+                    'operation': operation,
+                    'metric': metric,
+                    'baseline': base,
+                    'value': value,
+                    'ratio': ratio,
+                    'regression': bool(ratio > 1+tolerance and value-base > floor),
+                })
+
+    return comparison
+
+def printBenchmarkCase(case):
+
+    print('%s (max RSS %.1f MB)' % (case['name'], case['max_rss_bytes']/2**20))
+    print('  %-14s  %12s  %12s' % ('operation', 'seconds', 'peak (MB)'))
+
+    for operation, result in case['results'].items():
+        print('  %-14s  %12.6f  %12.3f' % (operation, result['seconds'], result['peak_bytes']/2**20))
+
+def printBenchmarkComparison(comparison):
+
+    print('%-28s  %-14s  %-10s  %12s  %12s  %7s' % ('case', 'operation', 'metric', 'baseline', 'value', 'ratio'))
+
+    for entry in comparison:
+
+        flag = '  REGRESSION' if entry['regression'] else ''
+        print('%-28s  %-14s  %-10s  %12.6g  %12.6g  %7.2f%s' % (entry['case'], entry['operation'], entry['metric'],
+                                                              entry['baseline'], entry['value'], entry['ratio'],
+                                                              flag))
+
+###################################################################################
+# Command line: run a suite, save it, and compare it with a baseline. The exit
+# status is 1 if there is a regression.
+###################################################################################
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='python -m stepwise_selection.benchmark',
+                                     description='Benchmarks of the stepwise selection.')
+
+    parser.add_argument('--suite', choices=sorted(suites), default='quick', help='cases to run (default quick)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per operation, best is kept (default 3)')
+    parser.add_argument('--output', metavar='FILE', help='save the results to FILE (JSON)')
+    parser.add_argument('--baseline', metavar='FILE', help='compare the results with FILE')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='slowdown or growth flagged as a regression (default 0.25)')
+
+    args = parser.parse_args(argv)
+
+    benchmarks = runBenchmarks(args.suite, args.repeat)
+
+    if args.output is not None:
+        saveBenchmarks(benchmarks, args.output)
+
+    if args.baseline is None:
+        return 0
+
+    comparison = compareBenchmarks(benchmarks, loadBenchmarks(args.baseline), args.tolerance)
+
+    print('')
+    printBenchmarkComparison(comparison)
+
+    regressions = [entry for entry in comparison if entry['regression']]
+    print('%d regression(s)' % len(regressions))
+
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
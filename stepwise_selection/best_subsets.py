@@ -0,0 +1,191 @@
+###################################################################################
+# Best-subset search with branch and bound (leaps and bounds)
+#
+# Within one subset size AIC, Cp and adjusted R2 are all monotone in the RSS, so
+# the top-k models of every size by RSS give the top-k models by each criterion.
+#
+# The subsets are enumerated as a tree of deletions from the full model on the
+# swept matrix [Z y]'[Z y] (see sweep): a node is a model M = keep + free, its
+# children drop one free variable each, and the child that drops free[i] keeps
+# free[:i] in all of its subsets. Every subset in the subtree of M has RSS >=
+# RSS(M - D) for the set D of variables it drops, which is at least the RSS of M
+# without the most important variable of D. A subtree is pruned when that bound
+# cannot enter the top-k of any size the subtree can still reach. The RSS of all
+# children of a node is read off the swept matrix at once,
+# RSS(M - j) = RSS(M) + beta_j^2/(Z_M'Z_M)^-1_jj, and moving to a child is one
+# reverse sweep.
+###################################################################################
+import heapq
+
+import numpy as np
+
+from .sweep import getAugmentedCrossProducts, sweepOperator, collinear_tol
+
+###################################################################################
+# Keep the top-k models of every size in a max-heap on the RSS; bounds[size] is
+# the k-th smallest RSS kept so far for the models with size columns (inf while
+# fewer than k models of that size have been seen).
+###################################################################################
+def _pushModel(heaps, bounds, size, resSS, model, top_k):
+
+    if bounds[size] == -np.inf:
+        return
+
+    heap = heaps.setdefault(size, [])
+
+    if len(heap) < top_k:
+        heapq.heappush(heap, (-resSS, model))
+    elif resSS < -heap[0][0]:
+        heapq.heapreplace(heap, (-resSS, model))
+
+    if len(heap) == top_k:
+        bounds[size] = -heap[0][0]
+
+def _searchSubsets(A, keep, free, heaps, bounds, top_k, counter):
+
+    p = A.shape[0]-1
+    resSS = A[p, p]
+
+    counter[0] += 1
+    _pushModel(heaps, bounds, len(keep)+len(free), resSS, tuple(sorted(keep+free)), top_k)
+
+    if len(free) == 0:
+        return
+
+    # RSS of every child M - j, j in free
+    free = np.asarray(free)
+    child_resSS = resSS + A[free, p]**2/-A[free, free]
+
+    # Drop the least important variables first, so that the variables left free
+    # in the larger subtrees are the important ones
+    order = np.argsort(child_resSS)
+    free = free[order].tolist(); child_resSS = child_resSS[order]
+
+    size = len(keep)+len(free)
+
+    # A subset in the subtree of child i drops D = free[i] and m more variables
+    # of free[i+1:] from M, so it has size-1-m columns. Its RSS is bounded below
+    # in two ways:
+    #  - RSS only increases when variables are dropped, so it is at least the
+    #    RSS of M without the most important variable of D, i.e., at least the
+    #    m-th smallest child RSS over free[i+1:], child_resSS[i+m];
+    #  - the increase beta_D'(V_DD)^-1 beta_D, V = (Z_M'Z_M)^-1, is at least the
+    #    sum of the single-drop increases over D divided by the largest
+    #    eigenvalue of the correlation matrix of V_DD, which is at most that of
+    #    V over all of free.
+    # Child i is pruned when the bound is no better than the k-th best RSS for
+    # every m.
+    L = len(free)
+    shift = np.arange(L)[:, None] + np.arange(L)[None, :]
+    valid = shift < L
+    shift = np.minimum(shift, L-1)
+
+    V = -A[np.ix_(free, free)]
+    s = np.sqrt(np.diag(V))
+    eig_max = np.linalg.eigvalsh(V/np.outer(s, s))[-1]
+
+    increase = np.concatenate(([0.0], np.cumsum(child_resSS-resSS)))
+    total_increase = increase[shift+1] - increase[np.arange(L)][:, None]
+
+    lower = np.maximum(child_resSS[shift], resSS + total_increase/eig_max)
+
+    prune = np.all((lower >= bounds[size-1-np.arange(L)]) | ~valid, axis=1)
+
+    for i in range(L):
+
+        if prune[i]:
+            continue
+
+        B = sweepOperator(A.copy(), free[i], inverse=True)
+
+        _searchSubsets(B, keep+free[:i], free[i+1:], heaps, bounds, top_k, counter)
+
+        # The bounds are tighter after the search of child i
+        prune = np.all((lower >= bounds[size-1-np.arange(L)]) | ~valid, axis=1)
+
+###################################################################################
+# Top-k subsets of every size by RSS, with their AIC, Cp and adjusted R2.
+# forced columns (the intercept) are in every subset; col_index are the
+# candidate predictors (default: every other column of Z) and max_size, if
+# given, the largest number of predictors searched for. Returns a list of
+# models sorted by size and RSS, each a dict with
+#   'r' (number of predictors), 'index', 'resSS', 'AIC', 'Cp', 'adjR2'
+# and the number of subsets that were evaluated.
+###################################################################################
+def getBestSubsets(stats, top_k=1, forced=(0,), col_index=None, max_size=None):
+
+    n = stats['n']
+    p = stats['ZtZ'].shape[0]
+
+    forced = [int(j) for j in forced]
+
+    if col_index is None:
+        col_index = [j for j in range(p) if j not in forced]
+
+    A, d = getAugmentedCrossProducts(stats)
+
+    # Sweep in the forced columns and then the candidates; a candidate that is
+    # collinear with the columns already swept is left out of the search
+    for k in forced:
+        sweepOperator(A, k)
+
+    free = []
+    for k in col_index:
+
+        if A[k, k] > collinear_tol:
+            sweepOperator(A, k)
+            free.append(int(k))
+
+    # Mallows' C_p = RSS/sigma2 - n + 2*size, with sigma2 estimated from the
+    # full model of every swept column
+    full_resSS = A[p, p]*d[p]**2
+    sigma2 = full_resSS/(n-len(forced)-len(free))
+    totSS = stats['yty'] - stats['ysum']**2/n
+
+    heaps = {}; counter = [0]
+    bounds = np.full(p+1, np.inf)
+
+    # Sizes above max_size never need to be reached, so they never stop pruning
+    if max_size is not None:
+        bounds[len(forced)+max_size+1:] = -np.inf
+    _searchSubsets(A, forced, free, heaps, bounds, top_k, counter)
+
+    models = []
+    for size in sorted(heaps):
+
+        for neg_resSS, index in sorted(heaps[size], reverse=True):
+
+            resSS = -neg_resSS*d[p]**2
+            r = size-len(forced)
+
+            models.append({
+                'r': r,
+                'index': list(index),
+                'resSS': resSS,
+                'AIC': n*np.log(resSS/n)+2*size,
+                'Cp': resSS/sigma2 - n + 2*size,
+                'adjR2': 1-(resSS/totSS)*((n-1)/(n-size)),
+            })
+
+    return models, counter[0]
+
+###################################################################################
+# The best model by a criterion: 'AIC' and 'Cp' are minimized, 'adjR2' maximized
+###################################################################################
+def getBestSubsetModel(models, criterion):
+
+    if criterion == 'adjR2':
+        return max(models, key=lambda model: model['adjR2'])
+
+    return min(models, key=lambda model: model[criterion])
+
+def printBestSubsets(models, names=None):
+
+    print('%3s  %14s  %14s  %16s  %12s  %s' % ('r', 'RSS', 'AIC', 'Cp', 'Adj R2', 'predictors'))
+
+    for model in models:
+
+        label = [names[j] if names is not None else str(j) for j in model['index']]
+
+        print('%3d  %14.6g  %14.6g  %16.6g  %12.8f  %s' % (model['r'], model['resSS'], model['AIC'],
+                                                          model['Cp'], model['adjR2'], ', '.join(label)))
@@ -0,0 +1,168 @@
+###################################################################################
+# Incremental Cholesky factorization of the current model
+#
+# The current model S is kept as the upper triangular factor R of its (scaled)
+# Gram matrix, R'R = D^-1 (Z'Z)_S D^-1, together with w = R^-T D^-1 (Z'y)_S, so
+# that RSS_S = y'y - w'w. Appending a candidate column is a rank-one extension of
+# R and deleting a column is a Givens downdate, both O(k^2) for a model with k
+# columns, instead of refitting the enlarged or reduced model from scratch.
+###################################################################################
+import numpy as np
+from scipy.linalg import cholesky, solve_triangular
+
+from .tracing import countEvent
+
+# Squared norm below which an appended (unit-scaled) column is treated as a
+# linear combination of the columns already in the model.
+collinear_tol = 1e-12
+
+###################################################################################
+# Column norms sqrt(diag(Z'Z)) used to scale the Gram matrix to unit diagonal
+###################################################################################
+def getColumnScale(stats, col_index):
+
+    d = np.sqrt(np.diag(stats['ZtZ'])[col_index])
+    d = np.where(d == 0, 1.0, d)
+
+    return d
+
+###################################################################################
+# Factorize the model with columns col_index of Z
+###################################################################################
+def getCholeskyFactor(stats, col_index):
+
+    index = list(col_index)
+
+    if len(index) == 0:
+
+        R = np.zeros((0, 0)); w = np.zeros(0)
+    else:
+
+        countEvent('factorizations')
+
+        d = getColumnScale(stats, index)
+        R = cholesky(stats['ZtZ'][np.ix_(index, index)]/np.outer(d, d), lower=False)
+        w = solve_triangular(R, stats['Zty'][index]/d, trans='T')
+
+    factor = {'index': index, 'R': R, 'w': w, 'resSS': stats['yty'] - w.dot(w)}
+
+    return factor
+
+###################################################################################
+# New column of R and new entry of w when column col of Z is appended:
+#   r = R^-T c,  rho = sqrt(1 - r'r),  u = (z_j'y - r'w)/rho
+# A column that is collinear with the model gives rho = 0 and u = 0.
+###################################################################################
+def _getAppendedColumn(stats, factor, col):
+
+    index = factor['index']; R = factor['R']; w = factor['w']
+
+    dj = getColumnScale(stats, [col])[0]
+
+    if len(index) == 0:
+
+        r = np.zeros(0)
+    else:
+
+        c = stats['ZtZ'][index, col]/(getColumnScale(stats, index)*dj)
+        r = solve_triangular(R, c, trans='T')
+
+    rho2 = stats['ZtZ'][col, col]/dj**2 - r.dot(r)
+
+    if rho2 <= collinear_tol:
+        return r, 0.0, 0.0
+
+    rho = np.sqrt(rho2)
+    u = (stats['Zty'][col]/dj - r.dot(w))/rho
+
+    return r, rho, u
+
+###################################################################################
+# Residual SS of the current model with column col of Z appended
+###################################################################################
+def getAppendedResidualSS(stats, factor, col):
+
+    r, rho, u = _getAppendedColumn(stats, factor, col)
+
+    return factor['resSS'] - u**2
+
+###################################################################################
+# Factor of the current model with column col of Z appended as the last column
+###################################################################################
+def appendCholeskyColumn(stats, factor, col):
+
+    r, rho, u = _getAppendedColumn(stats, factor, col)
+
+    if rho == 0:
+        raise np.linalg.LinAlgError('column %d is collinear with the current model' % col)
+
+    countEvent('cholesky_updates')
+
+    k = len(factor['index'])
+
+    R = np.zeros((k+1, k+1))
+    R[:k, :k] = factor['R']
+    R[:k, k] = r
+    R[k, k] = rho
+
+    new_factor = {
+        'index': factor['index'] + [col],
+        'R': R,
+        'w': np.append(factor['w'], u),
+        'resSS': factor['resSS'] - u**2,
+    }
+
+    return new_factor
+
+###################################################################################
+# Givens downdate: delete the column at position of the model from R. Dropping
+# the column leaves R upper Hessenberg below position; the rotations that restore
+# the triangular form are applied to w as well, and the last rotated entry of w
+# is the increase of the Residual SS caused by the deletion.
+###################################################################################
+def _deleteColumn(factor, position):
+
+    R = np.delete(factor['R'], position, axis=1)
+    w = factor['w'].copy()
+    k = R.shape[0]
+
+    for j in range(position, k-1):
+
+        a = R[j, j]; b = R[j+1, j]
+        h = np.hypot(a, b)
+
+        if h == 0:
+            continue
+
+        c = a/h; s = b/h
+
+        G = np.array([[c, s], [-s, c]])
+        R[j:j+2, j:] = G.dot(R[j:j+2, j:])
+        w[j:j+2] = G.dot(w[j:j+2])
+        R[j+1, j] = 0.0
+
+    return R[:k-1, :], w
+
+def getDeletedResidualSS(factor, position):
+
+    R, w = _deleteColumn(factor, position)
+
+    return factor['resSS'] + w[-1]**2
+
+def deleteCholeskyColumn(factor, position):
+
+    countEvent('cholesky_updates')
+
+    R, w = _deleteColumn(factor, position)
+
+    index = list(factor['index'])
+    del index[position]
+
+    new_factor = {
+        'index': index,
+        'R': R,
+        'w': w[:-1],
+        'resSS': factor['resSS'] + w[-1]**2,
+    }
+
+    return new_factor
@@ -0,0 +1,212 @@
+###################################################################################
+# Command line: stepwise-select DATA RESPONSE [--alpha ALPHA] [--engine ENGINE]
+#
+# DATA is a CSV (';' delimited, 'Date;Time;' first) or an .xlsx file, read
+# through its columnar cache (see column_cache), or the directory of a store of
+# chunk files larger than memory (see out_of_core); RESPONSE is a column name or
+# index. Every other column is a candidate predictor and the intercept is kept
+# in every model. Example:
+#   stepwise-select AirQualityUCI/AirQualityUCI.csv 'C6H6(GT)'
+###################################################################################
+import argparse
+import logging
+
+import numpy as np
+
+from .column_cache import loadColumnCache, getCacheMatrix
+from .missing_data import getMissingDataCrossProducts
+from .sweep import getSweepStepwisePredictors
+from .driver import getStepwiseSelection
+from .best_subsets import getBestSubsets, getBestSubsetModel, printBestSubsets
+from .sufficient_stats import getSubsetRatioRegressionSS, getSubsetAdjustedRatioRegressionSS, getSubsetAIC
+from .active_set import getActiveSetNames
+from .model_cache import getSubsetFit, setSolver
+from .solvers import solvers
+from .precision import (readRowChunks, getMixedPrecisionCrossProducts, getMixedPrecisionStepwise,
+                        getPrecisionDeviation, printPrecisionDeviation)
+from .screening import getScreenedStepwise
+from .out_of_core import (isChunkedFile, loadChunkedFile, getOutOfCoreCrossProducts, getOutOfCoreDiagnostics,
+                          printOutOfCoreDiagnostics)
+from .tracing import logger, writeTrace, printTrace
+
+engines = ['sweep', 'cholesky', 'best-subsets', 'screening']
+
+def getArgumentParser():
+
+    parser = argparse.ArgumentParser(prog='stepwise-select',
+                                     description='Stepwise selection of the predictors of a response.')
+
+    parser.add_argument('data', help="CSV or .xlsx file, 'Date;Time;' followed by the numeric columns, or the "
+                                     "directory of a store of chunk files")
+    parser.add_argument('response', help='name or index of the response column')
+    parser.add_argument('--alpha', type=float, default=0.05, help='level of the F tests (default 0.05)')
+    parser.add_argument('--engine', choices=engines, default='sweep', help='selection engine (default sweep)')
+    parser.add_argument('--solver', choices=sorted(solvers), default='cholesky',
+                        help='least squares solver of the fits (default cholesky)')
+    parser.add_argument('--precision', choices=['float64', 'mixed'], default='float64',
+                        help='mixed: float32 rows, float64 cross-products and refinement, with the deviation '
+                             'from float64 (sweep engine only; default float64)')
+    parser.add_argument('--screen-size', type=int,
+                        help='candidates kept by the marginal correlation screening of the screening engine '
+                             '(default n/log(n))')
+    parser.add_argument('--criterion', choices=['AIC', 'Cp', 'adjR2'], default='AIC',
+                        help='criterion of the best-subsets engine (default AIC)')
+    parser.add_argument('--missing', choices=['complete', 'threshold', 'pairwise'],
+                        help='handling of the missing values, tagged -200 (default threshold as in main.py, '
+                             'complete for a store)')
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help='largest fraction of missing values of a kept column (default 0.5)')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='threads reading and multiplying the row blocks of a store (default 2)')
+    parser.add_argument('--skip-header', type=int, default=1, help='lines before the data (default 1)')
+    parser.add_argument('--delimiter', default=';', help="CSV delimiter (default ';')")
+    parser.add_argument('--plot', metavar='FILE', help='save the criteria of the best subsets to FILE')
+    parser.add_argument('--trace', metavar='FILE', help='write the phase timings, counters and steps to FILE (JSON)')
+    parser.add_argument('--timings', action='store_true', help='print the phase timings and counters')
+    parser.add_argument('-v', '--verbose', action='store_true', help='log every phase and step')
+
+    return parser
+
+###################################################################################
+# Column index of the response given by name or by index
+###################################################################################
+def getResponseColumn(names, response):
+
+    if response in names:
+        return names.index(response)
+
+    try:
+        col = int(response)
+    except ValueError:
+        raise SystemExit('stepwise-select: no column %r in %s' % (response, ', '.join(names)))
+
+    if not 0 <= col < len(names):
+        raise SystemExit('stepwise-select: column index %d out of range 0..%d' % (col, len(names)-1))
+
+    return col
+
+def main(argv=None):
+
+    parser = getArgumentParser()
+    args = parser.parse_args(argv)
+
+    out_of_core = isChunkedFile(args.data)
+
+    # Complete-case rows of every column leave few rows when a column is mostly
+    # missing (NMHC(GT) of AirQuality), so CSV sources drop those columns first
+    if args.missing is None:
+        args.missing = 'complete' if out_of_core else 'threshold'
+
+    if args.missing == 'pairwise' and args.solver != 'cholesky':
+        parser.error('the %s solver needs the rows, which the pairwise cross-products do not have' % args.solver)
+
+    if args.precision == 'mixed' and (args.engine != 'sweep' or args.missing == 'pairwise' or args.solver != 'cholesky'):
+        parser.error('the mixed precision needs the sweep engine, the cholesky solver and complete rows')
+
+    if args.engine == 'screening' and args.missing == 'pairwise':
+        parser.error('the screening engine needs the rows, which the pairwise cross-products do not have')
+
+    if out_of_core and (args.missing != 'complete' or args.precision == 'mixed' or args.engine == 'screening'):
+        parser.error('a store is read in row blocks, with complete rows and the sweep, cholesky or best-subsets engine')
+
+    logging.basicConfig(format='%(message)s')
+
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+
+    if out_of_core:
+
+        store = loadChunkedFile(args.data)
+        names = store['names']
+
+        response_col = getResponseColumn(names, args.response)
+
+        stats = getOutOfCoreCrossProducts(store, response_col, workers=args.workers,
+                                          row_factor=(args.solver != 'cholesky'))
+    else:
+
+        try:
+            cache = loadColumnCache(args.data, skip_header=args.skip_header, delimiter=args.delimiter)
+        except ValueError as error:
+            parser.error('cannot read %s: %s (check --skip-header and --delimiter)' % (args.data, error))
+        names = cache['names']
+
+        response_col = getResponseColumn(names, args.response)
+        data = getCacheMatrix(cache, names)
+
+        stats = getMissingDataCrossProducts(data, response_col, args.missing, args.threshold, cache['missing'],
+                                            row_factor=(args.solver != 'cholesky'))
+
+        # The complete rows of the columns of stats, for the engines that read the rows
+        keep = ~np.asarray(cache['missing'])[:, [response_col]+stats['columns']].any(axis=1)
+
+    setSolver(stats, args.solver)
+
+    Z_names = ['Intercept'] + [names[j] for j in stats['columns']]
+
+    print('Response: %s (n = %d)' % (names[response_col], stats['n']))
+
+    best_models = None
+    columns = stats['columns']
+
+    if args.engine == 'sweep' and args.precision == 'mixed':
+
+        data32 = getCacheMatrix(cache, names, dtype=np.float32)
+        mixed_stats = getMixedPrecisionCrossProducts(readRowChunks(data32, keep, columns+[response_col]), len(columns))
+
+        model = getMixedPrecisionStepwise(mixed_stats, args.alpha)
+        active = model['index']
+
+        printPrecisionDeviation(getPrecisionDeviation(model, getSweepStepwisePredictors(stats, args.alpha)))
+
+        stats = mixed_stats
+
+    elif args.engine == 'sweep':
+        active = getSweepStepwisePredictors(stats, args.alpha)['index']
+
+    elif args.engine == 'cholesky':
+        active, trace = getStepwiseSelection(stats, args.alpha)
+
+    elif args.engine == 'screening':
+
+        readChunks = lambda: readRowChunks(data, keep, columns+[response_col], dtype=float)
+        model = getScreenedStepwise(readChunks, len(columns), args.alpha, args.screen_size)
+
+        print('Screened: %d of %d candidates' % (len(model['screened']), len(columns)))
+
+        # Column j of the rows is column j+1 of the Z of stats
+        active = [0] + [j+1 for j in model['columns']]
+
+    else:
+        best_models, counter = getBestSubsets(stats)
+        printBestSubsets(best_models, Z_names)
+        active = getBestSubsetModel(best_models, args.criterion)['index']
+
+    print('Selected Predictors: ')
+    print(getActiveSetNames(Z_names, active))
+    print('R2: ', getSubsetRatioRegressionSS(stats, active))
+    print('Adjusted R2: ', getSubsetAdjustedRatioRegressionSS(stats, active))
+    print('AIC: ', getSubsetAIC(stats, active))
+
+    fit = getSubsetFit(stats, active)
+    print('Solver: %s (rank %d, condition estimate %.4g)' % (fit['solver'], fit['rank'], fit['cond']))
+
+    if out_of_core:
+        printOutOfCoreDiagnostics(getOutOfCoreDiagnostics(store, stats, active, response_col, workers=args.workers))
+
+    if args.plot is not None:
+
+        from .plotting import plotBestSubsetCriterion
+
+        if best_models is None:
+            best_models, counter = getBestSubsets(stats)
+
+        plotBestSubsetCriterion(best_models, args.criterion, args.plot)
+
+    if args.timings:
+        printTrace()
+
+    if args.trace is not None:
+        writeTrace(args.trace)
+
+    return 0
@@ -0,0 +1,258 @@
+###################################################################################
+# Binary columnar cache of the AirQuality data
+#
+# The CSV (or the .xlsx) is parsed once and every numeric column is written to
+# its own .npy file next to the source, together with the timestamps, the mask
+# of the -200 missing values and a meta.json with the column names, the dtypes
+# and the signature (size, mtime, sha256) of the source. Later runs open the
+# columns with np.load(mmap_mode='r'), which takes milliseconds, and processes
+# that open the same cache share its pages through the OS page cache instead of
+# each holding a private copy of the data.
+###################################################################################
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from .tracing import timePhase, countEvent
+
+missing_value = -200
+cache_version = 1
+
+###################################################################################
+# Size, mtime and content hash of the source file
+###################################################################################
+def getSourceSignature(source_url, content_hash=True):
+
+    info = os.stat(source_url)
+
+    signature = {'size': info.st_size, 'mtime': info.st_mtime_ns, 'sha256': None}
+
+    if content_hash:
+
+        digest = hashlib.sha256()
+
+        with open(source_url, 'rb') as source_file:
+            for block in iter(lambda: source_file.read(1 << 20), b''):
+                digest.update(block)
+
+        signature['sha256'] = digest.hexdigest()
+
+    return signature
+
+###################################################################################
+# Read the CSV: 'Date;Time;' followed by the numeric columns. Blank rows (only
+# delimiters) are skipped; skip_header is the number of lines before the data.
+# A row of column numbers right after the skipped lines (the second line of
+# AirQualityUCI.csv) has no date and is skipped as well.
+###################################################################################
+def _readCsvTable(source_url, skip_header=1, delimiter=';'):
+
+    with open(source_url) as source_file:
+
+        header = source_file.readline().rstrip('\n').split(delimiter)
+        lines = source_file.readlines()[skip_header-1:]
+
+    lines = [line for line in lines if line.strip().strip(delimiter) != '']
+
+    if lines and '/' not in lines[0].split(delimiter, 1)[0]:
+        lines = lines[1:]
+
+    usecols = [j for j in range(2, len(header)) if header[j].strip() != '']
+    names = [header[j].strip() for j in usecols]
+
+    values = np.loadtxt(lines, delimiter=delimiter, usecols=usecols, dtype=float, ndmin=2)
+
+    # dd/mm/yyyy and HH.MM.SS to ISO 8601
+    stamps = []
+    for line in lines:
+        date, clock = line.split(delimiter, 2)[:2]
+        day, month, year = date.strip().split('/')
+        stamps.append('%s-%s-%sT%s' % (year, month, day, clock.strip().replace('.', ':')))
+
+    timestamp = np.array(stamps, dtype='datetime64[s]')
+
+    return names, timestamp, values
+
+###################################################################################
+# Read the first sheet of the .xlsx: Date, Time and the numeric columns. Needs
+# openpyxl, which is only imported when an .xlsx source is cached.
+###################################################################################
+def _readXlsxTable(source_url):
+
+    try:
+        import openpyxl
+    except ImportError:
+        raise ImportError('openpyxl is required to read %s' % source_url)
+
+    workbook = openpyxl.load_workbook(source_url, read_only=True, data_only=True)
+
+    try:
+
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows)
+
+        usecols = [j for j in range(2, len(header)) if header[j] is not None]
+        names = [str(header[j]).strip() for j in usecols]
+
+        stamps = []; values = []
+        for row in rows:
+
+            if row[0] is None:
+                continue
+
+            stamps.append(np.datetime64(row[0].replace(hour=row[1].hour, minute=row[1].minute,
+                                                       second=row[1].second), 's'))
+            values.append([row[j] for j in usecols])
+
+    finally:
+        workbook.close()
+
+    return names, np.array(stamps, dtype='datetime64[s]'), np.array(values, dtype=float).reshape(-1, len(names))
+
+def _getCacheDir(source_url, cache_dir):
+
+    return source_url + '.cache' if cache_dir is None else cache_dir
+
+###################################################################################
+# Parse the source and write the cache. A column is stored as int64 when all of
+# its values are integers and as float64 otherwise. meta.json is written last,
+# so a cache whose writing was interrupted is never taken as valid.
+###################################################################################
+def writeColumnCache(source_url, cache_dir=None, skip_header=1, delimiter=';'):
+
+    cache_dir = _getCacheDir(source_url, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    meta_url = os.path.join(cache_dir, 'meta.json')
+    if os.path.exists(meta_url):
+        os.remove(meta_url)
+
+    if source_url.lower().endswith('.xlsx'):
+        names, timestamp, values = _readXlsxTable(source_url)
+    else:
+        names, timestamp, values = _readCsvTable(source_url, skip_header, delimiter)
+
+    dtypes = []; files = []
+    for j in range(len(names)):
+
+        column = values[:, j]
+
+        if np.all(np.isfinite(column)) and np.all(column == np.round(column)):
+            column = column.astype(np.int64)
+
+        files.append('column_%02d.npy' % j)
+        dtypes.append(column.dtype.name)
+
+        np.save(os.path.join(cache_dir, files[j]), column)
+
+    np.save(os.path.join(cache_dir, 'timestamp.npy'), timestamp)
+    np.save(os.path.join(cache_dir, 'missing.npy'), values == missing_value)
+
+    meta = {
+        'version': cache_version,
+        'source': getSourceSignature(source_url),
+        'skip_header': skip_header,
+        'n': int(values.shape[0]),
+        'names': names,
+        'dtypes': dtypes,
+        'files': files,
+    }
+
+    with open(meta_url, 'w') as meta_file:
+        json.dump(meta, meta_file, indent=1)
+
+    return meta
+
+###################################################################################
+# Check the meta data of a cache against its source. A different size means a
+# stale cache; the same size and mtime a valid one, without reading the source.
+# Otherwise (the file was touched or copied) the content hash decides, and the
+# new mtime is recorded when the content is unchanged.
+###################################################################################
+def isColumnCacheValid(meta, source_url, skip_header=1, cache_dir=None):
+
+    if meta is None or meta.get('version') != cache_version or meta.get('skip_header') != skip_header:
+        return False
+
+    signature = getSourceSignature(source_url, content_hash=False)
+
+    if signature['size'] != meta['source']['size']:
+        return False
+
+    if signature['mtime'] == meta['source']['mtime']:
+        return True
+
+    if getSourceSignature(source_url)['sha256'] != meta['source']['sha256']:
+        return False
+
+    meta['source']['mtime'] = signature['mtime']
+
+    with open(os.path.join(_getCacheDir(source_url, cache_dir), 'meta.json'), 'w') as meta_file:
+        json.dump(meta, meta_file, indent=1)
+
+    return True
+
+###################################################################################
+# Open the cache of a source, (re)building it first when it is missing or stale.
+# Returns a dict with
+#   'names', 'dtypes'  the numeric columns and their dtypes
+#   'columns'          name -> read-only memory-mapped column
+#   'timestamp'        memory-mapped datetime64[s] of every row
+#   'missing'          memory-mapped n x p mask of the -200 values
+#   'n'                number of rows
+###################################################################################
+def loadColumnCache(source_url, cache_dir=None, skip_header=1, delimiter=';', rebuild=False):
+
+    cache_dir = _getCacheDir(source_url, cache_dir)
+    meta_url = os.path.join(cache_dir, 'meta.json')
+
+    meta = None
+    if not rebuild and os.path.exists(meta_url):
+        with open(meta_url) as meta_file:
+            meta = json.load(meta_file)
+
+    with timePhase('ingest'):
+
+        if not isColumnCacheValid(meta, source_url, skip_header, cache_dir):
+            countEvent('column_cache_builds')
+            meta = writeColumnCache(source_url, cache_dir, skip_header, delimiter)
+
+    columns = {}
+    for name, file_name in zip(meta['names'], meta['files']):
+        columns[name] = np.load(os.path.join(cache_dir, file_name), mmap_mode='r')
+
+    cache = {
+        'names': meta['names'],
+        'dtypes': meta['dtypes'],
+        'columns': columns,
+        'timestamp': np.load(os.path.join(cache_dir, 'timestamp.npy'), mmap_mode='r'),
+        'missing': np.load(os.path.join(cache_dir, 'missing.npy'), mmap_mode='r'),
+        'n': meta['n'],
+    }
+
+    return cache
+
+###################################################################################
+# Rows start:stop of the columns names as one float matrix (of dtype, e.g.
+# np.float32 to hold the rows in half the memory, see precision)
+###################################################################################
+def getCacheMatrix(cache, names, start=0, stop=None, dtype=float):
+
+    return np.column_stack([np.asarray(cache['columns'][name][start:stop], dtype=dtype) for name in names])
+
+###################################################################################
+# Generator of chunks of the columns names, in the form of ingest.readCsvChunks,
+# so that getStreamingCrossProducts can read the cache instead of the CSV
+###################################################################################
+def readCacheChunks(cache, names, chunk_rows=65536, max_rows=None, dtype=float):
+
+    stop = cache['n'] if max_rows is None else min(max_rows, cache['n'])
+
+    for start in range(0, stop, chunk_rows):
+
+        with timePhase('ingest'):
+            chunk = getCacheMatrix(cache, names, start, min(start+chunk_rows, stop), dtype)
+
+        yield chunk
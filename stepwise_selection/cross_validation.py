@@ -0,0 +1,182 @@
+###################################################################################
+# K-fold cross-validation from the cross-products of the folds
+#
+# The cross-products of each held-out fold are computed once, in one pass over
+# the rows, and their sum is the total. The training statistics of fold k are
+# the total minus fold k, and the prediction error of a model fitted on them is
+# also a function of the held-out cross-products only:
+#   SSE_k = y_k'y_k - 2 beta'Z_k'y_k + beta'Z_k'Z_k beta
+# so no fold is ever refitted from the rows. Along the stepwise path each
+# training matrix is swept one step at a time (see sweep), and the CV error of
+# the whole path costs about one fit per fold.
+###################################################################################
+import numpy as np
+
+from .sufficient_stats import getCrossProducts, getSubsetCoefficients
+from .sweep import getAugmentedCrossProducts, sweepOperator
+
+###################################################################################
+# Fold of every row: 'blocked' folds are contiguous blocks of rows (for time
+# series, so that a fold is a period of time), 'random' folds a shuffle
+###################################################################################
+def getFoldIndex(observations, n_folds=5, mode='blocked', seed=0):
+
+    n = observations
+
+    folds = np.arange(n)*n_folds//n
+
+    if mode == 'random':
+        folds = np.random.default_rng(seed).permutation(folds)
+    elif mode != 'blocked':
+        raise ValueError("mode must be 'blocked' or 'random', not %r" % (mode,))
+
+    return folds
+
+###################################################################################
+# Cross-products of every fold (rows of Z with the responses) and their total
+###################################################################################
+def getFoldCrossProducts(data, response, folds):
+
+    z = np.asarray(data, dtype=float); y = np.asarray(response, dtype=float)
+    folds = np.asarray(folds)
+
+    fold_stats = [getCrossProducts(z[folds == k], y[folds == k]) for k in range(folds.max()+1)]
+
+    total = {key: sum(stats[key] for stats in fold_stats) for key in ['ZtZ', 'Zty', 'yty', 'ysum', 'n']}
+
+    return {'folds': fold_stats, 'total': total}
+
+###################################################################################
+# Training statistics of fold k: the total minus the held-out fold
+###################################################################################
+def getTrainingStats(cv_stats, k):
+
+    total = cv_stats['total']; held_out = cv_stats['folds'][k]
+
+    return {key: total[key]-held_out[key] for key in ['ZtZ', 'Zty', 'yty', 'ysum', 'n']}
+
+###################################################################################
+# Sum of squared errors on the held-out fold of the coefficients beta of the
+# columns col_index
+###################################################################################
+def getHeldOutSS(held_out, col_index, beta):
+
+    index = np.atleast_1d(col_index)
+
+    ZtZ = held_out['ZtZ'][np.ix_(index, index)]
+    Zty = held_out['Zty'][index]
+
+    return held_out['yty'] - 2*beta.dot(Zty) + beta.dot(ZtZ).dot(beta)
+
+###################################################################################
+# CV mean squared error of every model (a list of column index sets): each is
+# fitted on every training fold and scored on its held-out fold. Returns a
+# dict with 'mse' and its standard error 'se' per model, and the matrix
+# 'fold_mse' (models x folds).
+###################################################################################
+def getSubsetsCrossValidation(cv_stats, models):
+
+    K = len(cv_stats['folds'])
+
+    fold_mse = np.zeros((len(models), K))
+
+    for k in range(K):
+
+        train = getTrainingStats(cv_stats, k); held_out = cv_stats['folds'][k]
+
+        for i, index in enumerate(models):
+            beta = getSubsetCoefficients(train, index)
+            fold_mse[i, k] = getHeldOutSS(held_out, index, beta)/held_out['n']
+
+    return _getCrossValidationSummary(cv_stats, fold_mse)
+
+def _getCrossValidationSummary(cv_stats, fold_mse):
+
+    K = fold_mse.shape[1]
+    weights = np.array([held_out['n'] for held_out in cv_stats['folds']], dtype=float)
+
+    mse = fold_mse.dot(weights)/weights.sum()
+    se = np.std(fold_mse, axis=1, ddof=1)/np.sqrt(K) if K > 1 else np.zeros(len(mse))
+
+    return {'mse': mse, 'se': se, 'fold_mse': fold_mse}
+
+###################################################################################
+# The models along a stepwise path: init_active, then the model after every
+# add or drop of the trace (see driver.getStepwiseSelection)
+###################################################################################
+def getStepwisePathModels(trace, init_active=(0,)):
+
+    active = sorted(int(j) for j in init_active)
+    models = [list(active)]; actions = [None]
+
+    for entry in trace:
+
+        if entry['action'] == 'add':
+            active = sorted(active + [entry['variable']])
+        elif entry['action'] == 'drop':
+            active = [j for j in active if j != entry['variable']]
+        else:
+            continue
+
+        models.append(list(active)); actions.append((entry['action'], entry['variable']))
+
+    return models, actions
+
+###################################################################################
+# CV error of every model on the stepwise path. For every fold the training
+# matrix is swept along the path, one sweep per step, and the coefficients of
+# each model are read off the swept matrix. Returns the dict of
+# getSubsetsCrossValidation with the keys 'index' and 'action' of the path.
+###################################################################################
+def getPathCrossValidation(cv_stats, trace, init_active=(0,)):
+
+    models, actions = getStepwisePathModels(trace, init_active)
+
+    K = len(cv_stats['folds'])
+    p = cv_stats['total']['ZtZ'].shape[0]
+
+    fold_mse = np.zeros((len(models), K))
+
+    for k in range(K):
+
+        held_out = cv_stats['folds'][k]
+
+        A, d = getAugmentedCrossProducts(getTrainingStats(cv_stats, k))
+
+        in_model = np.zeros(p, dtype=bool)
+        for j in models[0]:
+            sweepOperator(A, j); in_model[j] = True
+
+        for i in range(len(models)):
+
+            if actions[i] is not None:
+                action, j = actions[i]
+                sweepOperator(A, j, inverse=(action == 'drop'))
+                in_model[j] = (action == 'add')
+
+            index = np.flatnonzero(in_model)
+            beta = A[:p, p][index]*d[p]/d[:p][index]
+
+            fold_mse[i, k] = getHeldOutSS(held_out, index, beta)/held_out['n']
+
+    cv = _getCrossValidationSummary(cv_stats, fold_mse)
+    cv['index'] = models; cv['action'] = actions
+
+    return cv
+
+###################################################################################
+# Print the CV error along the path; names are the column names of Z
+###################################################################################
+def printPathCrossValidation(cv, names=None):
+
+    print('%4s  %-6s  %-16s  %14s  %12s' % ('step', 'action', 'variable', 'CV MSE', 'SE'))
+
+    for i in range(len(cv['index'])):
+
+        if cv['action'][i] is None:
+            action, name = 'init', ''
+        else:
+            action, j = cv['action'][i]
+            name = names[j] if names is not None else str(j)
+
+        print('%4d  %-6s  %-16s  %14.6g  %12.4g' % (i, action, name, cv['mse'][i], cv['se'][i]))
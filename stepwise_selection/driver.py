@@ -0,0 +1,194 @@
+###################################################################################
+# Iterative stepwise driver with a step trace
+#
+# The selection is a loop over steps on an active set and the Cholesky factor of
+# its model: each step adds the candidate with the largest F-to-enter if it is
+# significant, then drops the predictor with the smallest F-to-remove while it is
+# not. Memory is bounded by the p x p cross-products whatever the number of
+# steps, the loop stops after max_steps, and it stops as soon as an active set
+# that was already visited comes back (a cycle).
+###################################################################################
+import time
+
+import numpy as np
+
+from .active_set import getActiveSet, getInactiveSet, addToActiveSet, dropFromActiveSet
+from .cholesky_updates import (getCholeskyFactor, appendCholeskyColumn, getDeletedResidualSS,
+                               deleteCholeskyColumn)
+from .scoring import getCandidateScores
+from .model_cache import getCriticalValue
+from .tracing import timePhase, recordEvent
+
+###################################################################################
+# One entry of the trace:
+#   'step'      step number, starting from 1
+#   'action'    'add', 'drop' or 'cycle'
+#   'variable'  column of Z that was added or dropped
+#   'F'         F-ratio of the variable, 'c_value' the critical value
+#   'resSS'     Residual SS of the model after the action
+#   'time'      wall-clock seconds spent on the action
+###################################################################################
+def _getTraceEntry(step, action, col, F, c_value, resSS, seconds):
+
+    entry = {
+        'step': step,
+        'action': action,
+        'variable': None if col is None else int(col),
+        'F': None if F is None else float(F),
+        'c_value': None if c_value is None else float(c_value),
+        'resSS': float(resSS),
+        'time': seconds,
+    }
+
+    return entry
+
+###################################################################################
+# Forward step: add the candidate with the largest F-to-enter if significant.
+# Returns the new active set and factor, and the trace entry (None if no add).
+###################################################################################
+def getForwardStep(stats, active, factor, alpha_value, step=0):
+
+    alpha = alpha_value; n = stats['n']
+    p = stats['ZtZ'].shape[0]
+
+    start = time.perf_counter()
+
+    candidates = getInactiveSet(active, p)
+
+    if candidates.size == 0 or n-active.size-1 <= 0:
+        return active, factor, None
+
+    with timePhase('scoring'):
+        scores = getCandidateScores(stats, factor, candidates)
+
+    with timePhase('f_test'):
+
+        best = int(np.argmax(scores['reduction']))
+        df1, df2 = scores['df']
+
+        F = scores['F'][best]
+        c_value = getCriticalValue(alpha, df1, df2)
+
+        if not F > c_value:
+            return active, factor, None
+
+        col = candidates[best]
+        factor = appendCholeskyColumn(stats, factor, col)
+        active = addToActiveSet(active, col)
+
+    entry = _getTraceEntry(step, 'add', col, F, c_value, factor['resSS'], time.perf_counter()-start)
+
+    return active, factor, entry
+
+###################################################################################
+# Backward step: drop the predictor (not in forced) with the smallest
+# F-to-remove if it is not significant. Returns the new active set and factor,
+# and the trace entry (None if no drop).
+###################################################################################
+def getBackwardStep(stats, active, factor, alpha_value, forced=(0,), step=0):
+
+    with timePhase('backward'):
+        return _getBackwardStep(stats, active, factor, alpha_value, forced, step)
+
+def _getBackwardStep(stats, active, factor, alpha_value, forced, step):
+
+    alpha = alpha_value; n = stats['n']
+
+    start = time.perf_counter()
+
+    positions = [i for i, col in enumerate(factor['index']) if col not in forced]
+
+    if len(positions) == 0:
+        return active, factor, None
+
+    df2 = n-active.size
+
+    F_vec = np.array([(getDeletedResidualSS(factor, i)-factor['resSS'])/(factor['resSS']/df2)
+                      for i in positions])
+
+    weakest = int(np.argmin(F_vec))
+
+    F = F_vec[weakest]
+    c_value = getCriticalValue(alpha, 1, df2)
+
+    if F > c_value:
+        return active, factor, None
+
+    col = factor['index'][positions[weakest]]
+    factor = deleteCholeskyColumn(factor, positions[weakest])
+    active = dropFromActiveSet(active, col)
+
+    entry = _getTraceEntry(step, 'drop', col, F, c_value, factor['resSS'], time.perf_counter()-start)
+
+    return active, factor, entry
+
+###################################################################################
+# Stepwise selection from init_active. Returns the selected active set and the
+# trace, a list with one entry per added or dropped variable.
+###################################################################################
+def getStepwiseSelection(stats, alpha_value, init_active=(0,), forced=(0,), max_steps=None):
+
+    alpha = alpha_value
+    p = stats['ZtZ'].shape[0]
+
+    if max_steps is None:
+        max_steps = 4*p
+
+    active = getActiveSet(init_active)
+    factor = getCholeskyFactor(stats, active)
+
+    trace = []
+    visited = {tuple(active)}
+
+    while len(trace) < max_steps:
+
+        changed = False
+
+        # Forward: add at most one predictor
+        active, factor, entry = getForwardStep(stats, active, factor, alpha, len(trace)+1)
+
+        if entry is not None:
+            trace.append(entry); changed = True
+
+        # Backward: drop predictors while the weakest one is not significant
+        while len(trace) < max_steps:
+
+            active, factor, entry = getBackwardStep(stats, active, factor, alpha, forced, len(trace)+1)
+
+            if entry is None:
+                break
+
+            trace.append(entry); changed = True
+
+        if not changed:
+            break
+
+        if tuple(active) in visited:
+
+            trace.append(_getTraceEntry(len(trace)+1, 'cycle', None, None, None, factor['resSS'], 0.0))
+            break
+
+        visited.add(tuple(active))
+
+    for entry in trace:
+        recordEvent('step', engine='cholesky', **entry)
+
+    return active, trace
+
+###################################################################################
+# Print the trace as a table; names are the column names of Z
+###################################################################################
+def printStepwiseTrace(trace, names=None):
+
+    print('%4s  %-6s  %-16s  %14s  %10s  %16s  %10s' % ('step', 'action', 'variable', 'F', 'c_value',
+                                                         'RSS', 'time (s)'))
+
+    for entry in trace:
+
+        col = entry['variable']
+        name = '' if col is None else (names[col] if names is not None else str(col))
+        F = '' if entry['F'] is None else '%14.6g' % entry['F']
+        c_value = '' if entry['c_value'] is None else '%10.4f' % entry['c_value']
+
+        print('%4d  %-6s  %-16s  %14s  %10s  %16.6g  %10.6f' % (entry['step'], entry['action'], name, F,
+                                                               c_value, entry['resSS'], entry['time']))
@@ -0,0 +1,237 @@
+###################################################################################
+# Lazy feature expansion of an hourly series
+#
+# A feature is declared by a spec tuple over the columns of the data, whose
+# rows are consecutive hours:
+#   ('raw', j)         column j
+#   ('lag', j, h)      column j h hours earlier
+#   ('mean', j, h)     mean of column j over the last h hours (this one included)
+#   ('product', j, k)  column j times column k
+# The columns of the specs are only generated on demand, block_size specs at a
+# time, from the raw columns of the data. getFeaturePool gives a column pool of
+# screening ([1 features]) whose cross-products with y, and with a column that
+# enters the model, are accumulated block by block, so the stepwise engine of
+# screening searches every feature without the n x q matrix of the features
+# ever being allocated.
+###################################################################################
+import numpy as np
+
+from .screening import getScreenedColumns, getPoolStepwise
+from .tracing import timePhase, countEvent
+
+###################################################################################
+# Specs of the columns: raw, lags 1..24 h, means over windows hours and the
+# pairwise products of the columns
+###################################################################################
+def getFeatureSpecs(columns, lags=range(1, 25), windows=(3, 6, 12, 24), interactions=True, raw=True):
+
+    columns = list(columns)
+
+    specs = [('raw', j) for j in columns] if raw else []
+    specs += [('lag', j, h) for j in columns for h in lags]
+    specs += [('mean', j, h) for j in columns for h in windows]
+
+    if interactions:
+        specs += [('product', j, k) for a, j in enumerate(columns) for k in columns[a+1:]]
+
+    return specs
+
+def getFeatureNames(specs, names):
+
+    labels = {
+        'raw': lambda spec: names[spec[1]],
+        'lag': lambda spec: '%s_lag%d' % (names[spec[1]], spec[2]),
+        'mean': lambda spec: '%s_mean%d' % (names[spec[1]], spec[2]),
+        'product': lambda spec: '%s*%s' % (names[spec[1]], names[spec[2]]),
+    }
+
+    return [labels[spec[0]](spec) for spec in specs]
+
+###################################################################################
+# Hours of the series before a feature of the spec is defined
+###################################################################################
+def _getLookBack(spec):
+
+    if spec[0] == 'lag':
+        return spec[2]
+
+    if spec[0] == 'mean':
+        return spec[2]-1
+
+    return 0
+
+def _getSourceColumns(spec):
+
+    return list(spec[2:]) if spec[0] == 'product' else [spec[1]]
+
+###################################################################################
+# Rows where every feature of the specs and the response are defined: after the
+# longest look-back, and with no missing value (mask) of a source column over
+# the look-back, nor of the response
+###################################################################################
+def getFeatureRows(specs, n_rows, response_col, mask=None):
+
+    look_back = max([_getLookBack(spec) for spec in specs] + [0])
+
+    rows = np.arange(n_rows) >= look_back
+
+    if mask is not None:
+
+        mask = np.asarray(mask)[:n_rows]
+        sources = sorted(set(j for spec in specs for j in _getSourceColumns(spec)))
+
+        # Missing source values in the look-back window of every row, as a
+        # difference of cumulative counts
+        count = np.concatenate(([0], np.cumsum(mask[:, sources].any(axis=1))))
+        start = np.maximum(np.arange(n_rows)-look_back, 0)
+
+        rows &= count[1:] == count[start]
+        rows &= ~mask[:, response_col]
+
+    return rows
+
+###################################################################################
+# Columns of the specs over the rows (a boolean mask of the rows of data)
+###################################################################################
+def getFeatureBlock(data, specs, rows):
+
+    countEvent('feature_blocks')
+
+    with timePhase('features'):
+
+        n_rows = len(rows)
+        block = np.empty((int(np.count_nonzero(rows)), len(specs)))
+
+        for i, spec in enumerate(specs):
+
+            x = np.asarray(data[:n_rows, spec[1]], dtype=float)
+
+            if spec[0] == 'lag':
+                x = np.concatenate((np.full(spec[2], np.nan), x[:n_rows-spec[2]]))
+
+            elif spec[0] == 'mean':
+                h = spec[2]
+                total = np.concatenate(([0.0], np.cumsum(x)))
+                x = np.concatenate((np.full(h-1, np.nan), (total[h:]-total[:-h])/h))
+
+            elif spec[0] == 'product':
+                x = x*np.asarray(data[:n_rows, spec[2]], dtype=float)
+
+            block[:, i] = x[rows]
+
+    return block
+
+###################################################################################
+# Generator of (start, block) of the columns of the specs, block_size at a time
+###################################################################################
+def readFeatureBlocks(data, specs, rows, block_size=256):
+
+    for start in range(0, len(specs), block_size):
+        yield start, getFeatureBlock(data, specs[start:start+block_size], rows)
+
+###################################################################################
+# Marginal statistics of the features in the form of screening.getMarginalStats
+# (for screening.getScreenedColumns; 'columns' are the positions of the specs).
+# Each block has all the rows, so the columns are centred exactly.
+###################################################################################
+def getFeatureMarginalStats(data, response_col, specs, rows, block_size=256):
+
+    y = np.asarray(data[:len(rows), response_col], dtype=float)[rows]
+    ymean = y.mean(); y = y-ymean
+
+    q = len(specs)
+
+    marginal = {
+        'n': y.shape[0],
+        'sum': np.zeros(q),
+        'sumsq': np.zeros(q),
+        'Xty': np.zeros(q),
+        'ysum': 0.0,
+        'yty': y.dot(y),
+        'shift': np.zeros(q),
+        'yshift': ymean,
+        'columns': list(range(q)),
+    }
+
+    for start, block in readFeatureBlocks(data, specs, rows, block_size):
+
+        with timePhase('screening'):
+
+            stop = start+block.shape[1]
+
+            mean = block.mean(axis=0)
+            block -= mean
+
+            marginal['shift'][start:stop] = mean
+            marginal['sumsq'][start:stop] = np.einsum('ij,ij->j', block, block)
+            marginal['Xty'][start:stop] = block.T.dot(y)
+
+    return marginal
+
+###################################################################################
+# Column pool of screening for Z = [1 features of specs] over the rows: 'Zty'
+# and 'diag' are accumulated block by block, and gram_column(j) generates z_j
+# and its products with every block. 'columns' are the positions of the specs.
+###################################################################################
+def getFeaturePool(data, response_col, specs, rows, block_size=256):
+
+    y = np.asarray(data[:len(rows), response_col], dtype=float)[rows]
+    n = y.shape[0]; q = len(specs)+1
+
+    Zty = np.empty(q); diag = np.empty(q)
+    Zty[0] = y.sum(); diag[0] = n
+
+    for start, block in readFeatureBlocks(data, specs, rows, block_size):
+
+        with timePhase('gram'):
+            Zty[start+1:start+1+block.shape[1]] = block.T.dot(y)
+            diag[start+1:start+1+block.shape[1]] = np.einsum('ij,ij->j', block, block)
+
+    def gram_column(j):
+
+        countEvent('gram_columns')
+
+        z = np.ones(n) if j == 0 else getFeatureBlock(data, [specs[j-1]], rows)[:, 0]
+
+        column = np.empty(q)
+        column[0] = z.sum()
+
+        for start, block in readFeatureBlocks(data, specs, rows, block_size):
+
+            with timePhase('gram'):
+                column[start+1:start+1+block.shape[1]] = block.T.dot(z)
+
+        return column
+
+    pool = {
+        'Zty': Zty,
+        'diag': diag,
+        'yty': y.dot(y),
+        'ysum': y.sum(),
+        'n': n,
+        'columns': list(range(len(specs))),
+        'gram_column': gram_column,
+    }
+
+    return pool
+
+###################################################################################
+# Stepwise selection over the features of the specs (screening.getPoolStepwise).
+# With size, only the size features of largest marginal correlation with y are
+# searched. The model has the extra keys 'rows' and 'specs' (the specs selected).
+###################################################################################
+def getFeatureStepwise(data, response_col, specs, alpha_value, mask=None, size=None, block_size=256):
+
+    rows = getFeatureRows(specs, data.shape[0], response_col, mask)
+
+    if size is not None:
+        marginal = getFeatureMarginalStats(data, response_col, specs, rows, block_size)
+        specs = [specs[i] for i in getScreenedColumns(marginal, size)]
+
+    pool = getFeaturePool(data, response_col, specs, rows, block_size)
+
+    model = getPoolStepwise(pool, alpha_value)
+    model['rows'] = rows
+    model['specs'] = [specs[i] for i in model['columns']]
+
+    return model
@@ -0,0 +1,120 @@
+###################################################################################
+# Streaming ingestion of ';'-separated AirQuality files
+#
+# The file is read in fixed-size chunks of rows, and each chunk only updates the
+# cross-products Z'Z, Z'y, y'y, the column sums and the row count before it is
+# dropped, so peak memory depends on the chunk size and the number of columns,
+# not on the length of the file. The result has the keys of
+# sufficient_stats.getCrossProducts and feeds the selection engines directly.
+###################################################################################
+from itertools import islice
+
+import numpy as np
+
+from .tracing import timePhase
+from .solvers import updateRowFactor
+
+###################################################################################
+# Read the names of the columns usecols from the header line
+###################################################################################
+def getCsvColumnNames(csv_url, usecols, delimiter=';'):
+
+    with open(csv_url) as csv_file:
+        header = csv_file.readline().rstrip('\n').split(delimiter)
+
+    return [header[j].strip() for j in usecols]
+
+###################################################################################
+# Generator of the rows of the columns usecols as float arrays of at most
+# chunk_rows rows. Blank rows (only delimiters) are skipped, and at most
+# max_rows data rows are read after the skip_header first lines.
+###################################################################################
+def readCsvChunks(csv_url, usecols, chunk_rows=65536, skip_header=1, max_rows=None, delimiter=';'):
+
+    usecols = list(usecols)
+    rows_left = np.inf if max_rows is None else max_rows
+
+    with open(csv_url) as csv_file:
+
+        for line in islice(csv_file, skip_header):
+            pass
+
+        while rows_left > 0:
+
+            with timePhase('ingest'):
+
+                lines = list(islice(csv_file, int(min(chunk_rows, rows_left))))
+
+                if len(lines) == 0:
+                    break
+
+                rows_left -= len(lines)
+                lines = [line for line in lines if line.strip().strip(delimiter) != '']
+
+                if len(lines) == 0:
+                    continue
+
+                chunk = np.loadtxt(lines, delimiter=delimiter, usecols=usecols, dtype=float, ndmin=2)
+
+            yield chunk
+
+###################################################################################
+# Accumulate the cross-products of Z = [1, predictors] and y over the chunks.
+# response_col is the position of y among the columns of a chunk; the other
+# columns are the predictors in their order, kept as read (float, so the
+# fractional readings such as C6H6 and T are not truncated). With
+# row_factor=True the triangular factor 'R' of the rows [Z y] is built in the
+# same pass, for the QR solvers (see solvers).
+###################################################################################
+def getStreamingCrossProducts(chunks, response_col, intercept=True, row_factor=False):
+
+    ZtZ = None; Zty = None; Zsum = None; R = None
+    yty = 0.0; ysum = 0.0; n = 0
+
+    for chunk in chunks:
+
+        with timePhase('gram'):
+
+            y = chunk[:, response_col]
+            z = np.delete(chunk, response_col, axis=1).astype(float)
+
+            if intercept:
+                z = np.column_stack((np.ones(z.shape[0]), z))
+
+            if ZtZ is None:
+                ZtZ = np.zeros((z.shape[1], z.shape[1])); Zty = np.zeros(z.shape[1]); Zsum = np.zeros(z.shape[1])
+
+            ZtZ += z.T.dot(z)
+            Zty += z.T.dot(y)
+            Zsum += z.sum(axis=0)
+            yty += y.dot(y)
+            ysum += y.sum()
+            n += z.shape[0]
+
+        if row_factor:
+            with timePhase('row_factor'):
+                R = updateRowFactor(R, np.column_stack((z, y)))
+
+    stats = {
+        'ZtZ': ZtZ,
+        'Zty': Zty,
+        'yty': float(yty),
+        'ysum': float(ysum),
+        'n': n,
+        'Zsum': Zsum,
+    }
+
+    if row_factor:
+        stats['R'] = R
+
+    return stats
+
+###################################################################################
+# Cross-products of a CSV file in one streaming pass
+###################################################################################
+def getCsvCrossProducts(csv_url, response_col, usecols, chunk_rows=65536, skip_header=1,
+                        max_rows=None, delimiter=';'):
+
+    chunks = readCsvChunks(csv_url, usecols, chunk_rows, skip_header, max_rows, delimiter)
+
+    return getStreamingCrossProducts(chunks, response_col)
@@ -0,0 +1,211 @@
+###################################################################################
+# Cross-products of data with missing values (tagged with -200 in AirQuality)
+#
+# Three ways to turn the data and its boolean missing mask into the sufficient
+# statistics of sufficient_stats.getCrossProducts:
+#   'complete'   complete-case: only the rows where every column is observed
+#   'threshold'  columns missing in more than a fraction threshold of the rows
+#                are excluded first, then complete-case on the other columns
+#   'pairwise'   pairwise-complete: every mean and covariance is taken over the
+#                rows where the columns it involves are observed. The result
+#                is not the cross-products of any one set of rows, so the RSS,
+#                F ratios, AIC and Cp computed from it (with n the smallest
+#                pairwise count) are approximate
+# Rows and columns are never dropped one at a time: each mode is a set of
+# masked matrix products accumulated in one pass over chunks of rows.
+###################################################################################
+import numpy as np
+
+from .tracing import timePhase
+from .solvers import updateRowFactor
+
+missing_value = -200
+
+###################################################################################
+# Boolean mask of the missing values, and the fraction missing per column
+###################################################################################
+def getMissingMask(data, missing_value=missing_value):
+
+    return np.asarray(data) == missing_value
+
+def getMissingFractions(mask):
+
+    return np.asarray(mask).mean(axis=0)
+
+###################################################################################
+# Complete-case cross-products of Z = [1, data[:, columns]] and y =
+# data[:, response_col]. columns defaults to every column but the response.
+# The stats have an extra key 'columns', the columns of data behind Z[:, 1:],
+# and 'R' with row_factor=True (see solvers).
+###################################################################################
+def getCompleteCaseCrossProducts(data, response_col, mask=None, columns=None, chunk_rows=65536,
+                                 row_factor=False):
+
+    if mask is None:
+        mask = getMissingMask(data)
+
+    if columns is None:
+        columns = [j for j in range(data.shape[1]) if j != response_col]
+
+    columns = [int(j) for j in columns]
+    used = [response_col] + columns
+
+    q = len(columns)+1
+    ZtZ = np.zeros((q, q)); Zty = np.zeros(q); Zsum = np.zeros(q)
+    yty = 0.0; ysum = 0.0; n = 0; R = None
+
+    for start in range(0, data.shape[0], chunk_rows):
+
+        rows = slice(start, start+chunk_rows)
+
+        with timePhase('ingest'):
+            keep = ~np.asarray(mask[rows])[:, used].any(axis=1)
+            block = np.asarray(data[rows], dtype=float)[keep]
+
+        with timePhase('gram'):
+
+            y = block[:, response_col]
+            z = np.column_stack((np.ones(block.shape[0]), block[:, columns]))
+
+            ZtZ += z.T.dot(z)
+            Zty += z.T.dot(y)
+            Zsum += z.sum(axis=0)
+            yty += y.dot(y)
+            ysum += y.sum()
+            n += block.shape[0]
+
+        if row_factor:
+            with timePhase('row_factor'):
+                R = updateRowFactor(R, np.column_stack((z, y)))
+
+    stats = {
+        'ZtZ': ZtZ,
+        'Zty': Zty,
+        'yty': float(yty),
+        'ysum': float(ysum),
+        'n': n,
+        'Zsum': Zsum,
+        'columns': columns,
+    }
+
+    if row_factor:
+        stats['R'] = R
+
+    return stats
+
+###################################################################################
+# Complete-case cross-products after excluding the predictors missing in more
+# than a fraction threshold of the rows (the response is never excluded)
+###################################################################################
+def getThresholdCrossProducts(data, response_col, threshold=0.5, mask=None, chunk_rows=65536, row_factor=False):
+
+    if mask is None:
+        mask = getMissingMask(data)
+
+    fractions = getMissingFractions(mask)
+
+    columns = [j for j in range(data.shape[1]) if j != response_col and fractions[j] <= threshold]
+
+    return getCompleteCaseCrossProducts(data, response_col, mask, columns, chunk_rows, row_factor)
+
+###################################################################################
+# Pairwise-complete cross-products. With W the observed indicator and X the
+# data with its missing values set to 0, one pass accumulates
+#   N = W'W   (rows where both j and k are observed)
+#   S = X'W   (sum of column j over the rows where k is observed)
+#   Q = X'X   (sum of x_j x_k over the rows where both are observed)
+# which give the pairwise covariances (Q - S*S'/N)/(N-1) and the means
+# diag(S)/diag(N). The cross-products are those of n rows with these means and
+# covariances, n the smallest pairwise count. The covariance matrix need not
+# be positive semidefinite when the columns are missing in different rows; its
+# negative eigenvalues are then clipped to 0. The stats have the extra keys
+# 'columns', 'pair_n' (the matrix N over [y, Z[:, 1:]]) and 'clipped' (the
+# number of eigenvalues clipped).
+###################################################################################
+def getPairwiseCrossProducts(data, response_col, mask=None, columns=None, chunk_rows=65536):
+
+    if mask is None:
+        mask = getMissingMask(data)
+
+    if columns is None:
+        columns = [j for j in range(data.shape[1]) if j != response_col]
+
+    columns = [int(j) for j in columns]
+    used = [response_col] + columns
+
+    q = len(used)
+    N = np.zeros((q, q)); S = np.zeros((q, q)); Q = np.zeros((q, q))
+
+    for start in range(0, data.shape[0], chunk_rows):
+
+        rows = slice(start, start+chunk_rows)
+
+        with timePhase('ingest'):
+            W = (~np.asarray(mask[rows])[:, used]).astype(float)
+            X = np.where(W > 0, np.asarray(data[rows], dtype=float)[:, used], 0.0)
+
+        with timePhase('gram'):
+            N += W.T.dot(W)
+            S += X.T.dot(W)
+            Q += X.T.dot(X)
+
+    if N.min() < 2:
+        j, k = np.unravel_index(np.argmin(N), N.shape)
+        raise ValueError('columns %d and %d are observed together in fewer than 2 rows' % (used[j], used[k]))
+
+    mean = np.diag(S)/np.diag(N)
+    cov = (Q - S*S.T/N)/(N-1)
+
+    # Nearest positive semidefinite covariance (in the Frobenius norm)
+    eigvals, eigvecs = np.linalg.eigh((cov+cov.T)/2)
+    clipped = int(np.count_nonzero(eigvals < 0))
+
+    if clipped > 0:
+        cov = (eigvecs*np.maximum(eigvals, 0.0)).dot(eigvecs.T)
+
+    n = int(N.min())
+    G = (n-1)*cov + n*np.outer(mean, mean)
+
+    # Z = [1, predictors]; index 0 of G is y
+    ZtZ = np.empty((q, q))
+    ZtZ[0, 0] = n
+    ZtZ[0, 1:] = ZtZ[1:, 0] = n*mean[1:]
+    ZtZ[1:, 1:] = G[1:, 1:]
+
+    Zty = np.concatenate(([n*mean[0]], G[1:, 0]))
+
+    stats = {
+        'ZtZ': ZtZ,
+        'Zty': Zty,
+        'yty': float(G[0, 0]),
+        'ysum': float(n*mean[0]),
+        'n': n,
+        'Zsum': n*np.concatenate(([1.0], mean[1:])),
+        'columns': columns,
+        'pair_n': N,
+        'clipped': clipped,
+    }
+
+    return stats
+
+###################################################################################
+# Cross-products by mode: 'complete', 'threshold' or 'pairwise'. The pairwise
+# cross-products are not those of any set of rows, so they have no row factor.
+###################################################################################
+def getMissingDataCrossProducts(data, response_col, mode='complete', threshold=0.5, mask=None,
+                                chunk_rows=65536, row_factor=False):
+
+    if mode == 'complete':
+        return getCompleteCaseCrossProducts(data, response_col, mask, chunk_rows=chunk_rows, row_factor=row_factor)
+
+    if mode == 'threshold':
+        return getThresholdCrossProducts(data, response_col, threshold, mask, chunk_rows, row_factor)
+
+    if mode == 'pairwise':
+
+        if row_factor:
+            raise ValueError('the pairwise cross-products have no row factor')
+
+        return getPairwiseCrossProducts(data, response_col, mask, chunk_rows=chunk_rows)
+
+    raise ValueError("mode must be 'complete', 'threshold' or 'pairwise', not %r" % (mode,))
@@ -0,0 +1,116 @@
+###################################################################################
+# Cache of fitted subsets and of critical values
+#
+# The criteria and tests score the same subsets many times (the RSS of a model
+# for its R2, adjusted R2, AIC, Cp and F ratios, and the full model for every
+# Cp). A fit is kept in a bounded LRU cache that lives in the statistics it was
+# computed from, keyed by the frozen set of its column indices, with its
+# factorization, coefficients, RSS, rank and condition estimate from the solver
+# of the stats (see solvers); the cache counts its hits and misses. The F
+# critical values are memoized per (alpha, df1, df2).
+###################################################################################
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+from scipy.special import fdtri
+
+from .solvers import default_solver, getSolver
+from .tracing import countEvent
+
+max_cache_size = 4096
+
+###################################################################################
+# The cache of stats, created on first use. Code that changes the statistics
+# in place must call clearModelCache.
+###################################################################################
+def getModelCache(stats, max_size=max_cache_size):
+
+    cache = stats.get('fits')
+
+    if cache is None:
+        cache = stats['fits'] = {'fits': OrderedDict(), 'max_size': max_size, 'hits': 0, 'misses': 0}
+
+    return cache
+
+def clearModelCache(stats):
+
+    stats.pop('fits', None)
+
+def getModelCacheInfo(stats):
+
+    cache = getModelCache(stats)
+
+    return {'hits': cache['hits'], 'misses': cache['misses'], 'size': len(cache['fits']),
+            'max_size': cache['max_size']}
+
+###################################################################################
+# The solver of the fits of stats: stats['solver'] if set (see setSolver), the
+# default solver otherwise
+###################################################################################
+def getStatsSolver(stats):
+
+    return stats.get('solver', default_solver)
+
+def setSolver(stats, solver):
+
+    getSolver(solver)
+
+    stats['solver'] = solver
+    clearModelCache(stats)
+
+###################################################################################
+# Least squares fit of a subset S of columns with the solver of the stats. The
+# solvers scale the columns to unit norm, because the AirQuality sensor
+# channels differ by several orders of magnitude.
+###################################################################################
+def _fitSubset(stats, index):
+
+    countEvent('factorizations')
+
+    solver = getStatsSolver(stats)
+
+    fit = getSolver(solver)(stats, index)
+    fit['index'] = index; fit['solver'] = solver
+
+    return fit
+
+###################################################################################
+# The fit of the columns col_index, from the cache of stats when it is there.
+# The fit is in increasing column order: 'index', 'solver', 'beta', 'resSS',
+# 'rank', 'cond' (estimated condition number of the scaled Z_S), 'scale' and
+# 'factor' (cho_factor form of the scaled Gram matrix, see solvers), with
+# 'pivot' for the pivoted QR.
+###################################################################################
+def getSubsetFit(stats, col_index):
+
+    key = frozenset(np.atleast_1d(col_index).tolist())
+    cache = getModelCache(stats)
+
+    fit = cache['fits'].get(key)
+
+    if fit is not None:
+        cache['hits'] += 1; countEvent('fit_cache_hits')
+        cache['fits'].move_to_end(key)
+        return fit
+
+    cache['misses'] += 1; countEvent('fit_cache_misses')
+
+    fit = _fitSubset(stats, np.array(sorted(key), dtype=int))
+
+    cache['fits'][key] = fit
+
+    if len(cache['fits']) > cache['max_size']:
+        cache['fits'].popitem(last=False)
+
+    return fit
+
+###################################################################################
+# Critical value of the F distribution at the level alpha, i.e.,
+# f.ppf(1-alpha, df1, df2); scipy.special.fdtri is the same quantile without
+# the import cost of scipy.stats
+###################################################################################
+@lru_cache(maxsize=max_cache_size)
+def getCriticalValue(alpha_value, df1, df2):
+
+    return float(fdtri(df1, df2, 1-alpha_value))
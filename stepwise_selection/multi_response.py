@@ -0,0 +1,238 @@
+###################################################################################
+# Stepwise selection for several responses at once
+#
+# All responses share the design Z, so Z'Z is computed once and Z'Y is a
+# matrix with one column per response. The responses whose selections have
+# taken the same steps so far share one swept matrix
+#       [ Z'Z  Z'Y ]
+#       [ Y'Z  Y'Y ]
+# (see sweep; only the diagonal of the Y'Y block is used), and a step is one
+# sweep of that matrix for all of them, with the F-ratios of every response
+# read off its Z'Y columns at once. A group is split only when its responses
+# choose different steps, so r responses that select alike cost about as much
+# as one.
+###################################################################################
+import numpy as np
+
+from .model_cache import getCriticalValue
+from .sweep import sweepOperator, collinear_tol
+from .missing_data import getMissingMask
+from .tracing import timePhase
+
+###################################################################################
+# Complete-case cross-products of Z = [1, data[:, columns]] and the responses
+# Y = data[:, response_cols], over the rows where every one of them is observed:
+#   'ZtZ' (p x p), 'ZtY' (p x r), 'yty' (r,), 'ysum' (r,), 'n', 'columns'
+###################################################################################
+def getMultiResponseCrossProducts(data, response_cols, columns, mask=None, chunk_rows=65536):
+
+    if mask is None:
+        mask = getMissingMask(data)
+
+    response_cols = [int(j) for j in response_cols]; columns = [int(j) for j in columns]
+    used = response_cols + columns
+
+    q = len(columns)+1; r = len(response_cols)
+    ZtZ = np.zeros((q, q)); ZtY = np.zeros((q, r))
+    yty = np.zeros(r); ysum = np.zeros(r); n = 0
+
+    for start in range(0, data.shape[0], chunk_rows):
+
+        rows = slice(start, start+chunk_rows)
+
+        with timePhase('ingest'):
+            keep = ~np.asarray(mask[rows])[:, used].any(axis=1)
+            block = np.asarray(data[rows], dtype=float)[keep]
+
+        with timePhase('gram'):
+
+            Y = block[:, response_cols]
+            z = np.column_stack((np.ones(block.shape[0]), block[:, columns]))
+
+            ZtZ += z.T.dot(z)
+            ZtY += z.T.dot(Y)
+            yty += np.einsum('ij,ij->j', Y, Y)
+            ysum += Y.sum(axis=0)
+            n += block.shape[0]
+
+    stats = {
+        'ZtZ': ZtZ,
+        'ZtY': ZtY,
+        'yty': yty,
+        'ysum': ysum,
+        'n': n,
+        'columns': columns,
+    }
+
+    return stats
+
+###################################################################################
+# The single-response statistics of response i, as in getCrossProducts
+###################################################################################
+def getResponseStats(stats, i):
+
+    return {'ZtZ': stats['ZtZ'], 'Zty': stats['ZtY'][:, i], 'yty': float(stats['yty'][i]),
+            'ysum': float(stats['ysum'][i]), 'n': stats['n']}
+
+###################################################################################
+# Augmented matrix [Z Y]'[Z Y] scaled to unit diagonal, with the scale vector;
+# the off-diagonal entries of the Y'Y block are not known and are set to 0
+###################################################################################
+def getMultiAugmentedCrossProducts(stats):
+
+    ZtZ = stats['ZtZ']; ZtY = stats['ZtY']
+    p, r = ZtY.shape
+
+    A = np.zeros((p+r, p+r))
+    A[:p, :p] = ZtZ
+    A[:p, p:] = ZtY; A[p:, :p] = ZtY.T
+    A[p+np.arange(r), p+np.arange(r)] = stats['yty']
+
+    d = np.sqrt(np.diag(A))
+    d[d == 0] = 1.0
+
+    return A/np.outer(d, d), d
+
+###################################################################################
+# Partial F-ratios of every predictor (columns) for every response of a group
+# (rows), as in sweep.getSweepFRatios
+###################################################################################
+def getGroupFRatios(A, in_model, observations):
+
+    n = observations
+    p = in_model.size
+    k = int(np.count_nonzero(in_model))
+
+    resSS = np.diag(A)[p:][:, None]
+    diag = np.diag(A)[:p]
+    a = A[:p, p:].T
+
+    F = np.zeros((resSS.size, p))
+
+    drop = in_model & (diag < 0)
+    F[:, drop] = (a[:, drop]**2/-diag[drop])/(resSS/(n-k))
+
+    add = ~in_model & (diag > collinear_tol)
+    reduction = a[:, add]**2/diag[add]
+    F[:, add] = reduction/((resSS-reduction)/(n-k-1))
+
+    return F
+
+###################################################################################
+# Split a group by the step chosen by each of its responses (a column of Z, or
+# -1 for no step) and take the step in each part. A group whose responses all
+# choose the same step is not copied.
+###################################################################################
+def _stepGroup(group, choice, inverse):
+
+    p = group['in_model'].size
+    parts = []
+
+    for col in np.unique(choice):
+
+        if np.all(choice == col):
+            part = group
+        else:
+            keep = np.flatnonzero(choice == col)
+            index = np.concatenate((np.arange(p), p+keep))
+            part = {
+                'A': group['A'][np.ix_(index, index)],
+                'members': group['members'][keep],
+                'in_model': group['in_model'].copy(),
+                'steps': group['steps'],
+                'changed': group['changed'],
+            }
+
+        if col >= 0:
+            sweepOperator(part['A'], col, inverse=inverse)
+            part['in_model'][col] = not inverse
+            part['steps'] += 1; part['changed'] = True
+
+        parts.append(part)
+
+    return parts
+
+###################################################################################
+# Stepwise selection for every response, with the same steps as
+# sweep.getSweepStepwisePredictors applied to each response. Returns one model
+# per response, each a dict with 'index', 'F', 'resSS' and 'beta'.
+###################################################################################
+def getMultiResponseStepwise(stats, alpha_value, forced=(0,), max_steps=None):
+
+    alpha = alpha_value; n = stats['n']
+
+    A, d = getMultiAugmentedCrossProducts(stats)
+    p, r = stats['ZtY'].shape
+
+    is_forced = np.zeros(p, dtype=bool)
+    is_forced[list(forced)] = True
+
+    for k in forced:
+        sweepOperator(A, k)
+
+    if max_steps is None:
+        max_steps = 4*p
+
+    # Critical values of the F-to-enter and F-to-remove for k columns in the
+    # model, shared by every group
+    c_add = np.array([getCriticalValue(alpha, 1, n-k-1) for k in range(p+1)])
+    c_drop = np.array([getCriticalValue(alpha, 1, n-k) for k in range(p+1)])
+
+    groups = [{'A': A, 'members': np.arange(r), 'in_model': is_forced.copy(), 'steps': 0, 'changed': False}]
+    models = [None]*r
+
+    while len(groups) > 0:
+
+        group = groups.pop()
+        group['changed'] = False
+
+        in_model = group['in_model']
+        k = int(np.count_nonzero(in_model))
+
+        # Forward: the candidate with the largest F-to-enter of each response
+        F = getGroupFRatios(group['A'], in_model, n)
+        F_add = np.where(in_model, -np.inf, F)
+
+        choice = np.argmax(F_add, axis=1)
+        best = F_add[np.arange(choice.size), choice]
+
+        if not (k < p and n-k-1 > 0):
+            choice[:] = -1
+        else:
+            choice[~(best > c_add[k])] = -1
+
+        forward = _stepGroup(group, choice, False)
+
+        # Backward: the predictor with the smallest F-to-remove of each response
+        for part in forward:
+
+            in_model = part['in_model']
+            k = int(np.count_nonzero(in_model))
+
+            F = getGroupFRatios(part['A'], in_model, n)
+            F_drop = np.where(in_model & ~is_forced, F, np.inf)
+
+            choice = np.argmin(F_drop, axis=1)
+            worst = F_drop[np.arange(choice.size), choice]
+
+            choice[~(np.isfinite(worst) & (worst < c_drop[k]))] = -1
+
+            for done in _stepGroup(part, choice, True):
+
+                if done['changed'] and done['steps'] < max_steps:
+                    groups.append(done)
+                    continue
+
+                in_model = done['in_model']
+                F = getGroupFRatios(done['A'], in_model, n)
+
+                for i, member in enumerate(done['members']):
+
+                    models[member] = {
+                        'index': np.flatnonzero(in_model).tolist(),
+                        'F': F[i],
+                        'resSS': done['A'][p+i, p+i]*d[p+member]**2,
+                        'beta': done['A'][:p, p+i][in_model]*d[p+member]/d[:p][in_model],
+                    }
+
+    return models
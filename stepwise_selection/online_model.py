@@ -0,0 +1,144 @@
+###################################################################################
+# Online stepwise model
+#
+# The model keeps the sufficient statistics and the swept matrix of the current
+# selection (see sweep). A new row is a rank-one update of both, O(p^2) whatever
+# the number of rows seen so far, and a small batch is one update per row. After
+# each update the F-to-remove of every predictor in the model and the
+# F-to-enter of every candidate are read off the swept matrix in O(p); stepwise
+# steps are only taken, warm-started from the current selection, when one of
+# these tests has crossed its critical value, i.e., when the selected set could
+# change.
+###################################################################################
+import numpy as np
+
+from .sweep import (getAugmentedCrossProducts, sweepOperator, getSweepFRatios, updateSweptMatrix,
+                    sweepStepwiseSteps, getSweptModel)
+from .model_cache import getCriticalValue, clearModelCache
+
+###################################################################################
+# Online model from the statistics of the rows seen so far. The selection is
+# run once from the forced columns, or warm-started from init_active.
+# The swept matrix is rebuilt from the statistics every resync updates to bound
+# the rounding error of long sequences of rank-one updates.
+###################################################################################
+def getOnlineModel(stats, alpha_value, forced=(0,), init_active=None, resync=10000):
+
+    p = stats['ZtZ'].shape[0]
+
+    model = {
+        'stats': {
+            'ZtZ': np.array(stats['ZtZ'], dtype=float),
+            'Zty': np.array(stats['Zty'], dtype=float),
+            'yty': float(stats['yty']),
+            'ysum': float(stats['ysum']),
+            'n': stats['n'],
+        },
+        'alpha': alpha_value,
+        'forced': np.zeros(p, dtype=bool),
+        'in_model': np.zeros(p, dtype=bool),
+        'resync': resync,
+        'updates': 0,
+        'reselections': 0,
+    }
+
+    model['forced'][list(forced)] = True
+    model['in_model'][list(forced)] = True
+
+    if init_active is not None:
+        model['in_model'][list(init_active)] = True
+
+    _rebuildSweptMatrix(model)
+
+    sweepStepwiseSteps(model['A'], model['in_model'], model['forced'], model['stats']['n'],
+                       alpha_value, 4*p)
+
+    return model
+
+def _rebuildSweptMatrix(model):
+
+    A, d = getAugmentedCrossProducts(model['stats'])
+
+    for k in np.flatnonzero(model['in_model']):
+        sweepOperator(A, k)
+
+    model['A'] = A; model['d'] = d
+
+###################################################################################
+# True when no stepwise step can be taken from the current selection: no
+# candidate has a significant F-to-enter and no predictor (other than the
+# forced ones) a non-significant F-to-remove
+###################################################################################
+def isOnlineModelStable(model):
+
+    A = model['A']; in_model = model['in_model']
+    alpha = model['alpha']; n = model['stats']['n']
+
+    p = A.shape[0]-1
+    k = int(np.count_nonzero(in_model))
+
+    F = getSweepFRatios(A, in_model, n)
+
+    if k < p and n-k-1 > 0:
+        if np.max(F[~in_model]) > getCriticalValue(alpha, 1, n-k-1):
+            return False
+
+    drop = in_model & ~model['forced']
+
+    if np.any(drop):
+        if np.min(F[drop]) < getCriticalValue(alpha, 1, n-k):
+            return False
+
+    return True
+
+###################################################################################
+# Add the rows (rows of Z with their responses) to the model, or remove them
+# with weight=-1; weight can also be one value per row, so that rows entering
+# and leaving a window are applied together. Returns True if the selected set
+# changed.
+###################################################################################
+def updateOnlineModel(model, data, response, weight=1.0):
+
+    z = np.atleast_2d(np.asarray(data, dtype=float)); y = np.atleast_1d(np.asarray(response, dtype=float))
+    weight = np.broadcast_to(np.asarray(weight, dtype=float), y.shape)
+
+    stats = model['stats']; d = model['d']
+
+    stats['ZtZ'] += z.T.dot(weight[:, None]*z)
+    stats['Zty'] += z.T.dot(weight*y)
+    stats['yty'] += float(weight.dot(y*y))
+    stats['ysum'] += float(weight.dot(y))
+    stats['n'] += int(round(weight.sum()))
+
+    clearModelCache(stats)
+
+    model['updates'] += z.shape[0]
+
+    if model['updates'] >= model['resync']:
+
+        model['updates'] = 0
+        _rebuildSweptMatrix(model)
+
+    else:
+
+        for i in range(z.shape[0]):
+            updateSweptMatrix(model['A'], model['in_model'], np.append(z[i], y[i])/d, weight[i])
+
+    if isOnlineModelStable(model):
+        return False
+
+    before = model['in_model'].copy()
+    p = model['A'].shape[0]-1
+
+    sweepStepwiseSteps(model['A'], model['in_model'], model['forced'], stats['n'], model['alpha'], 4*p)
+    model['reselections'] += 1
+
+    return bool(np.any(before != model['in_model']))
+
+###################################################################################
+# The current selection: 'index', 'F', 'resSS' and 'beta' as in
+# getSweepStepwisePredictors
+###################################################################################
+def getOnlineModelSelection(model):
+
+    return getSweptModel(model['A'], model['d'], model['in_model'], model['stats']['n'])
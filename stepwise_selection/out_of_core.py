@@ -0,0 +1,324 @@
+###################################################################################
+# Out-of-core rows: a store of memory-mapped chunk files
+#
+# The rows of a data set larger than memory (e.g., the AirQuality files of
+# many stations) are written once, chunk by chunk, to rows_NNNNNN.npy files of
+# a store directory, with a meta.json of the column names, the dtype and the
+# rows of every file (written last, as in column_cache). A block of rows is
+# read through a memory map of its file (np.load(mmap_mode='r')) that is closed
+# once the block is copied, so only the pages of the blocks being read are
+# mapped into the process and the page cache holds the rest.
+#
+# Every pass over the store is split into row blocks that are read and
+# reduced on a thread pool: a block is copied from its memory map (I/O) and
+# multiplied (BLAS), both of which release the GIL, so the reads of some
+# blocks overlap the products of others. Only the p x p sums of the blocks
+# come back, and they are added in the order of the blocks, so the result
+# does not depend on the number of workers. The memory is workers blocks of
+# rows plus the p x p summaries, whatever the number of rows: 1e8 rows of 14
+# columns are 11 GB of float64 files (5.6 GB in float32), read in 7 MB blocks.
+###################################################################################
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy.linalg import qr, solve_triangular
+
+from .column_cache import missing_value
+from .model_cache import getSubsetFit
+from .solvers import updateRowFactor
+from .tracing import timePhase, countEvent
+
+store_version = 1
+
+###################################################################################
+# Write the chunks (float arrays of the columns names, e.g. from
+# ingest.readCsvChunks) to the store, as dtype. With append=True the chunks are
+# added after the rows already in the store, e.g. the file of another station.
+###################################################################################
+def writeChunkedFile(chunks, store_dir, names, dtype=np.float64, append=False):
+
+    meta_url = os.path.join(store_dir, 'meta.json')
+
+    if append and os.path.exists(meta_url):
+
+        with open(meta_url) as meta_file:
+            meta = json.load(meta_file)
+
+        if meta['names'] != list(names):
+            raise ValueError('the columns %s differ from the columns %s of the store' % (list(names), meta['names']))
+
+        dtype = np.dtype(meta['dtype'])
+
+    else:
+
+        meta = {'version': store_version, 'names': list(names), 'dtype': np.dtype(dtype).name, 'files': [],
+                'rows': [], 'n': 0}
+
+    os.makedirs(store_dir, exist_ok=True)
+
+    # The store is invalid until meta.json is written again
+    if os.path.exists(meta_url):
+        os.remove(meta_url)
+
+    for chunk in chunks:
+
+        chunk = np.asarray(chunk, dtype=dtype)
+
+        if chunk.shape[0] == 0:
+            continue
+
+        if chunk.shape[1] != len(names):
+            raise ValueError('a chunk has %d columns, not %d' % (chunk.shape[1], len(names)))
+
+        file_name = 'rows_%06d.npy' % len(meta['files'])
+        np.save(os.path.join(store_dir, file_name), chunk)
+
+        meta['files'].append(file_name)
+        meta['rows'].append(int(chunk.shape[0]))
+        meta['n'] += int(chunk.shape[0])
+
+    with open(meta_url, 'w') as meta_file:
+        json.dump(meta, meta_file, indent=1)
+
+    return meta
+
+###################################################################################
+# Open a store: 'names', 'dtype', 'n', and the paths of the chunk 'files' with
+# their 'rows'
+###################################################################################
+def loadChunkedFile(store_dir):
+
+    with open(os.path.join(store_dir, 'meta.json')) as meta_file:
+        meta = json.load(meta_file)
+
+    if meta.get('version') != store_version:
+        raise ValueError('%s is not a store of version %d' % (store_dir, store_version))
+
+    store = {
+        'names': meta['names'],
+        'dtype': meta['dtype'],
+        'n': meta['n'],
+        'files': [os.path.join(store_dir, file_name) for file_name in meta['files']],
+        'rows': meta['rows'],
+    }
+
+    return store
+
+def isChunkedFile(store_dir):
+
+    return os.path.isdir(store_dir) and os.path.exists(os.path.join(store_dir, 'meta.json'))
+
+###################################################################################
+# The row blocks of a store, (file, start, stop) with at most block_rows rows
+###################################################################################
+def _getRowBlocks(store, block_rows):
+
+    return [(f, start, min(start+block_rows, rows))
+            for f, rows in enumerate(store['rows']) for start in range(0, rows, block_rows)]
+
+###################################################################################
+# Read a block into memory as float: the rows of the columns used ([response]
+# + columns) without a missing value, or all of them with missing_value=None
+###################################################################################
+def _readBlock(store, block, used, missing_value):
+
+    f, start, stop = block
+
+    with timePhase('ingest'):
+
+        rows_map = np.load(store['files'][f], mmap_mode='r')
+        rows = np.array(rows_map[start:stop][:, used], dtype=float)
+        del rows_map
+
+        if missing_value is not None:
+            rows = rows[~(rows == missing_value).any(axis=1)]
+
+    return rows
+
+###################################################################################
+# Apply reduce(rows) to every block on workers threads; the results are
+# returned in the order of the blocks, and at most 2*workers blocks are read
+# ahead of the one being returned
+###################################################################################
+def _mapBlocks(store, reduce, used, block_rows, workers, missing_value):
+
+    blocks = _getRowBlocks(store, block_rows)
+
+    def run(block):
+        countEvent('row_blocks')
+        return reduce(_readBlock(store, block, used, missing_value))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+
+        pending = [executor.submit(run, block) for block in blocks[:2*workers]]
+
+        for i in range(len(blocks)):
+
+            result = pending[i].result()
+            pending[i] = None
+
+            if i+2*workers < len(blocks):
+                pending.append(executor.submit(run, blocks[i+2*workers]))
+
+            yield result
+
+###################################################################################
+# Cross-products of Z = [1, columns] and y = column response_col of the store
+# over its complete rows (the rows with missing_value in none of the columns
+# used), in the form of missing_data.getCompleteCaseCrossProducts. With
+# row_factor=True the blocks are also folded into the row factor 'R' of the
+# QR solvers. Only these p x p sums are kept.
+###################################################################################
+def getOutOfCoreCrossProducts(store, response_col, columns=None, block_rows=65536, workers=2,
+                              missing_value=missing_value, row_factor=False):
+
+    if columns is None:
+        columns = [j for j in range(len(store['names'])) if j != response_col]
+
+    columns = [int(j) for j in columns]
+    used = [response_col] + columns
+
+    def reduce(rows):
+
+        with timePhase('gram'):
+
+            y = rows[:, 0]
+            z = rows.copy()
+            z[:, 0] = 1.0
+
+            sums = [z.T.dot(z), z.T.dot(y), y.dot(y), y.sum(), z.sum(axis=0), z.shape[0]]
+
+        if row_factor and z.shape[0] > 0:
+            with timePhase('row_factor'):
+                sums.append(qr(np.column_stack((z, y)), mode='r', check_finite=False)[0])
+
+        return sums
+
+    q = len(columns)+1
+    ZtZ = np.zeros((q, q)); Zty = np.zeros(q); Zsum = np.zeros(q)
+    yty = 0.0; ysum = 0.0; n = 0; R = None
+
+    for sums in _mapBlocks(store, reduce, used, block_rows, workers, missing_value):
+
+        ZtZ += sums[0]; Zty += sums[1]; yty += sums[2]; ysum += sums[3]; Zsum += sums[4]; n += sums[5]
+
+        if row_factor and sums[5] > 0:
+            with timePhase('row_factor'):
+                R = updateRowFactor(R, sums[6])
+
+    stats = {
+        'ZtZ': ZtZ,
+        'Zty': Zty,
+        'yty': float(yty),
+        'ysum': float(ysum),
+        'n': n,
+        'Zsum': Zsum,
+        'columns': columns,
+    }
+
+    if row_factor:
+        stats['R'] = R if R is not None else np.zeros((q+1, q+1))
+
+    return stats
+
+###################################################################################
+# Residual diagnostics of the model index of stats (from
+# getOutOfCoreCrossProducts, with the same response_col and missing_value), in
+# one more pass over the rows of the store:
+#   'n', 'resSS'          rows and residual SS (the RSS of the fit, recomputed)
+#   'residual_sum'        sum of the residuals (0 with an intercept)
+#   'max_abs_residual'    largest |residual|
+#   'durbin_watson'       sum (e_i - e_i-1)^2 / RSS over consecutive complete rows
+#   'max_leverage'        largest h_i = z_i'(Z_S'Z_S)^-1 z_i = ||L^-1 z_i/d||^2,
+#                         with L the factor of the fit (see solvers)
+#   'high_leverage'       rows with h_i > 2k/n
+#   'large_residuals'     rows with |studentized residual| > 3
+#   'max_cooks_distance'  largest Cook's distance
+###################################################################################
+def getOutOfCoreDiagnostics(store, stats, index, response_col, block_rows=65536, workers=2,
+                            missing_value=missing_value):
+
+    index = sorted(index)
+    columns = stats['columns']
+    used = [response_col] + columns
+
+    fit = getSubsetFit(stats, index)
+    beta = fit['beta']
+
+    n = stats['n']; k = len(index)
+    s2 = fit['resSS']/(n-k)
+
+    # Lower triangular L with LL' the scaled Gram matrix of the columns of the
+    # factor (the leading rank columns of the pivoted QR, which span Z_S)
+    c, lower = fit['factor']
+    L = np.tril(c) if lower else np.triu(c).T
+    factor_cols = fit.get('pivot', np.arange(k))[:L.shape[0]]
+    d = fit['scale'][factor_cols]
+
+    def reduce(rows):
+
+        if rows.shape[0] == 0:
+            return None
+
+        with timePhase('diagnostics'):
+
+            z = rows.copy()
+            z[:, 0] = 1.0
+            z = z[:, index]
+
+            e = rows[:, 0] - z.dot(beta)
+            h = np.sum(solve_triangular(L, (z[:, factor_cols]/d).T, lower=True, check_finite=False)**2, axis=0)
+
+            t = e/np.sqrt(s2*np.maximum(1-h, np.finfo(float).eps))
+            cooks = t**2*h/(k*np.maximum(1-h, np.finfo(float).eps))
+
+            sums = {
+                'n': e.size,
+                'resSS': e.dot(e),
+                'residual_sum': e.sum(),
+                'max_abs_residual': np.abs(e).max(),
+                'diff_ss': np.sum(np.diff(e)**2),
+                'first': e[0], 'last': e[-1],
+                'max_leverage': h.max(),
+                'high_leverage': int(np.count_nonzero(h > 2*k/n)),
+                'large_residuals': int(np.count_nonzero(np.abs(t) > 3)),
+                'max_cooks_distance': cooks.max(),
+            }
+
+        return sums
+
+    diagnostics = {'n': 0, 'resSS': 0.0, 'residual_sum': 0.0, 'max_abs_residual': 0.0, 'max_leverage': 0.0,
+                   'high_leverage': 0, 'large_residuals': 0, 'max_cooks_distance': 0.0}
+    diff_ss = 0.0; last = None
+
+    for sums in _mapBlocks(store, reduce, used, block_rows, workers, missing_value):
+
+        if sums is None:
+            continue
+
+        for key in ['n', 'resSS', 'residual_sum', 'high_leverage', 'large_residuals']:
+            diagnostics[key] += sums[key]
+
+        for key in ['max_abs_residual', 'max_leverage', 'max_cooks_distance']:
+            diagnostics[key] = max(diagnostics[key], float(sums[key]))
+
+        # The blocks are in row order, so the first residual of a block follows
+        # the last residual of the block before
+        diff_ss += sums['diff_ss'] + (0.0 if last is None else (sums['first']-last)**2)
+        last = sums['last']
+
+    diagnostics['durbin_watson'] = diff_ss/diagnostics['resSS'] if diagnostics['resSS'] > 0 else np.nan
+
+    return diagnostics
+
+def printOutOfCoreDiagnostics(diagnostics):
+
+    print('Residual diagnostics (n = %d): RSS %.6g, Durbin-Watson %.4f' % (diagnostics['n'], diagnostics['resSS'],
+                                                                        diagnostics['durbin_watson']))
+    print('Largest |residual| %.4g, leverage %.4g, Cook\'s distance %.4g' % (diagnostics['max_abs_residual'],
+                                                                            diagnostics['max_leverage'],
+                                                                            diagnostics['max_cooks_distance']))
+    print('Rows with high leverage: %d, with |studentized residual| > 3: %d' % (diagnostics['high_leverage'],
+                                                                                  diagnostics['large_residuals']))
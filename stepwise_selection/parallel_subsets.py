@@ -0,0 +1,207 @@
+###################################################################################
+# Exhaustive all-subsets scoring on a process pool
+#
+# For predictor pools where branch and bound (see best_subsets) cannot prune,
+# every one of the 2^m subsets of the m candidates is scored. The swept matrix
+# [Z y]'[Z y] (with the forced columns swept in) is put in shared memory once;
+# the subset lattice is split into 2^b shards by fixing the membership of the
+# last b candidates, and each worker walks the 2^(m-b) subsets of its shard in
+# Gray-code order, so that every step is a single sweep (add) or reverse sweep
+# (drop). Each worker keeps its own top-k heaps by AIC, Cp and adjusted R2, and
+# the heaps are merged at the end.
+###################################################################################
+import heapq
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .sweep import getAugmentedCrossProducts, sweepOperator, collinear_tol
+
+###################################################################################
+# Keep the top_k entries (key, index, resSS) with the largest key in heap
+###################################################################################
+def _pushTopK(heap, key, index, resSS, top_k):
+
+    if len(heap) < top_k:
+        heapq.heappush(heap, (key, index, resSS))
+    elif key > heap[0][0]:
+        heapq.heapreplace(heap, (key, index, resSS))
+
+###################################################################################
+# Worker: score every subset of one shard. The shard fixes the candidates of
+# prefix in the model; the inner candidates are walked in Gray-code order. The
+# working matrix is rebuilt from the shared one every resync steps to bound the
+# rounding error of long sweep/reverse-sweep sequences.
+###################################################################################
+def _scoreSubsetShard(shm_name, shape, setup, inner, prefix, top_k, resync):
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+
+    try:
+
+        shared = np.ndarray(shape, dtype=float, buffer=shm.buf)
+
+        n = setup['n']; p = shape[0]-1
+        forced = setup['forced']; scale = setup['scale']
+
+        in_model = np.zeros(p, dtype=bool)
+        in_model[forced] = True
+        in_model[prefix] = True
+
+        def rebuild():
+            A = shared.copy()
+            for k in np.flatnonzero(in_model):
+                if k not in forced:
+                    sweepOperator(A, k)
+            return A
+
+        A = rebuild()
+
+        heaps = {'AIC': [], 'Cp': [], 'adjR2': []}
+        count = 0
+
+        for t in range(2**len(inner)):
+
+            if t > 0:
+
+                # Gray code: step t flips the lowest set bit of t
+                k = inner[(t & -t).bit_length()-1]
+
+                if t % resync == 0:
+                    in_model[k] = not in_model[k]
+                    A = rebuild()
+                else:
+                    sweepOperator(A, k, inverse=in_model[k])
+                    in_model[k] = not in_model[k]
+
+            resSS = A[p, p]*scale
+            size = int(np.count_nonzero(in_model))
+
+            AIC = n*np.log(resSS/n)+2*size
+            Cp = resSS/setup['sigma2'] - n + 2*size
+            adjR2 = 1-(resSS/setup['totSS'])*((n-1)/(n-size))
+
+            index = tuple(np.flatnonzero(in_model).tolist())
+
+            _pushTopK(heaps['AIC'], -AIC, index, resSS, top_k)
+            _pushTopK(heaps['Cp'], -Cp, index, resSS, top_k)
+            _pushTopK(heaps['adjR2'], adjR2, index, resSS, top_k)
+
+            count += 1
+
+    finally:
+        shm.close()
+
+    return heaps, count
+
+###################################################################################
+# Top-k subsets by AIC, Cp and adjusted R2 over all 2^m subsets of the
+# candidates col_index (default: every column of Z that is not forced). Returns
+# a dict with the models of each criterion (best first, as in best_subsets),
+# the number of subsets scored, the wall-clock seconds and subsets per second.
+###################################################################################
+def getAllSubsetsParallel(stats, top_k=5, forced=(0,), col_index=None, max_workers=None,
+                          shard_bits=None, resync=4096):
+
+    n = stats['n']
+    p = stats['ZtZ'].shape[0]
+
+    forced = [int(j) for j in forced]
+
+    if col_index is None:
+        col_index = [j for j in range(p) if j not in forced]
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    start = time.perf_counter()
+
+    A, d = getAugmentedCrossProducts(stats)
+
+    for k in forced:
+        sweepOperator(A, k)
+
+    # Leave out candidates that are collinear with the forced columns or with
+    # the candidates before them, so that every subset can be swept
+    B = A.copy(); free = []
+    for k in col_index:
+        if B[k, k] > collinear_tol:
+            sweepOperator(B, k)
+            free.append(int(k))
+
+    m = len(free)
+    full_resSS = B[p, p]*d[p]**2
+
+    setup = {
+        'n': n,
+        'forced': forced,
+        'scale': d[p]**2,
+        'full_resSS': full_resSS,
+        'full_size': len(forced)+m,
+        # Mallows' C_p = RSS/sigma2 - n + 2*size, sigma2 from the full model
+        'sigma2': full_resSS/(n-len(forced)-m),
+        'totSS': stats['yty'] - stats['ysum']**2/n,
+    }
+
+    # About four shards per worker, so that the pool stays balanced
+    if shard_bits is None:
+        shard_bits = min(m, max(0, int(np.ceil(np.log2(4*max_workers)))))
+
+    inner = free[:m-shard_bits]; outer = free[m-shard_bits:]
+
+    shm = shared_memory.SharedMemory(create=True, size=A.nbytes)
+
+    try:
+
+        np.ndarray(A.shape, dtype=float, buffer=shm.buf)[:] = A
+
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+
+            futures = []
+            for shard in range(2**shard_bits):
+
+                prefix = [outer[j] for j in range(shard_bits) if shard >> j & 1]
+                futures.append(pool.submit(_scoreSubsetShard, shm.name, A.shape, setup, inner,
+                                           prefix, top_k, resync))
+
+            results = [future.result() for future in futures]
+
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # Merge the heaps of the shards
+    merged = {'AIC': [], 'Cp': [], 'adjR2': []}; count = 0
+    for heaps, shard_count in results:
+
+        count += shard_count
+
+        for criterion in merged:
+            for key, index, resSS in heaps[criterion]:
+                _pushTopK(merged[criterion], key, index, resSS, top_k)
+
+    seconds = time.perf_counter()-start
+
+    result = {'subsets': count, 'seconds': seconds, 'rate': count/seconds}
+
+    for criterion in merged:
+
+        result[criterion] = []
+
+        for key, index, resSS in sorted(merged[criterion], reverse=True):
+
+            size = len(index)
+
+            result[criterion].append({
+                'r': size-len(forced),
+                'index': list(index),
+                'resSS': resSS,
+                'AIC': n*np.log(resSS/n)+2*size,
+                'Cp': resSS/setup['sigma2'] - n + 2*size,
+                'adjR2': 1-(resSS/setup['totSS'])*((n-1)/(n-size)),
+            })
+
+    return result
@@ -0,0 +1,66 @@
+###################################################################################
+# Plots of the selection criteria
+#
+# matplotlib is imported by the plotting functions themselves, so importing
+# the package (or a worker process that never plots) does not pay for it.
+###################################################################################
+import numpy as np
+
+def _getPyplot():
+
+    import matplotlib.pyplot as plt
+
+    return plt
+
+###################################################################################
+# Bar plot of a criterion ('AIC', 'Cp' or 'adjR2') of the best model of every
+# size (see best_subsets.getBestSubsets). The figure is saved to file_name if
+# given and shown otherwise.
+###################################################################################
+def plotBestSubsetCriterion(models, criterion, file_name=None):
+
+    plt = _getPyplot()
+
+    sizes = sorted(set(model['r'] for model in models))
+
+    if criterion == 'adjR2':
+        values = [max(model[criterion] for model in models if model['r'] == r) for r in sizes]
+    else:
+        values = [min(model[criterion] for model in models if model['r'] == r) for r in sizes]
+
+    labels = {'AIC': 'AIC', 'Cp': 'C_p', 'adjR2': 'Adjusted R2'}
+
+    plt.figure()
+    plt.title('%s of the best subset of each size' % labels[criterion])
+    plt.xticks(sizes, [str(r) for r in sizes])
+    plt.xlabel('number of predictors', fontsize=12)
+    plt.ylabel('%s value' % labels[criterion], fontsize=12)
+    plt.bar(sizes, values)
+
+    if file_name is not None:
+        plt.savefig(file_name)
+        plt.close()
+    else:
+        plt.show()
+
+###################################################################################
+# Line plot of the CV error along the stepwise path, with one standard error
+# (see cross_validation.getPathCrossValidation)
+###################################################################################
+def plotPathCrossValidation(cv, file_name=None):
+
+    plt = _getPyplot()
+
+    steps = np.arange(len(cv['mse']))
+
+    plt.figure()
+    plt.title('Cross-validated error along the stepwise path')
+    plt.errorbar(steps, cv['mse'], yerr=cv['se'], marker='o')
+    plt.xlabel('step', fontsize=12)
+    plt.ylabel('CV MSE', fontsize=12)
+
+    if file_name is not None:
+        plt.savefig(file_name)
+        plt.close()
+    else:
+        plt.show()
@@ -0,0 +1,170 @@
+###################################################################################
+# Mixed precision: float32 data, float64 cross-products and refinement
+#
+# The data are stored and streamed in float32, which halves the memory and the
+# memory traffic of the rows. Each chunk is widened to float64 only for its own
+# products, and the products of the chunks are added with compensated
+# (Neumaier) summation, so the cross-products carry no float32 rounding beyond
+# that of the stored values. The selection then sweeps a float32 copy of the
+# scaled augmented matrix (half the memory of the p x p sweep), and the
+# selected model is refined in float64: it is swept again from the float64
+# cross-products, and if any F test of the refined model decides differently,
+# the stepwise steps continue in float64 until none does. The coefficients, F
+# ratios and RSS reported are all float64. getPrecisionDeviation measures the
+# difference from the same selection run all in float64.
+###################################################################################
+import numpy as np
+
+from .sweep import getAugmentedCrossProducts, sweepOperator, sweepStepwiseSteps, getSweptModel
+from .tracing import timePhase
+
+###################################################################################
+# total + value with compensated summation: the rounding error of every
+# addition is kept in compensation, and the sum is total + compensation
+###################################################################################
+def addCompensated(total, compensation, value):
+
+    t = total + value
+
+    compensation += np.where(np.abs(total) >= np.abs(value), (total - t) + value, (value - t) + total)
+    total[...] = t
+
+###################################################################################
+# Generator of chunks of the columns of data over the rows where keep is True,
+# cast to dtype, e.g. the complete rows of the columns of missing_data stats
+###################################################################################
+def readRowChunks(data, keep, columns, chunk_rows=65536, dtype=np.float32):
+
+    for start in range(0, data.shape[0], chunk_rows):
+
+        rows = slice(start, start+chunk_rows)
+
+        with timePhase('ingest'):
+            chunk = np.asarray(data[rows], dtype=dtype)[np.asarray(keep[rows])][:, columns]
+
+        yield chunk
+
+###################################################################################
+# Cross-products of the chunks as in ingest.getStreamingCrossProducts, with the
+# chunks cast to dtype (float32) and the products of the chunks added in
+# float64 with compensated summation
+###################################################################################
+def getMixedPrecisionCrossProducts(chunks, response_col, intercept=True, dtype=np.float32):
+
+    sums = None; n = 0
+
+    for chunk in chunks:
+
+        chunk = np.asarray(chunk, dtype=dtype)
+
+        with timePhase('gram'):
+
+            y = chunk[:, response_col].astype(float)
+            z = np.delete(chunk, response_col, axis=1).astype(float)
+
+            if intercept:
+                z = np.column_stack((np.ones(z.shape[0]), z))
+
+            products = [z.T.dot(z), z.T.dot(y), np.array(y.dot(y)), np.array(y.sum()), z.sum(axis=0)]
+
+            if sums is None:
+                sums = [np.zeros_like(value) for value in products]
+                compensations = [np.zeros_like(value) for value in products]
+
+            for total, compensation, value in zip(sums, compensations, products):
+                addCompensated(total, compensation, value)
+
+            n += z.shape[0]
+
+    ZtZ, Zty, yty, ysum, Zsum = [total + compensation for total, compensation in zip(sums, compensations)]
+
+    stats = {
+        'ZtZ': ZtZ,
+        'Zty': Zty,
+        'yty': float(yty),
+        'ysum': float(ysum),
+        'n': n,
+        'Zsum': Zsum,
+    }
+
+    return stats
+
+###################################################################################
+# Stepwise selection on a float32 swept matrix, refined in float64. Returns the
+# model of sweep.getSweepStepwisePredictors with the extra keys
+#   'selected'       columns selected in float32
+#   'refined_steps'  steps taken in float64 after the refinement (0 when the
+#                    float32 selection passes every F test in float64)
+###################################################################################
+def getMixedPrecisionStepwise(stats, alpha_value, forced=(0,), max_steps=None):
+
+    alpha = alpha_value; n = stats['n']
+
+    A, d = getAugmentedCrossProducts(stats)
+    p = A.shape[0]-1
+
+    is_forced = np.zeros(p, dtype=bool)
+    is_forced[list(forced)] = True
+
+    if max_steps is None:
+        max_steps = 4*p
+
+    # Selection in float32
+    A32 = A.astype(np.float32)
+    in_model = np.zeros(p, dtype=bool)
+
+    for k in forced:
+        sweepOperator(A32, k)
+        in_model[k] = True
+
+    sweepStepwiseSteps(A32, in_model, is_forced, n, alpha, max_steps)
+
+    selected = np.flatnonzero(in_model).tolist()
+    del A32
+
+    # Refinement in float64: sweep the selected columns and take any steps the
+    # float64 F tests call for
+    for k in selected:
+        sweepOperator(A, k)
+
+    refined_steps = sweepStepwiseSteps(A, in_model, is_forced, n, alpha, max_steps)
+
+    model = getSweptModel(A, d, in_model, n)
+    model['selected'] = selected
+    model['refined_steps'] = refined_steps
+
+    return model
+
+###################################################################################
+# Deviation of a model from the reference model of the all-float64 run:
+#   'same_selection'  both selected the same columns
+#   'beta', 'F'       largest relative difference of the coefficients and of
+#                     the F ratios (over the columns both selected / all columns)
+#   'resSS'           relative difference of the RSS
+###################################################################################
+def getPrecisionDeviation(model, reference):
+
+    def relative(value, ref):
+        value = np.asarray(value, dtype=float); ref = np.asarray(ref, dtype=float)
+        if value.size == 0:
+            return 0.0
+        return float(np.max(np.abs(value-ref)/np.maximum(np.abs(ref), np.finfo(float).tiny)))
+
+    common = sorted(set(model['index']) & set(reference['index']))
+
+    beta = dict(zip(model['index'], model['beta'])); beta_ref = dict(zip(reference['index'], reference['beta']))
+
+    deviation = {
+        'same_selection': list(model['index']) == list(reference['index']),
+        'beta': relative([beta[j] for j in common], [beta_ref[j] for j in common]),
+        'F': relative(model['F'], reference['F']),
+        'resSS': relative(model['resSS'], reference['resSS']),
+    }
+
+    return deviation
+
+def printPrecisionDeviation(deviation):
+
+    print('Same selection as float64: %s' % deviation['same_selection'])
+    print('Largest relative deviation: beta %.3g, F %.3g, RSS %.3g' % (deviation['beta'], deviation['F'],
+                                                                    deviation['resSS']))
@@ -0,0 +1,123 @@
+###################################################################################
+# Stepwise selection on a sliding time window
+#
+# The window (window_days long, moved step_days at a time) is an online model
+# (see online_model): when it moves, the rows that enter are added and the rows
+# that leave are removed from its cross-products, O(p^2) per row, and the
+# stepwise steps start from the selection of the previous window. The cost of a
+# move depends on the number of rows that change, not on the window length.
+###################################################################################
+import numpy as np
+
+from .sufficient_stats import getCrossProducts
+from .online_model import getOnlineModel, updateOnlineModel, getOnlineModelSelection
+
+###################################################################################
+# Selection on every window. data are the rows of Z (with the intercept) and
+# timestamp their datetime64 times, in increasing order. Windows with fewer
+# than min_rows rows (default: twice the columns of Z) are not selected on;
+# the model is warm-started again from the last selection when the window
+# fills up. Returns a table, a dict of one entry per window:
+#   'start', 'end'    datetime64 bounds of the window [start, end)
+#   'n'               number of rows in the window
+#   'index'           selected columns of Z (None if the window was skipped)
+#   'changed'         True if the selection differs from the previous window
+#   'resSS', 'R2', 'adjR2', 'AIC'  criteria of the selected model
+###################################################################################
+def getRollingStepwiseSelection(data, response, timestamp, alpha_value, window_days=30, step_days=1,
+                                forced=(0,), min_rows=None):
+
+    z = np.asarray(data, dtype=float); y = np.asarray(response, dtype=float)
+    timestamp = np.asarray(timestamp).astype('datetime64[s]')
+
+    p = z.shape[1]
+
+    if min_rows is None:
+        min_rows = 2*p
+
+    window = np.timedelta64(window_days, 'D'); step = np.timedelta64(step_days, 'D')
+
+    first = timestamp[0].astype('datetime64[D]').astype('datetime64[s]')
+    starts = np.arange(first, timestamp[-1]-window+np.timedelta64(1, 's'), step)
+
+    # Row ranges [lo, hi) of every window
+    lo = np.searchsorted(timestamp, starts, side='left')
+    hi = np.searchsorted(timestamp, starts+window, side='left')
+
+    table = {'start': starts, 'end': starts+window, 'n': hi-lo, 'index': [], 'changed': [],
+             'resSS': [], 'R2': [], 'adjR2': [], 'AIC': []}
+
+    model = None; previous = None
+    prev_lo = prev_hi = 0
+
+    for i in range(len(starts)):
+
+        if hi[i]-lo[i] < min_rows:
+
+            model = None
+            table['index'].append(None); table['changed'].append(False)
+            for key in ['resSS', 'R2', 'adjR2', 'AIC']:
+                table[key].append(np.nan)
+
+            continue
+
+        if model is None:
+
+            model = getOnlineModel(getCrossProducts(z[lo[i]:hi[i]], y[lo[i]:hi[i]]), alpha_value, forced,
+                                   init_active=previous)
+
+        else:
+
+            # Rows entering at the end and leaving at the start, in one update
+            enter = np.arange(prev_hi, hi[i]); leave = np.arange(prev_lo, lo[i])
+            rows = np.concatenate((enter, leave))
+            weight = np.concatenate((np.ones(enter.size), -np.ones(leave.size)))
+
+            updateOnlineModel(model, z[rows], y[rows], weight)
+
+        prev_lo, prev_hi = lo[i], hi[i]
+
+        selection = getOnlineModelSelection(model)
+        stats = model['stats']
+
+        n = stats['n']; size = len(selection['index'])
+        resSS = selection['resSS']
+        totSS = stats['yty'] - stats['ysum']**2/n
+
+        table['index'].append(selection['index'])
+        table['changed'].append(previous is not None and selection['index'] != previous)
+        table['resSS'].append(resSS)
+        table['R2'].append(1-resSS/totSS)
+        table['adjR2'].append(1-(resSS/totSS)*((n-1)/(n-size)))
+        table['AIC'].append(n*np.log(resSS/n)+2*size)
+
+        previous = selection['index']
+
+    for key in ['changed', 'resSS', 'R2', 'adjR2', 'AIC']:
+        table[key] = np.array(table[key])
+
+    return table
+
+###################################################################################
+# Print the table, one line per window; names are the column names of Z
+###################################################################################
+def printRollingSelection(table, names=None):
+
+    print('%-10s  %-10s  %5s  %12s  %10s  %12s  %s' % ('start', 'end', 'n', 'RSS', 'Adj R2', 'AIC',
+                                                      'predictors'))
+
+    for i in range(len(table['start'])):
+
+        start = str(table['start'][i].astype('datetime64[D]'))
+        end = str(table['end'][i].astype('datetime64[D]'))
+
+        if table['index'][i] is None:
+            print('%-10s  %-10s  %5d  %12s  %10s  %12s  %s' % (start, end, table['n'][i], '', '', '', '-'))
+            continue
+
+        label = [names[j] if names is not None else str(j) for j in table['index'][i]]
+        mark = '* ' if table['changed'][i] else ''
+
+        print('%-10s  %-10s  %5d  %12.6g  %10.6f  %12.6g  %s%s' % (start, end, table['n'][i], table['resSS'][i],
+                                                                  table['adjR2'][i], table['AIC'][i], mark,
+                                                                  ', '.join(label)))
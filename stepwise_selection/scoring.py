@@ -0,0 +1,67 @@
+###################################################################################
+# Batch scoring of all candidate predictors against the current model
+#
+# With the Cholesky factor R of the current model S (see cholesky_updates), the
+# candidates C and y are residualized on S at once:
+#   r   = R^-T (Z_S'Z_C)               (k x m, one triangular solve)
+#   rho = sqrt(diag(Z_C'Z_C) - sum r^2)  residual norm of each candidate
+#   u   = ((Z_C'y) - r'w)/rho           residual correlation with y
+# and the reduction of RSS_S by adding candidate j is u_j^2. All scores are
+# returned as vectors over the candidates, not only the best one.
+###################################################################################
+import numpy as np
+from scipy.linalg import solve_triangular
+
+from .cholesky_updates import getColumnScale, collinear_tol
+
+###################################################################################
+# Scores of the candidates col_index given the factor of the current model:
+#   'reduction' RSS_S - RSS_{S+j}
+#   'resSS'     RSS_{S+j}
+#   'regSS'     Regression SS of S+j
+#   'R2'        R2 of S+j
+#   'F'         partial F-ratio of j with df (1, n-k-1)
+###################################################################################
+def getCandidateScores(stats, factor, col_index):
+
+    index = factor['index']; R = factor['R']; w = factor['w']
+    candidates = np.atleast_1d(np.asarray(col_index, dtype=int))
+
+    n = stats['n']; k = len(index)
+
+    dc = getColumnScale(stats, candidates)
+
+    if k == 0:
+
+        r = np.zeros((0, candidates.size))
+    else:
+
+        C = stats['ZtZ'][np.ix_(index, candidates)]/np.outer(getColumnScale(stats, index), dc)
+        r = solve_triangular(R, C, trans='T')
+
+    rho2 = np.diag(stats['ZtZ'])[candidates]/dc**2 - np.sum(r**2, axis=0)
+    eligible = rho2 > collinear_tol
+
+    u = np.zeros(candidates.size)
+    u[eligible] = (stats['Zty'][candidates][eligible]/dc[eligible]
+                   - w.dot(r[:, eligible]))/np.sqrt(rho2[eligible])
+
+    reduction = u**2
+    resSS = factor['resSS'] - reduction
+    totSS = stats['yty'] - stats['ysum']**2/n
+
+    df2 = n-k-1
+    F = np.zeros(candidates.size)
+    F[eligible] = reduction[eligible]/(resSS[eligible]/df2)
+
+    scores = {
+        'index': candidates,
+        'reduction': reduction,
+        'resSS': resSS,
+        'regSS': totSS - resSS,
+        'R2': (totSS - resSS)/totSS,
+        'F': F,
+        'df': (1, df2),
+    }
+
+    return scores
@@ -0,0 +1,403 @@
+###################################################################################
+# Screening and stepwise selection over thousands of candidate predictors
+#
+# The p x p cross-products of the other engines are quadratic in the number of
+# candidates (20000 candidates are 3.2 GB). Here no p x p matrix is formed:
+#   1. Sure independence screening: one streaming pass gives the column sums,
+#      sums of squares and X'y (one matrix-vector product per chunk), hence
+#      the marginal correlation of every standardized column with y, and the
+#      size columns of largest |correlation| are kept.
+#   2. A column pool of the kept columns (with the intercept as column 0) is
+#      read in a second pass; the cross-products with a column are computed
+#      only when it enters the model (gram_column).
+#   3. The stepwise steps keep, for the k columns of the model, the
+#      projections W (k x q) of every candidate on the orthonormal basis of
+#      the model, with W[:, model] = R, the Cholesky factor of
+#      cholesky_updates. An add is one new row of W and a drop is k Givens
+#      rotations of its rows, both O(q*k); the residual norm and residual
+#      covariance with y of every candidate are updated from the row in O(q).
+# Peak memory is the pool (n x q) and W (k x q), linear in the candidates.
+###################################################################################
+import numpy as np
+from scipy.linalg import solve_triangular
+
+from .model_cache import getCriticalValue
+from .tracing import timePhase, countEvent, recordEvent
+
+# Residual fraction of a (unit-scaled) column below which it is treated as a
+# linear combination of the columns already in the model.
+collinear_tol = 1e-12
+
+###################################################################################
+# Column sums, sums of squares and cross-products with y of the predictors of
+# the chunks (every column but response_col), in one pass. The chunks are
+# shifted by the means of the first chunk so that the centred moments do not
+# cancel. 'columns' are the columns of the chunks the predictors came from.
+###################################################################################
+def getMarginalStats(chunks, response_col):
+
+    marginal = None
+
+    for chunk in chunks:
+
+        chunk = np.asarray(chunk, dtype=float)
+
+        with timePhase('screening'):
+
+            if marginal is None:
+
+                shift = chunk.mean(axis=0)
+                columns = [j for j in range(chunk.shape[1]) if j != response_col]
+
+                marginal = {
+                    'n': 0,
+                    'sum': np.zeros(len(columns)),
+                    'sumsq': np.zeros(len(columns)),
+                    'Xty': np.zeros(len(columns)),
+                    'ysum': 0.0,
+                    'yty': 0.0,
+                    'shift': shift[columns],
+                    'yshift': shift[response_col],
+                    'columns': columns,
+                }
+
+            y = chunk[:, response_col] - marginal['yshift']
+            X = chunk[:, columns] - marginal['shift']
+
+            marginal['n'] += X.shape[0]
+            marginal['sum'] += X.sum(axis=0)
+            marginal['sumsq'] += np.einsum('ij,ij->j', X, X)
+            marginal['Xty'] += X.T.dot(y)
+            marginal['ysum'] += y.sum()
+            marginal['yty'] += y.dot(y)
+
+    return marginal
+
+###################################################################################
+# Marginal correlation of every predictor with y; 0 for a constant column
+###################################################################################
+def getMarginalCorrelations(marginal):
+
+    n = marginal['n']
+
+    mean = marginal['sum']/n; ymean = marginal['ysum']/n
+
+    Sxx = marginal['sumsq'] - n*mean**2
+    Sxy = marginal['Xty'] - n*mean*ymean
+    Syy = marginal['yty'] - n*ymean**2
+
+    scale = np.sqrt(np.maximum(Sxx, 0)*max(Syy, 0))
+
+    return np.divide(Sxy, scale, out=np.zeros_like(Sxy), where=scale > 0)
+
+###################################################################################
+# The columns of the chunks (see getMarginalStats) of the size predictors of
+# largest |marginal correlation|, in column order. The default size is
+# n/log(n), the screening size of Fan and Lv (2008).
+###################################################################################
+def getScreenedColumns(marginal, size=None):
+
+    corr = np.abs(getMarginalCorrelations(marginal))
+
+    if size is None:
+        size = int(marginal['n']/np.log(marginal['n']))
+
+    size = min(size, corr.size)
+
+    if size < corr.size:
+        top = np.argpartition(-corr, size)[:size]
+    else:
+        top = np.arange(corr.size)
+
+    return sorted(marginal['columns'][i] for i in top)
+
+###################################################################################
+# Column pool of the columns of the chunks with the response response_col: the
+# rows Z = [1 X_columns] and y, read in one pass, with
+#   'Zty', 'diag' (= diag(Z'Z)), 'yty', 'ysum', 'n', 'columns'
+#   'gram_column'   gram_column(j) = Z'z_j, computed on demand in O(n*q)
+###################################################################################
+def getColumnPool(chunks, response_col, columns):
+
+    Z = []; y = []
+
+    for chunk in chunks:
+
+        chunk = np.asarray(chunk, dtype=float)
+
+        Z.append(chunk[:, columns]); y.append(chunk[:, response_col])
+
+    Z = np.column_stack((np.ones(sum(z.shape[0] for z in Z)), np.concatenate(Z)))
+    y = np.concatenate(y)
+
+    def gram_column(j):
+
+        countEvent('gram_columns')
+
+        with timePhase('gram'):
+            return Z.T.dot(Z[:, j])
+
+    pool = {
+        'Zty': Z.T.dot(y),
+        'diag': np.einsum('ij,ij->j', Z, Z),
+        'yty': y.dot(y),
+        'ysum': y.sum(),
+        'n': Z.shape[0],
+        'columns': list(columns),
+        'gram_column': gram_column,
+    }
+
+    return pool
+
+###################################################################################
+# State of the stepwise steps on a pool: the model 'index' (in the order of
+# entry), the projections 'W' of the unit-scaled columns on its orthonormal
+# basis (rows beyond the model are spare capacity) and those 'w' of y, the
+# residual fraction 'rho2' of every column and its residual covariance 's'
+# with y, and the 'resSS' of the model
+###################################################################################
+def _getPoolState(pool):
+
+    q = pool['Zty'].shape[0]
+
+    d = np.sqrt(pool['diag'])
+    d[d == 0] = 1.0
+
+    state = {
+        'index': [],
+        'W': np.zeros((8, q)),
+        'w': np.zeros(8),
+        'rho2': pool['diag']/d**2,
+        's': pool['Zty']/d,
+        'resSS': pool['yty'],
+        'd': d,
+    }
+
+    return state
+
+def _getPoolFactor(state):
+
+    k = len(state['index'])
+
+    factor = {
+        'index': state['index'],
+        'R': state['W'][:k, state['index']],
+        'w': state['w'][:k],
+        'resSS': state['resSS'],
+    }
+
+    return factor
+
+###################################################################################
+# Append column col to the model: the new row of W is the projection of every
+# column on the residual of col, (g - W'W[:, col])/rho with g the scaled Gram
+# column of col
+###################################################################################
+def _addPoolColumn(pool, state, col):
+
+    index = state['index']; k = len(index); d = state['d']
+
+    if k == state['W'].shape[0]:
+        state['W'] = np.vstack((state['W'], np.zeros_like(state['W'])))
+        state['w'] = np.append(state['w'], np.zeros_like(state['w']))
+
+    W = state['W']; w = state['w']
+
+    g = pool['gram_column'](col)/(d*d[col])
+    rho = np.sqrt(state['rho2'][col])
+
+    row = (g - W[:k, col].dot(W[:k]))/rho
+    row[index] = 0.0; row[col] = rho
+
+    u = state['s'][col]/rho
+
+    W[k] = row; w[k] = u
+    index.append(col)
+
+    state['rho2'] -= row**2
+    state['s'] -= row*u
+    state['rho2'][index] = 0.0; state['s'][index] = 0.0
+    state['resSS'] = pool['yty'] - w[:k+1].dot(w[:k+1])
+
+###################################################################################
+# Drop the column at position of the model: the Givens rotations of
+# cholesky_updates, applied to the whole rows of W, leave the direction of the
+# dropped column in the last row, which is given back to rho2, s and the RSS
+###################################################################################
+def _dropPoolColumn(pool, state, position):
+
+    index = state['index']; k = len(index)
+    W = state['W']; w = state['w']
+
+    for j in range(position, k-1):
+
+        col = index[j+1]
+        a = W[j, col]; b = W[j+1, col]
+        h = np.hypot(a, b)
+
+        if h == 0:
+            continue
+
+        c = a/h; s = b/h
+
+        G = np.array([[c, s], [-s, c]])
+        W[j:j+2] = G.dot(W[j:j+2])
+        w[j:j+2] = G.dot(w[j:j+2])
+        W[j+1, col] = 0.0
+
+    last = W[k-1].copy(); u = w[k-1]
+    W[k-1] = 0.0; w[k-1] = 0.0
+
+    del index[position]
+
+    state['rho2'] += last**2
+    state['s'] += last*u
+    state['rho2'][index] = 0.0; state['s'][index] = 0.0
+    state['resSS'] = pool['yty'] - w[:k-1].dot(w[:k-1])
+
+###################################################################################
+# F-to-enter of every column not in the model (0 for the others), df = (1, n-k-1)
+###################################################################################
+def _getPoolEnterRatios(state, observations):
+
+    n = observations; k = len(state['index'])
+
+    rho2 = state['rho2']
+    add = rho2 > collinear_tol
+
+    reduction = np.zeros_like(rho2)
+    reduction[add] = state['s'][add]**2/rho2[add]
+
+    F = np.zeros_like(rho2)
+    F[add] = reduction[add]/((state['resSS']-reduction[add])/(n-k-1))
+
+    return F
+
+###################################################################################
+# F-to-remove of every column of the model, in the order of the model,
+# df = (1, n-k): the RSS increases by beta_j^2/(R'R)^-1_jj, O(k^3) whatever
+# the number of candidates
+###################################################################################
+def _getPoolRemoveRatios(state, observations):
+
+    n = observations; k = len(state['index'])
+
+    factor = _getPoolFactor(state)
+    resSS = state['resSS']
+
+    Rinv = solve_triangular(factor['R'], np.eye(k), check_finite=False)
+    beta = Rinv.dot(factor['w'])
+
+    return (beta**2/np.einsum('ij,ij->i', Rinv, Rinv))/(resSS/(n-k))
+
+###################################################################################
+# Stepwise selection on a column pool (see getColumnPool), from the forced
+# columns (e.g., the intercept, column 0), which are never dropped: alternately
+# add the column with the largest F-to-enter and drop the column with the
+# smallest F-to-remove, as sweep.sweepStepwiseSteps does, until neither is
+# significant at the level alpha. Returns the model of sweep.getSweptModel
+# ('index', 'F', 'resSS', 'beta', over the columns of the pool) and the
+# 'columns' of the chunks selected.
+###################################################################################
+def getPoolStepwise(pool, alpha_value, forced=(0,), max_steps=None):
+
+    alpha = alpha_value; n = pool['n']
+    q = pool['Zty'].shape[0]
+
+    state = _getPoolState(pool)
+
+    for col in forced:
+        _addPoolColumn(pool, state, col)
+
+    if max_steps is None:
+        max_steps = 4*q
+
+    steps = 0
+    while steps < max_steps:
+
+        changed = False
+        k = len(state['index'])
+
+        # Forward: the candidate with the largest F-to-enter
+        with timePhase('scoring'):
+            F_add = _getPoolEnterRatios(state, n)
+
+        with timePhase('f_test'):
+
+            if k < q and n-k-1 > 0:
+
+                j = int(np.argmax(F_add))
+                c_value = getCriticalValue(alpha, 1, n-k-1)
+
+                if F_add[j] > c_value:
+
+                    _addPoolColumn(pool, state, j)
+                    changed = True; steps += 1
+                    k += 1
+
+                    recordEvent('step', engine='screening', action='add', variable=j, F=float(F_add[j]),
+                                c_value=c_value)
+
+        # Backward: the column in the model with the smallest F-to-remove
+        with timePhase('backward'):
+
+            F_drop = np.where(np.isin(state['index'], forced), np.inf, _getPoolRemoveRatios(state, n))
+
+            i = int(np.argmin(F_drop)) if k > 0 else 0
+            c_value = getCriticalValue(alpha, 1, n-k)
+
+            if k > 0 and F_drop[i] < c_value:
+
+                j = state['index'][i]
+
+                _dropPoolColumn(pool, state, i)
+                changed = True; steps += 1
+
+                recordEvent('step', engine='screening', action='drop', variable=j, F=float(F_drop[i]),
+                            c_value=c_value)
+
+        if not changed:
+            break
+
+    return _getPoolModel(pool, state)
+
+def _getPoolModel(pool, state):
+
+    n = pool['n']; index = state['index']
+
+    F = _getPoolEnterRatios(state, n)
+    F[index] = _getPoolRemoveRatios(state, n)
+
+    factor = _getPoolFactor(state)
+    beta = solve_triangular(factor['R'], factor['w'], check_finite=False)/state['d'][index]
+
+    order = np.argsort(index)
+
+    model = {
+        'index': [index[i] for i in order],
+        'F': F,
+        'resSS': state['resSS'],
+        'beta': beta[order],
+        'columns': [pool['columns'][index[i]-1] for i in order if index[i] > 0],
+    }
+
+    return model
+
+###################################################################################
+# Screening and stepwise selection of the predictors of the chunks:
+# readChunks() returns a new generator of the chunks, which are read twice
+# (the marginal statistics, then the pool of the screened columns). The
+# model of getPoolStepwise has the extra key 'screened' (the columns kept by
+# the screening).
+###################################################################################
+def getScreenedStepwise(readChunks, response_col, alpha_value, size=None):
+
+    marginal = getMarginalStats(readChunks(), response_col)
+    screened = getScreenedColumns(marginal, size)
+
+    pool = getColumnPool(readChunks(), response_col, screened)
+
+    model = getPoolStepwise(pool, alpha_value)
+    model['screened'] = screened
+
+    return model
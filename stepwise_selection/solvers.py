@@ -0,0 +1,226 @@
+###################################################################################
+# Least squares solvers for the fit of a subset of columns
+#
+#   'cholesky'    Cholesky factorization of the Gram matrix Z_S'Z_S scaled to
+#                 unit diagonal: the fastest, but it squares the condition
+#                 number of Z_S
+#   'qr'          Householder QR of the columns S of R, the triangular factor
+#                 of the rows [Z y] (R'R = [Z y]'[Z y], see updateRowFactor):
+#                 Z_S'Z_S is never formed, so it is stable
+#   'pivoted_qr'  QR with column pivoting of the same columns: rank-revealing,
+#                 the columns beyond the numerical rank get coefficient 0
+# The QR solvers need the key 'R' of the stats (row_factor=True in
+# getCrossProducts or getStreamingCrossProducts). Every solver returns the
+# coefficients, the RSS, the numerical rank, an estimate of the 1-norm
+# condition number of the unit-scaled Z_S (LAPACK pocon and trcon), the scale
+# d of the columns and the factor of the scaled Gram matrix G = Z_S'Z_S/dd' in
+# the form of cho_factor, (c, lower): the Cholesky factor of G, or the R of the
+# QR of Z_S/d (R'R = G up to the signs of the rows of R), so cho_solve works
+# on every factor. The pivoted QR (and the Cholesky of a rank-deficient subset)
+# factors the columns pivot of G, and its factor is cut to the leading rank
+# columns.
+###################################################################################
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve, qr, solve_triangular
+from scipy.linalg.lapack import dpocon, dpstrf, dtrcon
+
+default_solver = 'cholesky'
+
+# Relative size of a diagonal entry of the pivoted R below which its column is
+# taken as a linear combination of the columns before it
+rank_tol = 1e-10
+
+###################################################################################
+# Fold the rows block [Z y] into the triangular factor R (None for no rows yet):
+# the R of [R; block], so the factor of all the rows is built chunk by chunk
+###################################################################################
+def updateRowFactor(R, block):
+
+    block = np.asarray(block, dtype=float)
+
+    if R is not None:
+        block = np.vstack((R, block))
+
+    R = qr(block, mode='r', check_finite=False)[0]
+
+    # qr returns min(rows, columns) rows; pad with zeros when there are fewer
+    # rows than columns so far
+    q = block.shape[1]
+    if R.shape[0] < q:
+        R = np.vstack((R, np.zeros((q-R.shape[0], q))))
+
+    return R
+
+def _getScale(stats, index):
+
+    d = np.sqrt(np.diag(stats['ZtZ'])[index])
+    d[d == 0] = 1.0
+
+    return d
+
+def _getRowFactor(stats, solver):
+
+    if 'R' not in stats:
+        raise ValueError("solver %r needs the row factor 'R' of the stats (row_factor=True)" % (solver,))
+
+    return stats['R']
+
+###################################################################################
+# Cholesky on the scaled Gram matrix. A subset with collinear columns (G not
+# positive definite) falls back to the Cholesky factorization with complete
+# pivoting (LAPACK pstrf): the basic solution on the leading rank columns, as
+# in solvePivotedQR, with condition estimate inf.
+###################################################################################
+def _solvePivotedCholesky(stats, index, G, Zty, d):
+
+    c, pivot, rank, info = dpstrf(G, lower=0)
+    pivot = pivot-1
+
+    U = np.triu(c)[:rank, :rank]
+    lead = pivot[:rank]
+
+    x = np.zeros(len(index))
+    x[lead] = cho_solve((U, False), Zty[lead]/d[lead], check_finite=False)
+
+    beta = x/d
+
+    fit = {
+        'beta': beta,
+        'resSS': stats['yty'] - beta.dot(Zty),
+        'rank': int(rank),
+        'cond': np.inf,
+        'factor': (U, False),
+        'pivot': pivot,
+        'scale': d,
+    }
+
+    return fit
+
+def solveCholesky(stats, index):
+
+    ZtZ = stats['ZtZ'][np.ix_(index, index)]
+    Zty = stats['Zty'][index]
+
+    d = _getScale(stats, index)
+    G = ZtZ/np.outer(d, d)
+
+    try:
+        factor = cho_factor(G, check_finite=False)
+    except np.linalg.LinAlgError:
+        return _solvePivotedCholesky(stats, index, G, Zty, d)
+
+    # A factorization that succeeded only through rounding: a pivot below the
+    # default tolerance of pstrf, len(index)*eps of the unit diagonal
+    if np.min(np.diag(factor[0]))**2 < len(index)*np.finfo(float).eps:
+        return _solvePivotedCholesky(stats, index, G, Zty, d)
+
+    rcond, info = dpocon(factor[0], np.abs(G).sum(axis=0).max(), 'L' if factor[1] else 'U')
+
+    beta = cho_solve(factor, Zty/d, check_finite=False)/d
+
+    fit = {
+        'beta': beta,
+        'resSS': stats['yty'] - beta.dot(Zty),
+        'rank': len(index),
+        'cond': np.sqrt(1/rcond) if rcond > 0 else np.inf,
+        'factor': factor,
+        'scale': d,
+    }
+
+    return fit
+
+###################################################################################
+# Householder QR of R[:, S] (scaled to unit column norms); the RSS is the
+# squared norm of the residual of the y column of R. A subset with collinear
+# columns falls back to solvePivotedQR.
+###################################################################################
+def solveQR(stats, index):
+
+    R = _getRowFactor(stats, 'qr')
+    p = stats['ZtZ'].shape[0]
+
+    d = _getScale(stats, index)
+    M = R[:, index]/d; b = R[:, p]
+
+    Q, T = qr(M, mode='economic', check_finite=False)
+
+    # Collinear columns: the rank-revealing QR
+    rcond, info = dtrcon(T)
+    if rcond < rank_tol:
+        return solvePivotedQR(stats, index)
+
+    x = solve_triangular(T, Q.T.dot(b), check_finite=False)
+    residual = b - M.dot(x)
+
+    fit = {
+        'beta': x/d,
+        'resSS': residual.dot(residual),
+        'rank': len(index),
+        'cond': 1/rcond if rcond > 0 else np.inf,
+        'factor': (T, False),
+        'scale': d,
+    }
+
+    return fit
+
+###################################################################################
+# QR with column pivoting of R[:, S]: the basic solution on the leading rank
+# columns, with coefficient 0 for the others
+###################################################################################
+def solvePivotedQR(stats, index):
+
+    R = _getRowFactor(stats, 'pivoted_qr')
+    p = stats['ZtZ'].shape[0]
+
+    d = _getScale(stats, index)
+    M = R[:, index]/d; b = R[:, p]
+
+    Q, T, pivot = qr(M, mode='economic', pivoting=True, check_finite=False)
+
+    diag = np.abs(np.diag(T))
+    rank = int(np.count_nonzero(diag > rank_tol*diag[0])) if diag.size > 0 and diag[0] > 0 else 0
+
+    x = np.zeros(len(index))
+    x[pivot[:rank]] = solve_triangular(T[:rank, :rank], Q[:, :rank].T.dot(b), check_finite=False)
+
+    rcond, info = dtrcon(T[:rank, :rank]) if rank > 0 else (0.0, 0)
+    residual = b - M.dot(x)
+
+    fit = {
+        'beta': x/d,
+        'resSS': residual.dot(residual),
+        'rank': rank,
+        'cond': 1/rcond if rcond > 0 else np.inf,
+        'factor': (T[:rank, :rank], False),
+        'pivot': pivot,
+        'scale': d,
+    }
+
+    return fit
+
+solvers = {
+    'cholesky': solveCholesky,
+    'qr': solveQR,
+    'pivoted_qr': solvePivotedQR,
+}
+
+def getSolver(name):
+
+    if name not in solvers:
+        raise ValueError('solver must be one of %s, not %r' % (', '.join(sorted(solvers)), name))
+
+    return solvers[name]
+
+###################################################################################
+# Numerical rank of a matrix from its QR with column pivoting
+###################################################################################
+def getNumericalRank(matrix):
+
+    T = qr(np.asarray(matrix, dtype=float), mode='r', pivoting=True, check_finite=False)[0]
+
+    diag = np.abs(np.diag(T))
+
+    if diag.size == 0 or diag[0] == 0:
+        return 0
+
+    return int(np.count_nonzero(diag > rank_tol*diag[0]))
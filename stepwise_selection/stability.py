@@ -0,0 +1,161 @@
+###################################################################################
+# Stability selection on a process pool
+#
+# The stepwise selection is run on B bootstrap (or subsample) replicates of the
+# rows, and the result is how often each predictor, and each subset, is
+# selected. The rows [Z y] are put in shared memory once and every worker reads
+# them in place. A replicate is a weight vector over the rows (the bootstrap
+# counts, or 0/1 for a subsample), so its cross-products are the weighted
+# products [Z y]'W[Z y] accumulated over chunks of rows, and no resampled copy
+# of the data is ever made.
+###################################################################################
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .sweep import getSweepStepwisePredictors
+
+###################################################################################
+# Weights of replicate b: bootstrap counts, or a subsample of half the rows
+# without replacement. The generator is seeded with (seed, b), so a replicate
+# does not depend on the worker that draws it.
+###################################################################################
+def getReplicateWeights(observations, b, mode='bootstrap', seed=0):
+
+    n = observations
+    rng = np.random.default_rng([seed, b])
+
+    if mode == 'bootstrap':
+        return np.bincount(rng.integers(0, n, n), minlength=n).astype(float)
+
+    if mode == 'subsample':
+        weights = np.zeros(n)
+        weights[rng.choice(n, n//2, replace=False)] = 1.0
+        return weights
+
+    raise ValueError("mode must be 'bootstrap' or 'subsample', not %r" % (mode,))
+
+###################################################################################
+# Weighted cross-products of the rows X = [Z y] as in getCrossProducts
+###################################################################################
+def getWeightedCrossProducts(X, weights, chunk_rows=65536):
+
+    p = X.shape[1]-1
+    G = np.zeros((p+1, p+1)); s = np.zeros(p+1)
+
+    for start in range(0, X.shape[0], chunk_rows):
+
+        block = X[start:start+chunk_rows]; w = weights[start:start+chunk_rows]
+
+        G += block.T.dot(w[:, None]*block)
+        s += w.dot(block)
+
+    stats = {
+        'ZtZ': G[:p, :p],
+        'Zty': G[:p, p],
+        'yty': float(G[p, p]),
+        'ysum': float(s[p]),
+        'n': int(round(weights.sum())),
+    }
+
+    return stats
+
+###################################################################################
+# Worker: the selections of the replicates in replicates
+###################################################################################
+def _selectReplicates(shm_name, shape, replicates, alpha_value, forced, mode, seed):
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+
+    try:
+
+        X = np.ndarray(shape, dtype=float, buffer=shm.buf)
+
+        selections = []
+        for b in replicates:
+
+            weights = getReplicateWeights(shape[0], b, mode, seed)
+            model = getSweepStepwisePredictors(getWeightedCrossProducts(X, weights), alpha_value, forced)
+
+            selections.append(tuple(model['index']))
+
+    finally:
+        shm.close()
+
+    return selections
+
+###################################################################################
+# Stability selection over B replicates of the rows of Z (with the intercept)
+# and y. Returns a dict with
+#   'replicates'  B
+#   'frequency'   fraction of replicates that selected each column of Z
+#   'subsets'     the top_k most common selected subsets, as (index, frequency)
+#   'seconds'     wall-clock seconds
+###################################################################################
+def getStabilitySelection(data, response, alpha_value, B=1000, mode='bootstrap', forced=(0,), top_k=10,
+                          max_workers=None, seed=0):
+
+    X = np.column_stack((np.asarray(data, dtype=float), np.asarray(response, dtype=float)))
+    p = X.shape[1]-1
+
+    forced = [int(j) for j in forced]
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    start = time.perf_counter()
+
+    shm = shared_memory.SharedMemory(create=True, size=X.nbytes)
+
+    try:
+
+        np.ndarray(X.shape, dtype=float, buffer=shm.buf)[:] = X
+
+        # About four batches of replicates per worker, so that the pool stays balanced
+        batches = np.array_split(np.arange(B), min(B, 4*max_workers))
+
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+
+            futures = [pool.submit(_selectReplicates, shm.name, X.shape, batch.tolist(), alpha_value, forced,
+                                   mode, seed) for batch in batches]
+
+            selections = [index for future in futures for index in future.result()]
+
+    finally:
+        shm.close()
+        shm.unlink()
+
+    frequency = np.zeros(p)
+    for index in selections:
+        frequency[list(index)] += 1
+
+    counts = Counter(selections)
+
+    result = {
+        'replicates': B,
+        'frequency': frequency/B,
+        'subsets': [(list(index), count/B) for index, count in counts.most_common(top_k)],
+        'seconds': time.perf_counter()-start,
+    }
+
+    return result
+
+###################################################################################
+# Print the selection frequencies and the most common subsets
+###################################################################################
+def printStabilitySelection(result, names=None):
+
+    print('%-16s  %9s' % ('variable', 'frequency'))
+
+    for j in np.argsort(-result['frequency'], kind='stable'):
+        print('%-16s  %9.3f' % (names[j] if names is not None else str(j), result['frequency'][j]))
+
+    print('%9s  %s' % ('frequency', 'subset'))
+
+    for index, frequency in result['subsets']:
+        label = [names[j] if names is not None else str(j) for j in index]
+        print('%9.3f  %s' % (frequency, ', '.join(label)))
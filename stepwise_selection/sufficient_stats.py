@@ -0,0 +1,134 @@
+###################################################################################
+# Sufficient statistics for the linear model y = Z beta + e
+#
+# Every quantity used by the selection method (RSS, RegSS, TSS, R2, adjusted R2,
+# AIC, Cp and the F ratios) depends on the data only through Z'Z, Z'y, y'y,
+# sum(y) and n. They are computed once in O(n p^2) and every model is then a
+# subset of column indices of Z, evaluated in O(p^3) independent of n.
+###################################################################################
+import numpy as np
+
+from .model_cache import getSubsetFit
+from .solvers import updateRowFactor
+
+###################################################################################
+# Function for computing the cross-products of the data matrix and the response.
+# With row_factor=True the stats also have 'R', the triangular factor of the
+# rows [Z y] that the QR solvers work on (see solvers).
+###################################################################################
+def getCrossProducts(data, response, row_factor=False):
+
+    # Set variables
+    z = np.asarray(data, dtype=float); y = np.asarray(response, dtype=float)
+
+    # Compute Z'Z, Z'y, y'y, sum(y) and the column sums in a single pass over the rows
+    stats = {
+        'ZtZ': z.T.dot(z),
+        'Zty': z.T.dot(y),
+        'yty': float(y.dot(y)),
+        'ysum': float(y.sum()),
+        'n': z.shape[0],
+        'Zsum': z.sum(axis=0),
+    }
+
+    if row_factor:
+        stats['R'] = updateRowFactor(None, np.column_stack((z, y)))
+
+    return stats
+
+###################################################################################
+# Coefficients of the subset col_index, in the order of col_index. The fit
+# (see model_cache) is shared by every criterion computed on the same subset.
+###################################################################################
+def getSubsetCoefficients(stats, col_index):
+
+    index = np.atleast_1d(col_index)
+
+    fit = getSubsetFit(stats, index)
+
+    return fit['beta'][np.searchsorted(fit['index'], index)]
+
+###################################################################################
+# Residual Sum of Squares: y'(I-Pz)y = y'y - beta_hat'Z'y
+###################################################################################
+def getSubsetResidualSS(stats, col_index):
+
+    index = np.atleast_1d(col_index)
+
+    if index.size == 0:
+        return stats['yty']
+
+    return getSubsetFit(stats, index)['resSS']
+
+###################################################################################
+# Total Sum of Squares about Mean: y'(I-P1)y = y'y - n*ybar^2
+###################################################################################
+def getSubsetTotalMeanSS(stats):
+
+    return stats['yty'] - stats['ysum']**2/stats['n']
+
+###################################################################################
+# Regression Sum of Squares: y'(Pz-P1)y = TSS - RSS
+###################################################################################
+def getSubsetRegressionSS(stats, col_index):
+
+    return getSubsetTotalMeanSS(stats) - getSubsetResidualSS(stats, col_index)
+
+###################################################################################
+# R2 and Adjusted R2. r is the number of predictors, i.e., the number of
+# columns in the subset without the intercept column.
+###################################################################################
+def getSubsetRatioRegressionSS(stats, col_index):
+
+    return getSubsetRegressionSS(stats, col_index)/getSubsetTotalMeanSS(stats)
+
+def getSubsetAdjustedRatioRegressionSS(stats, col_index):
+
+    n = stats['n']; r = np.atleast_1d(col_index).size-1
+
+    R2 = getSubsetRatioRegressionSS(stats, col_index)
+
+    return 1-(1-R2)*((n-1)/(n-r-1))
+
+###################################################################################
+# Akaike's Information Criterion with p = r+1 columns in the subset
+###################################################################################
+def getSubsetAIC(stats, col_index):
+
+    n = stats['n']; p = np.atleast_1d(col_index).size
+
+    resSS = getSubsetResidualSS(stats, col_index)
+
+    return n*np.log(resSS/n)+(2*p)
+
+###################################################################################
+# Mallows' C_p of a subset: RSS/sigma2 - n + 2p with p = r+1 columns in the
+# subset and sigma2 = RSS_full/(n-p_full) estimated from the full model
+###################################################################################
+def getSubsetCp(stats, col_index, full_index):
+
+    n = stats['n']; p = np.atleast_1d(col_index).size
+    p_full = np.atleast_1d(full_index).size
+
+    sigma2 = getSubsetResidualSS(stats, full_index)/(n-p_full)
+
+    return getSubsetResidualSS(stats, col_index)/sigma2 - n + 2*p
+
+###################################################################################
+# F ratio for H0: the columns of col_index that are not in reduced_index are 0.
+# Returns the F ratio with its degrees of freedom (df1, df2).
+###################################################################################
+def getSubsetFRatio(stats, col_index, reduced_index):
+
+    n = stats['n']
+    p = np.atleast_1d(col_index).size; q = np.atleast_1d(reduced_index).size
+
+    df1 = p-q
+    df2 = n-p
+
+    resSS = getSubsetResidualSS(stats, col_index)
+    resSS1 = getSubsetResidualSS(stats, reduced_index)
+
+    F = ((resSS1-resSS)/df1)/(resSS/df2)
+
+    return F, df1, df2
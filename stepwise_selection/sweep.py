@@ -0,0 +1,216 @@
+###################################################################################
+# Stepwise selection with the Beaton sweep operator
+#
+# The augmented cross-product matrix
+#       A = [ Z'Z  Z'y ]
+#           [ y'Z  y'y ]
+# is swept on the columns in the model. After sweeping the set S:
+#   A[y,y]          = RSS_S
+#   A[j,y]          = beta_j,  A[j,j] = -(Z_S'Z_S)^-1_jj       for j in S
+#   A[j,y]^2/A[j,j] = reduction of RSS_S by adding z_j     for j not in S
+# so one sweep (add) or reverse sweep (drop) is O(p^2), and the partial F of
+# every predictor in or out of the model is read straight off the matrix.
+###################################################################################
+import numpy as np
+
+from .model_cache import getCriticalValue
+from .tracing import timePhase, countEvent, recordEvent
+
+# Residual fraction of a (unit-scaled) column below which it is treated as a
+# linear combination of the predictors already in the model.
+collinear_tol = 1e-12
+
+###################################################################################
+# Augmented matrix [Z y]'[Z y] scaled to unit diagonal, with the scale vector
+###################################################################################
+def getAugmentedCrossProducts(stats):
+
+    p = stats['ZtZ'].shape[0]
+
+    A = np.empty((p+1, p+1))
+    A[:p, :p] = stats['ZtZ']
+    A[:p, p] = A[p, :p] = stats['Zty']
+    A[p, p] = stats['yty']
+
+    d = np.sqrt(np.diag(A))
+    d[d == 0] = 1.0
+
+    return A/np.outer(d, d), d
+
+###################################################################################
+# Sweep (inverse=False) or reverse sweep (inverse=True) A on pivot k, in place
+###################################################################################
+def sweepOperator(A, k, inverse=False):
+
+    countEvent('sweeps')
+
+    d = A[k, k]
+    a = A[k].copy()
+
+    A -= np.outer(a, a)/d
+
+    if inverse:
+        a = -a
+
+    A[k, :] = a/d
+    A[:, k] = a/d
+    A[k, k] = -1/d
+
+    return A
+
+###################################################################################
+# Partial F-ratio of every predictor read off the swept matrix: the F for
+# dropping z_j if j is in the model, the F for adding z_j otherwise.
+###################################################################################
+def getSweepFRatios(A, in_model, observations):
+
+    n = observations
+    p = A.shape[0]-1
+    k = int(np.count_nonzero(in_model))
+
+    resSS = A[p, p]
+    diag = np.diag(A)[:p]
+    a = A[:p, p]
+
+    F = np.zeros(p)
+
+    # Drop: RSS increases by beta_j^2/(Z_S'Z_S)^-1_jj, df = (1, n-k)
+    drop = in_model & (diag < 0)
+    F[drop] = (a[drop]**2/-diag[drop])/(resSS/(n-k))
+
+    # Add: RSS decreases by A[j,y]^2/A[j,j], df = (1, n-k-1)
+    add = ~in_model & (diag > collinear_tol)
+    reduction = a[add]**2/diag[add]
+    F[add] = reduction/((resSS-reduction)/(n-k-1))
+
+    return F
+
+###################################################################################
+# Rank-one update of a swept matrix: A is [Z y]'[Z y] swept on in_model, and
+# becomes the same matrix for [Z y]'[Z y] + weight*v*v' (a new row v, or the
+# removal of a row with weight=-1), in O(p^2) without sweeping again. With
+# u = (Z_S'Z_S)^-1 v_S, e = v_T - A_ST'v_S (the residual of v on S) and
+# c = 1 + weight*v_S'u:
+#   A_SS += weight*u*u'/c,  A_ST += weight*u*e'/c,  A_TT += weight*e*e'/c
+###################################################################################
+def updateSweptMatrix(A, in_model, v, weight=1.0):
+
+    S = np.append(in_model, False)
+
+    u = np.zeros(A.shape[0]); e = np.zeros(A.shape[0])
+
+    u[S] = -A[np.ix_(S, S)].dot(v[S])
+    e[~S] = v[~S] - A[np.ix_(S, ~S)].T.dot(v[S])
+
+    c = 1 + weight*v[S].dot(u[S])
+
+    # u and e have disjoint supports, so (u+e)(u+e)' covers the three blocks
+    g = u + e
+    A += (weight/c)*np.outer(g, g)
+
+    return A
+
+###################################################################################
+# Stepwise steps from the model in_model on the swept matrix A, in place:
+# alternately add the predictor with the largest F-to-enter and drop the
+# predictor with the smallest F-to-remove, until neither is significant at the
+# level alpha. Returns the number of steps taken.
+###################################################################################
+def sweepStepwiseSteps(A, in_model, is_forced, observations, alpha_value, max_steps):
+
+    alpha = alpha_value; n = observations
+    p = A.shape[0]-1
+
+    steps = 0
+    while steps < max_steps:
+
+        changed = False
+        k = int(np.count_nonzero(in_model))
+
+        # Forward: the candidate with the largest F-to-enter
+        with timePhase('scoring'):
+            F = getSweepFRatios(A, in_model, n)
+            F_add = np.where(in_model, -np.inf, F)
+
+        with timePhase('f_test'):
+
+            if k < p and n-k-1 > 0:
+
+                j = int(np.argmax(F_add))
+                c_value = getCriticalValue(alpha, 1, n-k-1)
+
+                if F_add[j] > c_value:
+
+                    sweepOperator(A, j)
+                    in_model[j] = True
+                    changed = True; steps += 1
+                    k += 1
+
+                    recordEvent('step', engine='sweep', action='add', variable=j, F=float(F_add[j]),
+                                c_value=c_value)
+
+        # Backward: the predictor in the model with the smallest F-to-remove
+        with timePhase('backward'):
+
+            F = getSweepFRatios(A, in_model, n)
+            F_drop = np.where(in_model & ~is_forced, F, np.inf)
+
+            j = int(np.argmin(F_drop))
+            c_value = getCriticalValue(alpha, 1, n-k)
+
+            if np.isfinite(F_drop[j]) and F_drop[j] < c_value:
+
+                sweepOperator(A, j, inverse=True)
+                in_model[j] = False
+                changed = True; steps += 1
+
+                recordEvent('step', engine='sweep', action='drop', variable=j, F=float(F_drop[j]),
+                            c_value=c_value)
+
+        if not changed:
+            break
+
+    return steps
+
+###################################################################################
+# The model of a swept matrix: its columns, F-ratios, RSS and coefficients in
+# the original units (d is the scale of getAugmentedCrossProducts)
+###################################################################################
+def getSweptModel(A, d, in_model, observations):
+
+    p = A.shape[0]-1
+
+    model = {
+        'index': np.flatnonzero(in_model).tolist(),
+        'F': getSweepFRatios(A, in_model, observations),
+        'resSS': A[p, p]*d[p]**2,
+        'beta': A[:p, p][in_model]*d[p]/d[:p][in_model],
+    }
+
+    return model
+
+###################################################################################
+# Stepwise selection from the forced columns (e.g., the intercept), which are
+# swept in first and never dropped.
+###################################################################################
+def getSweepStepwisePredictors(stats, alpha_value, forced=(0,), max_steps=None):
+
+    alpha = alpha_value; n = stats['n']
+
+    A, d = getAugmentedCrossProducts(stats)
+    p = A.shape[0]-1
+
+    in_model = np.zeros(p, dtype=bool)
+    is_forced = np.zeros(p, dtype=bool)
+    is_forced[list(forced)] = True
+
+    for k in forced:
+        sweepOperator(A, k)
+        in_model[k] = True
+
+    if max_steps is None:
+        max_steps = 4*p
+
+    sweepStepwiseSteps(A, in_model, is_forced, n, alpha, max_steps)
+
+    return getSweptModel(A, d, in_model, n)
@@ -0,0 +1,63 @@
+###################################################################################
+# Synthetic data with correlated predictors
+#
+# Every row has p predictors with the AR(1) correlation rho^|j-k| between
+# columns j and k (as neighbouring sensor channels are correlated), built as
+#   x_0 = e_0,  x_j = rho*x_{j-1} + sqrt(1-rho^2)*e_j
+# and the response y = X beta + sigma*e, where beta has n_active nonzero
+# coefficients spread evenly over the columns. The rows are generated in
+# chunks of the form of ingest.readCsvChunks ([X y], y last), each from its
+# own seed, so n can be far larger than memory and a chunk does not depend on
+# the chunk size of earlier ones.
+###################################################################################
+import numpy as np
+
+###################################################################################
+# Coefficients: n_active nonzero entries, alternating in sign, at evenly spaced
+# columns of the p predictors
+###################################################################################
+def getSyntheticCoefficients(p, n_active=5):
+
+    beta = np.zeros(p)
+
+    active = np.linspace(0, p-1, min(n_active, p)).astype(int)
+    beta[active] = np.where(np.arange(active.size) % 2 == 0, 1.0, -1.0)*np.linspace(2.0, 0.5, active.size)
+
+    return beta
+
+###################################################################################
+# Rows start:stop of the synthetic data as one n x (p+1) matrix [X y]. Row i
+# is generated from the seed (seed, i//block_rows), so any range of rows is
+# the same whatever chunks it is read in.
+###################################################################################
+def getSyntheticRows(start, stop, p, rho=0.5, n_active=5, sigma=1.0, seed=0, block_rows=4096):
+
+    beta = getSyntheticCoefficients(p, n_active)
+    c = np.sqrt(1-rho**2)
+
+    blocks = []
+    for block in range(start//block_rows, (stop-1)//block_rows+1):
+
+        rng = np.random.default_rng([seed, block])
+        E = rng.standard_normal((block_rows, p+1))
+
+        X = E[:, :p]
+        for j in range(1, p):
+            X[:, j] = rho*X[:, j-1] + c*X[:, j]
+
+        E[:, p] = X.dot(beta) + sigma*E[:, p]
+
+        lo = max(start, block*block_rows) - block*block_rows
+        hi = min(stop, (block+1)*block_rows) - block*block_rows
+        blocks.append(E[lo:hi])
+
+    return np.concatenate(blocks)
+
+###################################################################################
+# Generator of the n rows in chunks of at most chunk_rows rows; the response is
+# the last column (response_col = p)
+###################################################################################
+def readSyntheticChunks(n, p, rho=0.5, n_active=5, sigma=1.0, seed=0, chunk_rows=65536):
+
+    for start in range(0, n, chunk_rows):
+        yield getSyntheticRows(start, min(start+chunk_rows, n), p, rho, n_active, sigma, seed)
@@ -0,0 +1,155 @@
+###################################################################################
+# Tracing and timing of the selection
+#
+# The package logs to the 'stepwise_selection' logger and prints nothing by
+# itself. The phases of a run are timed with timePhase, in wall-clock
+# (perf_counter) and CPU (process_time) seconds:
+#   'ingest'      parsing the source and reading chunks of rows
+#   'screening'   marginal statistics of the screening (see screening)
+#   'features'    generating blocks of lag, mean and product features
+#   'gram'        accumulating the cross-products of the chunks
+#   'row_factor'  folding the chunks into the row factor R (see solvers)
+#   'scoring'     F-to-enter of the candidates
+#   'f_test'      forward F test and the add
+#   'backward'    F-to-remove, its test and the drop
+#   'diagnostics' residual diagnostics of a model (see out_of_core)
+# countEvent counts the factorizations, the Cholesky and sweep updates, the Gram
+# columns of the screening engine, the feature blocks generated, the row blocks
+# of a store read and the hits of the fit cache, and recordEvent keeps the
+# steps of every selection.
+# getTrace returns it all as a dict and writeTrace writes it as JSON with sorted
+# keys; without the timings, two runs that select alike give the same file.
+# The trace is kept per process, so the workers of a process pool are not
+# included; the threads of a thread pool add to it under a lock, and the wall
+# seconds of their phases overlap.
+###################################################################################
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+logger = logging.getLogger('stepwise_selection')
+logger.addHandler(logging.NullHandler())
+
+# Events beyond max_events are only counted ('dropped_events')
+max_events = 100000
+
+_trace = {'phases': {}, 'counters': Counter(), 'events': []}
+_lock = threading.Lock()
+
+###################################################################################
+# Start a new trace. The memo of the critical values (see model_cache) is
+# cleared as well, so that its hits and misses count the run alone.
+###################################################################################
+def resetTrace():
+
+    from .model_cache import getCriticalValue
+
+    getCriticalValue.cache_clear()
+
+    _trace['phases'].clear()
+    _trace['counters'].clear()
+    del _trace['events'][:]
+
+###################################################################################
+# Time the block as one call of the phase name
+###################################################################################
+@contextmanager
+def timePhase(name):
+
+    wall = time.perf_counter(); cpu = time.process_time()
+
+    try:
+        yield
+    finally:
+
+        wall = time.perf_counter()-wall; cpu = time.process_time()-cpu
+
+        with _lock:
+
+            phase = _trace['phases'].get(name)
+
+            if phase is None:
+                phase = _trace['phases'][name] = {'calls': 0, 'wall': 0.0, 'cpu': 0.0}
+
+            phase['calls'] += 1; phase['wall'] += wall; phase['cpu'] += cpu
+
+        logger.debug('%s: %.6f s wall, %.6f s cpu', name, wall, cpu)
+
+def countEvent(name, count=1):
+
+    with _lock:
+        _trace['counters'][name] += count
+
+###################################################################################
+# Record an event of the kind ('step', ...) with its fields
+###################################################################################
+def recordEvent(kind, **fields):
+
+    if len(_trace['events']) >= max_events:
+        countEvent('dropped_events')
+        return
+
+    event = dict(fields, kind=kind)
+    _trace['events'].append(event)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('%s', json.dumps(event, sort_keys=True, default=_toJson))
+
+def _toJson(value):
+
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+
+    return str(value)
+
+###################################################################################
+# The trace: 'phases' (calls, wall and cpu seconds per phase), 'counters' and
+# 'events'. With timings=False the seconds are left out (only the calls of the
+# phases are kept), so that traces of two runs can be diffed.
+###################################################################################
+def getTrace(timings=True):
+
+    from .model_cache import getCriticalValue
+
+    counters = dict(_trace['counters'])
+
+    info = getCriticalValue.cache_info()
+    counters['critical_value_hits'] = info.hits
+    counters['critical_value_misses'] = info.misses
+
+    if timings:
+        phases = {name: dict(phase) for name, phase in _trace['phases'].items()}
+        events = [dict(event) for event in _trace['events']]
+    else:
+        phases = {name: {'calls': phase['calls']} for name, phase in _trace['phases'].items()}
+        events = [{key: value for key, value in event.items() if key != 'time'} for event in _trace['events']]
+
+    return {'phases': phases, 'counters': counters, 'events': events}
+
+def writeTrace(file_name, timings=True):
+
+    with open(file_name, 'w') as trace_file:
+        json.dump(getTrace(timings), trace_file, indent=1, sort_keys=True, default=_toJson)
+
+###################################################################################
+# Print the phases and the counters as tables
+###################################################################################
+def printTrace(trace=None):
+
+    if trace is None:
+        trace = getTrace()
+
+    print('%-10s  %8s  %12s  %12s' % ('phase', 'calls', 'wall (s)', 'cpu (s)'))
+
+    for name in sorted(trace['phases']):
+
+        phase = trace['phases'][name]
+        print('%-10s  %8d  %12.6f  %12.6f' % (name, phase['calls'], phase.get('wall', 0.0), phase.get('cpu', 0.0)))
+
+    print('%-22s  %10s' % ('counter', 'count'))
+
+    for name in sorted(trace['counters']):
+        print('%-22s  %10d' % (name, trace['counters'][name]))
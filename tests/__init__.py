@@ -0,0 +1,44 @@
+###################################################################################
+# Helpers shared by the tests: least squares fits of the data matrix
+###################################################################################
+from itertools import combinations
+
+import numpy as np
+
+###################################################################################
+# Coefficients and RSS of the lstsq fit of y on the columns index of z
+###################################################################################
+def getLstsqFit(z, y, index):
+
+    beta = np.linalg.lstsq(z[:, index], y, rcond=None)[0]
+    e = y - z[:, index].dot(beta)
+
+    return beta, e.dot(e)
+
+###################################################################################
+# Every subset of the columns 1..p-1 of z with the intercept column 0, each a
+# dict with 'index', 'resSS', 'AIC', 'Cp' (Mallows) and 'adjR2' from lstsq
+###################################################################################
+def getBruteForceSubsets(z, y):
+
+    n, p = z.shape
+
+    totSS = np.sum((y-y.mean())**2)
+    sigma2 = getLstsqFit(z, y, list(range(p)))[1]/(n-p)
+
+    models = []
+    for r in range(p):
+        for subset in combinations(range(1, p), r):
+
+            index = [0] + list(subset); size = len(index)
+            resSS = getLstsqFit(z, y, index)[1]
+
+            models.append({
+                'index': index,
+                'resSS': resSS,
+                'AIC': n*np.log(resSS/n)+2*size,
+                'Cp': resSS/sigma2 - n + 2*size,
+                'adjR2': 1-(resSS/totSS)*((n-1)/(n-size)),
+            })
+
+    return models
@@ -0,0 +1,53 @@
+###################################################################################
+# Regression checks of the branch-and-bound best subsets (best_subsets) against
+# a brute-force lstsq fit of every subset
+###################################################################################
+import numpy as np
+
+from stepwise_selection import getCrossProducts, getBestSubsets, getBestSubsetModel, getSyntheticRows
+
+from . import getBruteForceSubsets
+
+def _getData(n=200, r=7, seed=0):
+
+    rows = getSyntheticRows(0, n, r, rho=0.6, n_active=3, seed=seed)
+
+    return np.column_stack((np.ones(n), rows[:, :r])), rows[:, r]
+
+def test_best_subsets_match_brute_force():
+
+    z, y = _getData()
+    stats = getCrossProducts(z, y)
+
+    models, counter = getBestSubsets(stats, top_k=2)
+    brute = getBruteForceSubsets(z, y)
+
+    for r in range(z.shape[1]):
+
+        expected = sorted([model for model in brute if len(model['index']) == r+1], key=lambda model: model['resSS'])[:2]
+        found = [model for model in models if model['r'] == r]
+
+        assert [model['index'] for model in found] == [model['index'] for model in expected]
+        np.testing.assert_allclose([model['resSS'] for model in found], [model['resSS'] for model in expected], rtol=1e-8)
+        np.testing.assert_allclose([model['Cp'] for model in found], [model['Cp'] for model in expected], rtol=1e-8, atol=1e-8)
+
+def test_best_subset_by_cp_matches_brute_force():
+
+    z, y = _getData(seed=1)
+    stats = getCrossProducts(z, y)
+
+    models, counter = getBestSubsets(stats, top_k=1)
+    expected = min(getBruteForceSubsets(z, y), key=lambda model: model['Cp'])
+
+    best = getBestSubsetModel(models, 'Cp')
+
+    assert best['index'] == expected['index']
+    assert len(best['index']) < z.shape[1]
+
+def test_cp_of_full_model_is_its_column_count():
+
+    z, y = _getData()
+
+    models, counter = getBestSubsets(getCrossProducts(z, y))
+
+    np.testing.assert_allclose(models[-1]['Cp'], z.shape[1])
@@ -0,0 +1,73 @@
+###################################################################################
+# Regression checks of the cross-validation from fold cross-products
+# (cross_validation) against refits of the training rows of every fold
+###################################################################################
+import numpy as np
+import pytest
+
+from stepwise_selection import (getCrossProducts, getFoldIndex, getFoldCrossProducts, getTrainingStats,
+                                getSubsetsCrossValidation, getPathCrossValidation, getStepwiseSelection,
+                                getSyntheticRows)
+
+from . import getLstsqFit
+
+def _getData(n=403, r=6, seed=11):
+
+    rows = getSyntheticRows(0, n, r, rho=0.5, n_active=3, seed=seed)
+
+    return np.column_stack((np.ones(n), rows[:, :r])), rows[:, r]
+
+def _getRefitMSE(z, y, folds, index):
+
+    fold_mse = []
+    for k in range(folds.max()+1):
+
+        train = folds != k
+        beta = getLstsqFit(z[train], y[train], index)[0]
+        e = y[~train] - z[~train][:, index].dot(beta)
+
+        fold_mse.append(e.dot(e)/e.size)
+
+    return np.array(fold_mse)
+
+@pytest.mark.parametrize('mode', ['blocked', 'random'])
+def test_training_stats_match_training_rows(mode):
+
+    z, y = _getData()
+    folds = getFoldIndex(z.shape[0], 5, mode)
+
+    assert np.bincount(folds).min() >= z.shape[0]//5
+
+    cv_stats = getFoldCrossProducts(z, y, folds)
+
+    for k in range(5):
+
+        train = getTrainingStats(cv_stats, k)
+        expected = getCrossProducts(z[folds != k], y[folds != k])
+
+        for key in ['ZtZ', 'Zty', 'yty', 'ysum', 'n']:
+            np.testing.assert_allclose(train[key], expected[key], rtol=1e-10, atol=1e-8)
+
+def test_subsets_cross_validation_matches_refit():
+
+    z, y = _getData()
+    folds = getFoldIndex(z.shape[0], 5, 'random')
+
+    models = [[0], [0, 1], [0, 1, 3, 6], list(range(z.shape[1]))]
+    cv = getSubsetsCrossValidation(getFoldCrossProducts(z, y, folds), models)
+
+    for i, index in enumerate(models):
+        np.testing.assert_allclose(cv['fold_mse'][i], _getRefitMSE(z, y, folds, index), rtol=1e-8)
+
+def test_path_cross_validation_matches_refit():
+
+    z, y = _getData()
+    folds = getFoldIndex(z.shape[0], 4, 'blocked')
+
+    active, trace = getStepwiseSelection(getCrossProducts(z, y), 0.05)
+    cv = getPathCrossValidation(getFoldCrossProducts(z, y, folds), trace)
+
+    assert cv['index'][-1] == sorted(int(j) for j in active)
+
+    for i, index in enumerate(cv['index']):
+        np.testing.assert_allclose(cv['fold_mse'][i], _getRefitMSE(z, y, folds, index), rtol=1e-8)
@@ -0,0 +1,121 @@
+###################################################################################
+# Checks of the lazy feature expansion (features) against features built row
+# by row, and of its selection against the sweep engine and a refit on the
+# matrix of every feature
+###################################################################################
+import numpy as np
+
+from stepwise_selection import (getCrossProducts, getFeatureSpecs, getFeatureRows, getFeatureBlock,
+                                getFeatureMarginalStats, getMarginalCorrelations, getFeaturePool, getPoolStepwise,
+                                getFeatureStepwise, getSweepStepwisePredictors, getSyntheticRows)
+
+from . import getLstsqFit
+
+def getFeatureValue(data, spec, t):
+
+    if spec[0] == 'raw':
+        return data[t, spec[1]]
+
+    if spec[0] == 'lag':
+        return data[t-spec[2], spec[1]]
+
+    if spec[0] == 'mean':
+        return data[t-spec[2]+1:t+1, spec[1]].mean()
+
+    return data[t, spec[1]]*data[t, spec[2]]
+
+def getSeries(n, seed):
+
+    rows = getSyntheticRows(0, n, 3, rho=0.5, n_active=2, seed=seed)
+
+    # Make the response depend on a lag and a mean of the sensors
+    rows[3:, 3] += 0.8*rows[:-3, 0]
+    rows[5:, 3] += 0.5*np.convolve(rows[:, 1], np.ones(6)/6, mode='valid')
+
+    return rows
+
+def test_feature_block_matches_features_row_by_row():
+
+    data = getSeries(200, 31)
+    specs = getFeatureSpecs([0, 1, 2], lags=[1, 5], windows=[2, 7])
+
+    rows = getFeatureRows(specs, data.shape[0], 3)
+    assert np.flatnonzero(rows)[0] == 6
+
+    block = getFeatureBlock(data, specs, rows)
+    expected = [[getFeatureValue(data, spec, t) for spec in specs] for t in np.flatnonzero(rows)]
+
+    np.testing.assert_allclose(block, expected, rtol=1e-12, atol=1e-12)
+
+def test_feature_rows_skip_missing_values_in_the_look_back():
+
+    n = 100
+    data = getSeries(n, 32)
+    specs = [('lag', 0, 3), ('mean', 1, 4), ('raw', 2)]
+
+    mask = np.zeros(data.shape, dtype=bool)
+    mask[[10, 40, 41], 0] = True; mask[60, 1] = True; mask[80, 3] = True
+
+    rows = getFeatureRows(specs, n, 3, mask)
+
+    # A row is kept when no source column is missing over its look-back of 3
+    # hours and the response is observed
+    expected = np.array([t >= 3 and not mask[t-3:t+1, :3].any() and not mask[t, 3] for t in range(n)])
+
+    np.testing.assert_array_equal(rows, expected)
+
+def test_feature_marginal_correlations_match_the_features():
+
+    data = getSeries(500, 33)
+    specs = getFeatureSpecs([0, 1, 2], lags=[1, 3], windows=[6])
+    rows = getFeatureRows(specs, data.shape[0], 3)
+
+    marginal = getFeatureMarginalStats(data, 3, specs, rows, block_size=4)
+    corr = getMarginalCorrelations(marginal)
+
+    X = getFeatureBlock(data, specs, rows); y = data[rows, 3]
+    expected = [np.corrcoef(X[:, j], y)[0, 1] for j in range(len(specs))]
+
+    np.testing.assert_allclose(corr, expected, rtol=1e-8, atol=1e-12)
+
+def test_feature_selection_matches_selection_on_the_feature_matrix():
+
+    data = getSeries(2000, 34)
+    specs = getFeatureSpecs([0, 1, 2], lags=[1, 2, 3], windows=[3, 6])
+
+    mask = np.zeros(data.shape, dtype=bool)
+    mask[[100, 700, 701, 1500], [0, 1, 1, 3]] = True
+
+    model = getFeatureStepwise(data, 3, specs, 0.05, mask, block_size=5)
+
+    rows = getFeatureRows(specs, data.shape[0], 3, mask)
+    np.testing.assert_array_equal(model['rows'], rows)
+
+    z = np.column_stack((np.ones(rows.sum()), getFeatureBlock(data, specs, rows))); y = data[rows, 3]
+    reference = getSweepStepwisePredictors(getCrossProducts(z, y), 0.05)
+
+    assert model['index'] == reference['index']
+    assert model['specs'] == [specs[j-1] for j in reference['index'] if j > 0]
+    assert ('lag', 0, 3) in model['specs']
+
+    beta, resSS = getLstsqFit(z, y, model['index'])
+
+    np.testing.assert_allclose(model['beta'], beta, rtol=1e-7, atol=1e-9)
+    np.testing.assert_allclose(model['resSS'], resSS, rtol=1e-8)
+
+def test_pool_gram_columns_match_the_feature_matrix():
+
+    data = getSeries(300, 35)
+    specs = getFeatureSpecs([0, 1], lags=[2], windows=[4])
+    rows = getFeatureRows(specs, data.shape[0], 3)
+
+    pool = getFeaturePool(data, 3, specs, rows, block_size=3)
+
+    z = np.column_stack((np.ones(rows.sum()), getFeatureBlock(data, specs, rows))); y = data[rows, 3]
+    stats = getCrossProducts(z, y)
+
+    np.testing.assert_allclose(pool['Zty'], stats['Zty'], rtol=1e-12)
+    np.testing.assert_allclose(pool['diag'], np.diag(stats['ZtZ']), rtol=1e-12)
+
+    for j in [0, 2, len(specs)]:
+        np.testing.assert_allclose(pool['gram_column'](j), stats['ZtZ'][:, j], rtol=1e-12)
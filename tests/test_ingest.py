@@ -0,0 +1,45 @@
+###################################################################################
+# Regression checks of the streaming cross-products (ingest) against
+# getCrossProducts of the whole file
+###################################################################################
+import numpy as np
+
+from stepwise_selection import (getCrossProducts, getCsvColumnNames, readCsvChunks, getStreamingCrossProducts,
+                                getCsvCrossProducts, getSyntheticRows)
+
+def _writeCsv(path, rows):
+
+    with open(path, 'w') as csv_file:
+
+        csv_file.write('Date;Time;a;b;c;y;;\n')
+
+        for i, row in enumerate(rows):
+
+            csv_file.write('%02d/03/2004;%02d.00.00;%s;;\n' % (1+i//24, i % 24, ';'.join('%.6g' % v for v in row)))
+
+            # Blank rows (only delimiters) are skipped
+            if i % 7 == 3:
+                csv_file.write(';;;;;;;\n')
+
+def test_streaming_cross_products_match_whole_file(tmp_path):
+
+    rows = getSyntheticRows(0, 50, 3, seed=6)
+    rows = np.round(rows, 4)
+
+    path = str(tmp_path/'rows.csv')
+    _writeCsv(path, rows)
+
+    assert getCsvColumnNames(path, range(2, 6)) == ['a', 'b', 'c', 'y']
+
+    expected = getCrossProducts(np.column_stack((np.ones(50), rows[:, :3])), rows[:, 3])
+
+    for stats in [getStreamingCrossProducts(readCsvChunks(path, range(2, 6), chunk_rows=8), 3),
+                  getCsvCrossProducts(path, 3, range(2, 6), chunk_rows=5)]:
+
+        for key in ['ZtZ', 'Zty', 'yty', 'ysum', 'n', 'Zsum']:
+            np.testing.assert_allclose(stats[key], expected[key], rtol=1e-12, atol=1e-10)
+
+    # The row factor is that of all the rows: R'R = [Z y]'[Z y]
+    R = getStreamingCrossProducts(readCsvChunks(path, range(2, 6), chunk_rows=8), 3, row_factor=True)['R']
+    zy = np.column_stack((np.ones(50), rows))
+    np.testing.assert_allclose(R.T.dot(R), zy.T.dot(zy), rtol=1e-10, atol=1e-8)
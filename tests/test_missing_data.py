@@ -0,0 +1,80 @@
+###################################################################################
+# Regression checks of the missing-data cross-products (missing_data) against
+# getCrossProducts of the rows and columns each mode keeps
+###################################################################################
+import numpy as np
+import pytest
+
+from stepwise_selection import (getCrossProducts, getCompleteCaseCrossProducts, getThresholdCrossProducts,
+                                getPairwiseCrossProducts, getMissingDataCrossProducts, getSubsetResidualSS,
+                                getSyntheticRows)
+
+def _getData(n=400, r=5, seed=0):
+
+    return getSyntheticRows(0, n, r, rho=0.5, n_active=3, seed=seed)
+
+def _assertStatsEqual(stats, expected):
+
+    for key in ['ZtZ', 'Zty', 'yty', 'ysum', 'n']:
+        np.testing.assert_allclose(stats[key], expected[key], rtol=1e-9, atol=1e-8)
+
+def test_complete_case_matches_complete_rows():
+
+    data = _getData()
+    data[np.random.default_rng(1).random(data.shape) < 0.05] = -200
+
+    stats = getCompleteCaseCrossProducts(data, 5, chunk_rows=64)
+
+    keep = ~(data == -200).any(axis=1)
+    expected = getCrossProducts(np.column_stack((np.ones(keep.sum()), data[keep, :5])), data[keep, 5])
+
+    _assertStatsEqual(stats, expected)
+    assert stats['columns'] == [0, 1, 2, 3, 4]
+
+def test_threshold_drops_mostly_missing_columns():
+
+    data = _getData()
+    data[::3, 2] = -200
+    data[np.random.default_rng(2).random(data.shape[0]) < 0.9, 4] = -200
+
+    stats = getThresholdCrossProducts(data, 5, threshold=0.5, chunk_rows=64)
+
+    keep = data[:, 2] != -200
+    expected = getCrossProducts(np.column_stack((np.ones(keep.sum()), data[keep][:, [0, 1, 2, 3]])), data[keep, 5])
+
+    assert stats['columns'] == [0, 1, 2, 3]
+    _assertStatsEqual(stats, expected)
+
+def test_pairwise_matches_complete_case_without_missing_values():
+
+    data = _getData()
+
+    pairwise = getPairwiseCrossProducts(data, 5, chunk_rows=64)
+    complete = getMissingDataCrossProducts(data, 5, 'complete')
+
+    assert pairwise['clipped'] == 0
+    _assertStatsEqual(pairwise, complete)
+
+def test_pairwise_cross_products_are_positive_semidefinite():
+
+    rng = np.random.default_rng(3)
+    data = _getData(n=60)
+
+    # Columns observed on nearly disjoint rows give pairwise covariances that
+    # no single set of rows has
+    data[:27, 0] = -200; data[33:, 1] = -200
+    data[33:, 2] = -data[33:, 0]
+    data[rng.random(data.shape) < 0.1] = -200
+
+    stats = getPairwiseCrossProducts(data, 5)
+
+    assert np.linalg.eigvalsh(stats['ZtZ']).min() > -1e-8*np.abs(stats['ZtZ']).max()
+    assert getSubsetResidualSS(stats, [0, 3, 4]) >= 0
+
+def test_pairwise_needs_two_rows_of_every_pair():
+
+    data = _getData(n=60)
+    data[:30, 0] = -200; data[30:, 1] = -200
+
+    with pytest.raises(ValueError):
+        getPairwiseCrossProducts(data, 5)
@@ -0,0 +1,45 @@
+###################################################################################
+# Regression checks of the multi-response selection (multi_response) against
+# single-response cross-products and selections
+###################################################################################
+import numpy as np
+
+from stepwise_selection import (getCrossProducts, getMultiResponseCrossProducts, getResponseStats,
+                                getMultiResponseStepwise, getSweepStepwisePredictors, getSyntheticRows)
+
+def test_multi_response_matches_single_responses():
+
+    n = 500; r = 6
+    rows = getSyntheticRows(0, n, r, rho=0.5, n_active=3, seed=10)
+    rng = np.random.default_rng(10)
+
+    # Responses that select alike and differently: y, a rescaled y, one that
+    # depends on the last predictors only, and pure noise
+    X = rows[:, :r]
+    Y = np.column_stack((rows[:, r], 3*rows[:, r]+1, X[:, 4]-2*X[:, 5]+rng.standard_normal(n),
+                         rng.standard_normal(n)))
+    data = np.column_stack((X, Y))
+    data[rng.random(data.shape) < 0.02] = -200
+
+    responses = [6, 7, 8, 9]
+    stats = getMultiResponseCrossProducts(data, responses, range(r), chunk_rows=64)
+    models = getMultiResponseStepwise(stats, 0.05)
+
+    keep = ~(data == -200).any(axis=1)
+    z = np.column_stack((np.ones(keep.sum()), X[keep]))
+
+    assert stats['n'] == keep.sum()
+
+    for i, response in enumerate(responses):
+
+        single = getCrossProducts(z, data[keep, response])
+        response_stats = getResponseStats(stats, i)
+
+        for key in ['ZtZ', 'Zty', 'yty', 'ysum', 'n']:
+            np.testing.assert_allclose(response_stats[key], single[key], rtol=1e-10, atol=1e-8)
+
+        expected = getSweepStepwisePredictors(single, 0.05)
+
+        assert models[i]['index'] == expected['index']
+        np.testing.assert_allclose(models[i]['resSS'], expected['resSS'], rtol=1e-8)
+        np.testing.assert_allclose(models[i]['beta'], expected['beta'], rtol=1e-6, atol=1e-10)
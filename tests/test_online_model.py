@@ -0,0 +1,67 @@
+###################################################################################
+# Regression checks of the online model (online_model) against a refit of the
+# rows it holds
+###################################################################################
+import numpy as np
+
+from stepwise_selection import (getCrossProducts, getOnlineModel, updateOnlineModel, getOnlineModelSelection,
+                                getSweepStepwisePredictors, getSyntheticRows)
+
+def _getData(n=600, r=6, seed=8):
+
+    rows = getSyntheticRows(0, n, r, rho=0.5, n_active=3, seed=seed)
+
+    return np.column_stack((np.ones(n), rows[:, :r])), rows[:, r]
+
+def _assertModelMatchesRefit(model, z, y):
+
+    stats = getCrossProducts(z, y)
+
+    for key in ['ZtZ', 'Zty', 'yty', 'ysum', 'n']:
+        np.testing.assert_allclose(model['stats'][key], stats[key], rtol=1e-10, atol=1e-8)
+
+    selection = getOnlineModelSelection(model)
+    expected = getSweepStepwisePredictors(stats, model['alpha'])
+
+    assert selection['index'] == expected['index']
+    np.testing.assert_allclose(selection['resSS'], expected['resSS'], rtol=1e-8)
+    np.testing.assert_allclose(selection['beta'], expected['beta'], rtol=1e-6, atol=1e-10)
+
+def test_online_updates_match_refit():
+
+    z, y = _getData()
+
+    model = getOnlineModel(getCrossProducts(z[:100], y[:100]), 0.05)
+
+    # Row by row, then in a batch
+    for i in range(100, 300):
+        updateOnlineModel(model, z[i], y[i])
+
+    updateOnlineModel(model, z[300:600], y[300:600])
+
+    _assertModelMatchesRefit(model, z, y)
+
+def test_online_downdates_match_refit():
+
+    z, y = _getData()
+
+    model = getOnlineModel(getCrossProducts(z, y), 0.05)
+
+    # Remove the first rows with weight -1, and move a window in one update
+    updateOnlineModel(model, z[:200], y[:200], weight=-1.0)
+    updateOnlineModel(model, np.concatenate((z[200:250], z[:50])), np.concatenate((y[200:250], y[:50])),
+                      weight=np.concatenate((-np.ones(50), np.ones(50))))
+
+    keep = np.r_[0:50, 250:600]
+    _assertModelMatchesRefit(model, z[keep], y[keep])
+
+def test_online_resync_matches_refit():
+
+    z, y = _getData()
+
+    model = getOnlineModel(getCrossProducts(z[:100], y[:100]), 0.05, resync=64)
+
+    for i in range(100, 600, 10):
+        updateOnlineModel(model, z[i:i+10], y[i:i+10])
+
+    _assertModelMatchesRefit(model, z, y)
@@ -0,0 +1,99 @@
+###################################################################################
+# Checks of the store of chunk files (out_of_core) against the cross-products
+# of the rows in memory, and of its residual diagnostics against a refit
+###################################################################################
+import numpy as np
+import pytest
+
+from stepwise_selection import (getCompleteCaseCrossProducts, getMissingMask, getSubsetFit, writeChunkedFile,
+                                loadChunkedFile, isChunkedFile, getOutOfCoreCrossProducts, getOutOfCoreDiagnostics,
+                                getSyntheticRows)
+
+from . import getLstsqFit
+
+def getStationRows(n, r, seed):
+
+    rows = getSyntheticRows(0, n, r, rho=0.5, n_active=3, seed=seed)
+
+    # Missing values (-200) in a few rows
+    rng = np.random.RandomState(seed)
+    rows[rng.randint(0, n, 20), rng.randint(0, r+1, 20)] = -200
+
+    return rows
+
+def writeStations(store_dir, stations, names):
+
+    for i, rows in enumerate(stations):
+        chunks = [rows[start:start+700] for start in range(0, rows.shape[0], 700)]
+        writeChunkedFile(chunks, store_dir, names, append=i > 0)
+
+    return loadChunkedFile(store_dir)
+
+def test_store_cross_products_match_the_rows(tmp_path):
+
+    r = 6; names = ['x%d' % j for j in range(r)] + ['y']
+    stations = [getStationRows(2000, r, 41), getStationRows(1500, r, 42)]
+
+    store_dir = str(tmp_path/'store')
+    store = writeStations(store_dir, stations, names)
+
+    assert isChunkedFile(store_dir)
+    assert store['n'] == 3500 and len(store['files']) == 6
+
+    data = np.vstack(stations)
+    columns = [0, 2, 3, 5]
+    expected = getCompleteCaseCrossProducts(data, r, getMissingMask(data), columns, row_factor=True)
+
+    for block_rows, workers in [(65536, 1), (333, 3)]:
+
+        stats = getOutOfCoreCrossProducts(store, r, columns, block_rows, workers, row_factor=True)
+
+        assert stats['n'] == expected['n'] and stats['columns'] == columns
+
+        for key in ['ZtZ', 'Zty', 'yty', 'ysum', 'Zsum']:
+            np.testing.assert_allclose(stats[key], expected[key], rtol=1e-12)
+
+        np.testing.assert_allclose(stats['R'].T.dot(stats['R']), expected['R'].T.dot(expected['R']), rtol=1e-10,
+                                   atol=1e-8)
+
+def test_append_needs_the_same_columns(tmp_path):
+
+    store_dir = str(tmp_path/'store')
+    writeChunkedFile([np.ones((5, 3))], store_dir, ['a', 'b', 'y'])
+
+    with pytest.raises(ValueError):
+        writeChunkedFile([np.ones((5, 3))], store_dir, ['a', 'c', 'y'], append=True)
+
+def test_diagnostics_match_a_refit(tmp_path):
+
+    r = 5; names = ['x%d' % j for j in range(r)] + ['y']
+    stations = [getStationRows(1200, r, 43), getStationRows(900, r, 44)]
+
+    store = writeStations(str(tmp_path/'store'), stations, names)
+    stats = getOutOfCoreCrossProducts(store, r)
+
+    index = [0, 1, 2, 4]
+    diagnostics = getOutOfCoreDiagnostics(store, stats, index, r, block_rows=250, workers=3)
+
+    data = np.vstack(stations)
+    data = data[~(data == -200).any(axis=1)]
+
+    z = np.column_stack((np.ones(data.shape[0]), data[:, :r]))[:, index]; y = data[:, r]
+    beta, resSS = getLstsqFit(z, y, list(range(len(index))))
+
+    n, k = z.shape
+    e = y - z.dot(beta)
+    h = np.einsum('ij,ij->i', z.dot(np.linalg.inv(z.T.dot(z))), z)
+    t = e/np.sqrt(resSS/(n-k)*(1-h))
+
+    assert diagnostics['n'] == n
+    np.testing.assert_allclose(diagnostics['resSS'], resSS, rtol=1e-8)
+    np.testing.assert_allclose(diagnostics['resSS'], getSubsetFit(stats, index)['resSS'], rtol=1e-8)
+    np.testing.assert_allclose(diagnostics['residual_sum'], 0.0, atol=1e-8)
+    np.testing.assert_allclose(diagnostics['max_abs_residual'], np.abs(e).max(), rtol=1e-8)
+    np.testing.assert_allclose(diagnostics['durbin_watson'], np.sum(np.diff(e)**2)/resSS, rtol=1e-8)
+    np.testing.assert_allclose(diagnostics['max_leverage'], h.max(), rtol=1e-8)
+    np.testing.assert_allclose(diagnostics['max_cooks_distance'], (t**2*h/(k*(1-h))).max(), rtol=1e-6)
+
+    assert diagnostics['high_leverage'] == np.count_nonzero(h > 2*k/n)
+    assert diagnostics['large_residuals'] == np.count_nonzero(np.abs(t) > 3)
@@ -0,0 +1,30 @@
+###################################################################################
+# Regression checks of the exhaustive all-subsets scoring (parallel_subsets)
+# against a brute-force lstsq fit of every subset
+###################################################################################
+import numpy as np
+
+from stepwise_selection import getCrossProducts, getAllSubsetsParallel, getSyntheticRows
+
+from . import getBruteForceSubsets
+
+def test_all_subsets_match_brute_force():
+
+    n = 150; r = 6
+    rows = getSyntheticRows(0, n, r, rho=0.6, n_active=3, seed=2)
+    z = np.column_stack((np.ones(n), rows[:, :r])); y = rows[:, r]
+
+    result = getAllSubsetsParallel(getCrossProducts(z, y), top_k=4, max_workers=2, shard_bits=2, resync=5)
+    brute = getBruteForceSubsets(z, y)
+
+    assert result['subsets'] == 2**r
+
+    for criterion, sign in [('AIC', 1), ('Cp', 1), ('adjR2', -1)]:
+
+        expected = sorted(brute, key=lambda model: sign*model[criterion])[:4]
+
+        assert [model['index'] for model in result[criterion]] == [model['index'] for model in expected]
+        np.testing.assert_allclose([model[criterion] for model in result[criterion]],
+                                   [model[criterion] for model in expected], rtol=1e-8, atol=1e-8)
+
+    assert len(result['Cp'][0]['index']) < z.shape[1]
@@ -0,0 +1,56 @@
+###################################################################################
+# Regression checks of the mixed precision mode (precision) against float64
+# cross-products and selections of the float32-rounded rows
+###################################################################################
+import numpy as np
+
+from stepwise_selection import (getCrossProducts, addCompensated, readRowChunks, getMixedPrecisionCrossProducts,
+                                getMixedPrecisionStepwise, getPrecisionDeviation, getSweepStepwisePredictors,
+                                getSyntheticRows)
+
+def test_compensated_sum_is_exact_where_plain_sum_is_not():
+
+    values = np.array([1e16, 1.0, -1e16, 1.0]*1000)
+
+    total = np.zeros(()); compensation = np.zeros(())
+    for value in values:
+        addCompensated(total, compensation, np.array(value))
+
+    assert float(total + compensation) == 2000.0
+    assert sum(values.tolist()) != 2000.0
+
+def test_mixed_cross_products_match_float64_of_float32_rows():
+
+    n = 5000; r = 6
+    rows = getSyntheticRows(0, n, r, rho=0.6, n_active=3, seed=13)
+    rows[:, 1] = rows[:, 1]*1e3 + 1e4
+
+    keep = np.ones(n, dtype=bool); keep[::7] = False
+
+    stats = getMixedPrecisionCrossProducts(readRowChunks(rows, keep, list(range(r+1)), chunk_rows=512), r)
+
+    # The only rounding is that of the stored float32 values
+    rows32 = rows[keep].astype(np.float32).astype(float)
+    expected = getCrossProducts(np.column_stack((np.ones(keep.sum()), rows32[:, :r])), rows32[:, r])
+
+    for key in ['ZtZ', 'Zty', 'yty', 'ysum', 'n', 'Zsum']:
+        np.testing.assert_allclose(stats[key], expected[key], rtol=1e-12, atol=1e-9)
+
+def test_mixed_selection_matches_float64_selection():
+
+    n = 5000; r = 8
+    rows = getSyntheticRows(0, n, r, rho=0.6, n_active=4, seed=14)
+    z = np.column_stack((np.ones(n), rows[:, :r])); y = rows[:, r]
+
+    stats = getMixedPrecisionCrossProducts(readRowChunks(rows, np.ones(n, dtype=bool), list(range(r+1))), r)
+
+    model = getMixedPrecisionStepwise(stats, 0.05)
+    reference = getSweepStepwisePredictors(getCrossProducts(z, y), 0.05)
+
+    # The refined model is the float64 selection of the same statistics
+    assert model['index'] == getSweepStepwisePredictors(stats, 0.05)['index']
+
+    deviation = getPrecisionDeviation(model, reference)
+
+    assert deviation['same_selection']
+    assert deviation['beta'] < 1e-5 and deviation['resSS'] < 1e-5
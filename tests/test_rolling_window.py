@@ -0,0 +1,40 @@
+###################################################################################
+# Regression checks of the sliding-window selection (rolling_window) against a
+# fresh fit of the rows of every window
+###################################################################################
+import numpy as np
+
+from stepwise_selection import getCrossProducts, getRollingStepwiseSelection, getSyntheticRows
+
+def test_rolling_windows_match_refit():
+
+    n = 24*20; r = 5
+    rows = getSyntheticRows(0, n, r, rho=0.5, n_active=3, seed=9)
+    z = np.column_stack((np.ones(n), rows[:, :r])); y = rows[:, r]
+
+    # Hourly rows with a gap of two days, so that windows skip and refill
+    timestamp = np.datetime64('2004-03-10T00:00:00') + np.arange(n)*np.timedelta64(1, 'h')
+    timestamp[24*8:] += np.timedelta64(2, 'D')
+
+    table = getRollingStepwiseSelection(z, y, timestamp, 0.05, window_days=5, step_days=1, min_rows=100)
+
+    assert len(table['start']) > 0
+
+    for i in range(len(table['start'])):
+
+        window = (timestamp >= table['start'][i]) & (timestamp < table['end'][i])
+        assert table['n'][i] == np.count_nonzero(window)
+
+        if table['index'][i] is None:
+            assert table['n'][i] < 100
+            continue
+
+        stats = getCrossProducts(z[window], y[window])
+
+        index = table['index'][i]
+        beta = np.linalg.lstsq(z[window][:, index], y[window], rcond=None)[0]
+        e = y[window] - z[window][:, index].dot(beta)
+        totSS = stats['yty'] - stats['ysum']**2/stats['n']
+
+        np.testing.assert_allclose(table['resSS'][i], e.dot(e), rtol=1e-8)
+        np.testing.assert_allclose(table['R2'][i], 1-e.dot(e)/totSS, rtol=1e-8)
@@ -0,0 +1,80 @@
+###################################################################################
+# Checks of the screening engine (screening) against the correlations of the
+# rows, the sweep engine on the full cross-products and a refit of the model
+###################################################################################
+import numpy as np
+
+from stepwise_selection import (getCrossProducts, getMarginalStats, getMarginalCorrelations, getScreenedColumns,
+                                getColumnPool, getPoolStepwise, getScreenedStepwise, getSweepStepwisePredictors,
+                                getSyntheticRows)
+
+from . import getLstsqFit
+
+def getChunks(rows, chunk_rows=300):
+
+    return [rows[start:start+chunk_rows] for start in range(0, rows.shape[0], chunk_rows)]
+
+def test_marginal_correlations_match_the_rows():
+
+    n = 2000; r = 12
+    rows = getSyntheticRows(0, n, r, rho=0.5, n_active=4, seed=21)
+    rows[:, 2] = rows[:, 2]*1e-3 + 1e5
+
+    corr = getMarginalCorrelations(getMarginalStats(getChunks(rows), r))
+
+    expected = [np.corrcoef(rows[:, j], rows[:, r])[0, 1] for j in range(r)]
+
+    np.testing.assert_allclose(corr, expected, rtol=1e-8, atol=1e-12)
+
+def test_screened_columns_are_the_largest_correlations():
+
+    n = 2000; r = 12
+    rows = getSyntheticRows(0, n, r, rho=0.5, n_active=4, seed=22)
+
+    marginal = getMarginalStats(getChunks(rows), r)
+    corr = np.abs(getMarginalCorrelations(marginal))
+
+    assert getScreenedColumns(marginal, 5) == sorted(np.argsort(-corr)[:5].tolist())
+    assert getScreenedColumns(marginal, 50) == list(range(r))
+
+def test_pool_selection_matches_sweep_selection():
+
+    n = 3000; r = 15
+    rows = getSyntheticRows(0, n, r, rho=0.7, n_active=5, seed=23)
+    z = np.column_stack((np.ones(n), rows[:, :r])); y = rows[:, r]
+
+    pool = getColumnPool(getChunks(rows), r, list(range(r)))
+
+    model = getPoolStepwise(pool, 0.05)
+    reference = getSweepStepwisePredictors(getCrossProducts(z, y), 0.05)
+
+    assert model['index'] == reference['index']
+    assert model['columns'] == [j-1 for j in model['index'] if j > 0]
+
+    beta, resSS = getLstsqFit(z, y, model['index'])
+
+    np.testing.assert_allclose(model['beta'], beta, rtol=1e-8, atol=1e-10)
+    np.testing.assert_allclose(model['resSS'], resSS, rtol=1e-8)
+    np.testing.assert_allclose(model['F'], reference['F'], rtol=1e-6, atol=1e-8)
+
+def test_screened_selection_matches_selection_on_the_screened_columns():
+
+    n = 3000; r = 30
+    rows = getSyntheticRows(0, n, r, rho=0.3, n_active=4, seed=24)
+
+    readChunks = lambda: iter(getChunks(rows))
+    model = getScreenedStepwise(readChunks, r, 0.05, size=10)
+
+    screened = model['screened']
+    assert screened == getScreenedColumns(getMarginalStats(getChunks(rows), r), 10)
+
+    z = np.column_stack((np.ones(n), rows[:, screened])); y = rows[:, r]
+    reference = getSweepStepwisePredictors(getCrossProducts(z, y), 0.05)
+
+    assert model['index'] == reference['index']
+    assert model['columns'] == [screened[j-1] for j in reference['index'] if j > 0]
+
+    beta, resSS = getLstsqFit(z, y, model['index'])
+
+    np.testing.assert_allclose(model['beta'], beta, rtol=1e-8, atol=1e-10)
+    np.testing.assert_allclose(model['resSS'], resSS, rtol=1e-8)
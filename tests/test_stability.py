@@ -0,0 +1,51 @@
+###################################################################################
+# Regression checks of the stability selection (stability) against selections
+# on explicitly resampled copies of the rows
+###################################################################################
+import numpy as np
+import pytest
+
+from stepwise_selection import (getCrossProducts, getReplicateWeights, getWeightedCrossProducts,
+                                getStabilitySelection, getSweepStepwisePredictors, getSyntheticRows)
+
+def _getData(n=300, r=5, seed=12):
+
+    rows = getSyntheticRows(0, n, r, rho=0.5, n_active=3, seed=seed)
+
+    return np.column_stack((np.ones(n), rows[:, :r])), rows[:, r]
+
+@pytest.mark.parametrize('mode', ['bootstrap', 'subsample'])
+def test_weighted_cross_products_match_resampled_rows(mode):
+
+    z, y = _getData()
+    n = z.shape[0]
+
+    weights = getReplicateWeights(n, 3, mode)
+
+    # The rows repeated as many times as their weight
+    rows = np.repeat(np.arange(n), weights.astype(int))
+    expected = getCrossProducts(z[rows], y[rows])
+
+    stats = getWeightedCrossProducts(np.column_stack((z, y)), weights, chunk_rows=64)
+
+    assert stats['n'] == (n if mode == 'bootstrap' else n//2)
+
+    for key in ['ZtZ', 'Zty', 'yty', 'ysum', 'n']:
+        np.testing.assert_allclose(stats[key], expected[key], rtol=1e-10, atol=1e-8)
+
+def test_stability_selection_matches_resampled_selections():
+
+    z, y = _getData()
+    n = z.shape[0]; B = 12
+
+    result = getStabilitySelection(z, y, 0.05, B=B, max_workers=2, seed=4)
+
+    frequency = np.zeros(z.shape[1])
+    for b in range(B):
+
+        rows = np.repeat(np.arange(n), getReplicateWeights(n, b, seed=4).astype(int))
+        frequency[getSweepStepwisePredictors(getCrossProducts(z[rows], y[rows]), 0.05)['index']] += 1
+
+    assert result['replicates'] == B
+    np.testing.assert_allclose(result['frequency'], frequency/B)
+    assert sum(count for index, count in result['subsets']) <= 1.0+1e-12
@@ -0,0 +1,121 @@
+###################################################################################
+# Regression checks of the cross-products core (sufficient_stats, model_cache,
+# solvers, cholesky_updates, sweep) against lstsq fits of the data matrix
+###################################################################################
+import numpy as np
+import pytest
+
+from stepwise_selection import (getCrossProducts, getSubsetCoefficients, getSubsetResidualSS,
+                                getSubsetRatioRegressionSS, getSubsetAdjustedRatioRegressionSS, getSubsetAIC, getSubsetCp,
+                                getSubsetFRatio, getSubsetFit, setSolver, getCholeskyFactor, getAppendedResidualSS,
+                                appendCholeskyColumn, getDeletedResidualSS, deleteCholeskyColumn,
+                                getSweepStepwisePredictors, getStepwiseSelection, getSyntheticRows)
+
+from . import getLstsqFit
+
+def _getData(n=300, r=6, seed=0):
+
+    rows = getSyntheticRows(0, n, r, rho=0.5, n_active=3, seed=seed)
+
+    # Columns of very different scales, as the AirQuality sensor channels
+    z = np.column_stack((np.ones(n), rows[:, :r]*np.logspace(-2, 3, r)))
+
+    return z, rows[:, r]
+
+@pytest.mark.parametrize('solver', ['cholesky', 'qr', 'pivoted_qr'])
+def test_subset_fit_matches_lstsq(solver):
+
+    z, y = _getData()
+    stats = getCrossProducts(z, y, row_factor=True)
+    setSolver(stats, solver)
+
+    for index in [[0], [0, 2], [0, 1, 3, 5], list(range(z.shape[1]))]:
+
+        beta, resSS = getLstsqFit(z, y, index)
+
+        np.testing.assert_allclose(getSubsetCoefficients(stats, index), beta, rtol=1e-8, atol=1e-12)
+        np.testing.assert_allclose(getSubsetResidualSS(stats, index), resSS, rtol=1e-8)
+
+def test_subset_criteria_match_lstsq():
+
+    z, y = _getData()
+    stats = getCrossProducts(z, y)
+
+    n = z.shape[0]; index = [0, 1, 4]
+    totSS = np.sum((y-y.mean())**2)
+
+    beta, resSS = getLstsqFit(z, y, index)
+    beta0, resSS0 = getLstsqFit(z, y, [0, 1])
+
+    np.testing.assert_allclose(getSubsetRatioRegressionSS(stats, index), 1-resSS/totSS, rtol=1e-10)
+    np.testing.assert_allclose(getSubsetAdjustedRatioRegressionSS(stats, index),
+                               1-(resSS/(n-3))/(totSS/(n-1)), rtol=1e-10)
+    np.testing.assert_allclose(getSubsetAIC(stats, index), n*np.log(resSS/n)+6, rtol=1e-10)
+
+    F, df1, df2 = getSubsetFRatio(stats, index, [0, 1])
+
+    assert (df1, df2) == (1, n-3)
+    np.testing.assert_allclose(F, (resSS0-resSS)/(resSS/(n-3)), rtol=1e-8)
+
+def test_cholesky_updates_match_lstsq():
+
+    z, y = _getData()
+    stats = getCrossProducts(z, y)
+
+    factor = getCholeskyFactor(stats, [0, 2])
+
+    np.testing.assert_allclose(getAppendedResidualSS(stats, factor, 4), getLstsqFit(z, y, [0, 2, 4])[1], rtol=1e-8)
+
+    factor = appendCholeskyColumn(stats, factor, 4)
+    factor = appendCholeskyColumn(stats, factor, 1)
+
+    assert factor['index'] == [0, 2, 4, 1]
+    np.testing.assert_allclose(factor['resSS'], getLstsqFit(z, y, [0, 2, 4, 1])[1], rtol=1e-8)
+
+    np.testing.assert_allclose(getDeletedResidualSS(factor, 1), getLstsqFit(z, y, [0, 4, 1])[1], rtol=1e-8)
+
+    factor = deleteCholeskyColumn(factor, 1)
+
+    assert factor['index'] == [0, 4, 1]
+    np.testing.assert_allclose(factor['resSS'], getLstsqFit(z, y, [0, 4, 1])[1], rtol=1e-8)
+
+def test_sweep_and_cholesky_engines_agree():
+
+    z, y = _getData(n=500, r=8, seed=4)
+    stats = getCrossProducts(z, y)
+
+    model = getSweepStepwisePredictors(stats, 0.05)
+    active, trace = getStepwiseSelection(stats, 0.05)
+
+    assert sorted(model['index']) == sorted(active)
+
+def test_subset_cp_matches_hand_computed():
+
+    z, y = _getData()
+    stats = getCrossProducts(z, y)
+
+    n, p = z.shape; index = [0, 2, 5]
+
+    sigma2 = getLstsqFit(z, y, list(range(p)))[1]/(n-p)
+    expected = getLstsqFit(z, y, index)[1]/sigma2 - n + 2*3
+
+    np.testing.assert_allclose(getSubsetCp(stats, index, range(p)), expected, rtol=1e-8)
+    np.testing.assert_allclose(getSubsetCp(stats, range(p), range(p)), p, rtol=1e-8)
+
+@pytest.mark.parametrize('solver', ['cholesky', 'qr', 'pivoted_qr'])
+def test_rank_deficient_subset(solver):
+
+    z, y = _getData()
+
+    # Column 7 duplicates column 1
+    z = np.column_stack((z, z[:, 1]))
+    stats = getCrossProducts(z, y, row_factor=True)
+    setSolver(stats, solver)
+
+    index = [0, 1, 2, 7]
+    fit = getSubsetFit(stats, index)
+
+    np.testing.assert_allclose(getSubsetResidualSS(stats, index), getLstsqFit(z, y, index)[1], rtol=1e-8)
+    np.testing.assert_allclose(z[:, index].dot(fit['beta']), z[:, index].dot(getLstsqFit(z, y, index)[0]), rtol=1e-6)
+
+    assert fit['rank'] == 3
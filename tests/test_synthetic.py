@@ -0,0 +1,52 @@
+###################################################################################
+# Checks of the synthetic data generator (synthetic) and of the comparison of
+# benchmark results with a baseline (benchmark)
+###################################################################################
+import numpy as np
+
+from stepwise_selection import (getCrossProducts, getSyntheticCoefficients, getSyntheticRows, readSyntheticChunks,
+                                getStreamingCrossProducts, getSweepStepwisePredictors)
+from stepwise_selection.benchmark import compareBenchmarks
+
+def test_rows_do_not_depend_on_the_chunks():
+
+    rows = getSyntheticRows(0, 1000, 4, block_rows=128)
+
+    np.testing.assert_array_equal(getSyntheticRows(300, 700, 4, block_rows=128), rows[300:700])
+
+    chunks = list(readSyntheticChunks(1000, 4, chunk_rows=333))
+    np.testing.assert_array_equal(np.concatenate(chunks), getSyntheticRows(0, 1000, 4))
+
+def test_streamed_synthetic_rows_match_refit():
+
+    n = 20000; p = 8
+    rows = getSyntheticRows(0, n, p, rho=0.7, n_active=3, sigma=0.5)
+
+    # AR(1) correlation of neighbouring columns
+    assert abs(np.corrcoef(rows[:, 2], rows[:, 3])[0, 1] - 0.7) < 0.03
+
+    stats = getStreamingCrossProducts(readSyntheticChunks(n, p, rho=0.7, n_active=3, sigma=0.5, chunk_rows=4096), p)
+    expected = getCrossProducts(np.column_stack((np.ones(n), rows[:, :p])), rows[:, p])
+
+    for key in ['ZtZ', 'Zty', 'yty', 'ysum', 'n']:
+        np.testing.assert_allclose(stats[key], expected[key], rtol=1e-10, atol=1e-6)
+
+    # The selection recovers the active columns (column j of X is j+1 of Z)
+    beta = getSyntheticCoefficients(p, 3)
+    model = getSweepStepwisePredictors(stats, 0.001)
+
+    assert model['index'] == [0] + [j+1 for j in np.flatnonzero(beta)]
+
+def test_compare_benchmarks_flags_regressions():
+
+    def case(seconds, peak_bytes):
+        return {'cases': [{'name': 'synthetic', 'results': {'fit': {'seconds': seconds, 'peak_bytes': peak_bytes}}}]}
+
+    baseline = case(1.0, 1 << 20)
+
+    flags = {(entry['metric'], entry['regression']) for entry in compareBenchmarks(case(1.5, 1 << 20), baseline)}
+    assert flags == {('seconds', True), ('peak_bytes', False)}
+
+    # Slower by more than the tolerance, but by less than min_seconds
+    comparison = compareBenchmarks(case(0.0015, 1 << 20), case(0.001, 1 << 20))
+    assert not any(entry['regression'] for entry in comparison)
@@ -0,0 +1,25 @@
+###################################################################################
+# The trace without timings (tracing) is the same for two runs of the same
+# selection in one process
+###################################################################################
+from stepwise_selection import getCrossProducts, getSweepStepwisePredictors, getStepwiseSelection, getSyntheticRows
+from stepwise_selection.tracing import resetTrace, getTrace
+
+def _runSelection():
+
+    rows = getSyntheticRows(0, 300, 6, seed=5)
+    stats = getCrossProducts(rows[:, :6], rows[:, 6])
+
+    resetTrace()
+    getSweepStepwisePredictors(stats, 0.05)
+    getStepwiseSelection(stats, 0.05)
+
+    return getTrace(timings=False)
+
+def test_trace_is_the_same_for_two_runs():
+
+    first = _runSelection()
+    second = _runSelection()
+
+    assert first == second
+    assert first['counters']['critical_value_misses'] > 0